@@ -0,0 +1,94 @@
+"""阅读时间分析基准测试
+
+在同一批合成书籍（见synthetic.py）上比较三种做法计算阅读天数分布、想读积压时长和每月读完数量的耗时：
+- 逐本解析：遍历Book对象，每次用strptime解析日期字符串
+- 打包数组：DateColumns打包为标准库array后计算（未安装NumPy时的做法）
+- NumPy：DateColumns打包为NumPy数组后向量化计算
+
+打包只需一次，之后可反复分析，因此打包和分析分别计时；三种做法的结果相同。
+
+用法: python benchmarks/bench_analytics.py [书籍数量] [重复次数]
+"""
+import os
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import generate_books
+from book_record.core import (BACKLOG_BINS, DURATION_BINS, Book, DateColumns, load_numpy, summarize)
+
+
+def parse(value):
+    """逐本解析日期字符串"""
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def naive_analysis(books, today):
+    """逐本解析日期的朴素实现"""
+    durations, ages, months = [], [], Counter()
+    for book in books:
+        if book.status == "已读":
+            finish = parse(book.finish_date)
+            start = parse(book.start_date)
+            if finish is not None:
+                months[finish.isoformat()[:7]] += 1
+                if start is not None and finish >= start:
+                    durations.append((finish - start).days)
+        elif book.status == "想读":
+            added = parse(book.add_date)
+            if added is not None:
+                ages.append((today - added).days)
+    return (summarize(durations, DURATION_BINS), summarize(ages, BACKLOG_BINS),
+            dict(sorted(months.items())))
+
+
+def packed_analysis(columns, today):
+    """在打包后的日期数组上分析"""
+    return (summarize(columns.reading_durations(), DURATION_BINS),
+            summarize(columns.backlog_ages(today), BACKLOG_BINS), columns.throughput('month'))
+
+
+def best_of(repeat, run):
+    """重复执行，返回最短耗时（秒）和最后一次的结果"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    books = [Book.from_dict(item) for item in generate_books(count)]
+    today = date(2025, 1, 1)
+
+    rows = []
+    naive_time, expected = best_of(repeat, lambda: naive_analysis(books, today))
+    rows.append(("逐本解析", None, naive_time))
+    variants = [("打包数组", False)]
+    if load_numpy() is not None:
+        variants.append(("NumPy", True))
+    else:
+        print("未安装NumPy，跳过NumPy向量化")
+    for name, use_numpy in variants:
+        pack_time, columns = best_of(repeat, lambda: DateColumns.from_books(books, use_numpy))
+        analysis_time, result = best_of(repeat, lambda: packed_analysis(columns, today))
+        if result != expected:
+            raise SystemExit(f"{name}的结果与逐本解析不一致")
+        rows.append((name, pack_time, analysis_time))
+
+    print(f"书籍数量: {count}，取{repeat}次中最快的一次")
+    print(f"{'做法':<12}{'打包(毫秒)':>12}{'分析(毫秒)':>12}{'分析加速':>10}")
+    for name, pack_time, analysis_time in rows:
+        packed = f"{pack_time * 1000:.1f}" if pack_time is not None else "-"
+        print(f"{name:<12}{packed:>12}{analysis_time * 1000:>12.1f}{naive_time / analysis_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""导入耗时基准测试
+
+每次在新的Python进程中测量导入耗时（多轮交替测量，取中位数），比较：
+- 数据层：book_record.core
+- 命令行：book_record.cli
+- 图形界面：book_record.gui.app
+- 拆分前：单文件版Book_Record_Tool_v1.0.py（可选）。它作为脚本运行时每次都要从源码
+  重新编译，并且不论用途都先导入PyQt5；这里用runpy按同样方式执行它的模块顶层
+
+同时检查每条路径是否导入了PyQt5。
+
+用法: python benchmarks/bench_import.py [重复次数] [拆分前的脚本]
+拆分前的脚本可从提交历史取出，例如：
+    git show <拆分前的提交>:Book_Record_Tool_v1.0.py > /tmp/legacy_tool.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("数据层 core", "import book_record.core"),
+    ("命令行 cli", "import book_record.cli"),
+    ("图形界面 gui", "import book_record.gui.app"),
+]
+
+PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start, 'PyQt5' in sys.modules)
+"""
+
+
+def run_probe(statement):
+    """在新进程中执行一次导入，返回（耗时秒，是否导入了PyQt5）"""
+    output = subprocess.run([sys.executable, "-c", PROBE.format(root=ROOT, statement=statement)],
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), output[1] == "True"
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    cases = list(CASES)
+    if len(sys.argv) > 2:
+        legacy = os.path.abspath(sys.argv[2])
+        cases.insert(0, ("拆分前(单文件)", f"import runpy; runpy.run_path({legacy!r}, run_name='legacy')"))
+
+    # 各路径交替测量，避免系统负载的波动集中影响某一项
+    samples = {name: [] for name, _ in cases}
+    uses_qt = {}
+    for _ in range(repeat):
+        for name, statement in cases:
+            elapsed, uses_qt[name] = run_probe(statement)
+            samples[name].append(elapsed)
+
+    baseline = statistics.median(samples[cases[0][0]])
+    print(f"重复次数: {repeat}")
+    print(f"{'导入路径':<20}{'耗时(ms)':>10}{'PyQt5':>8}{'节省':>10}")
+    for name, _ in cases:
+        elapsed = statistics.median(samples[name])
+        print(f"{name:<20}{elapsed * 1000:>10.1f}{'是' if uses_qt[name] else '否':>8}"
+              f"{1 - elapsed / baseline:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""书籍内存占用基准测试
+
+在同一批合成书籍上比较几种内存表示的占用：
+- 旧版Book：每个对象一个__dict__，日期为字符串
+- 新版Book：__slots__ + 日序数日期 + 驻留状态（JSON存储）
+- 列式存储：ColumnarStorage
+
+用法: python benchmarks/bench_memory.py [书籍数量]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import generate_books
+from book_record.core import Book, JsonStorage, ColumnarStorage, set_log_handler
+
+
+class LegacyBook:
+    """旧版书籍类：普通对象，日期为字符串"""
+    def __init__(self, data):
+        self.id = data.get('id')
+        self.title = data.get('title', '')
+        self.author = data.get('author', '')
+        self.status = data.get('status', '想读')
+        self.notes = data.get('notes', '')
+        self.add_date = data.get('add_date', '')
+        self.finish_date = data.get('finish_date')
+        self.start_date = data.get('start_date')
+
+
+def measure(build):
+    """测量build()返回的对象在内存中的占用（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    set_log_handler(None)
+    payload = json.dumps(list(generate_books(count)), ensure_ascii=False)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "books_data.json")
+        with open(data_file, 'w', encoding='utf-8') as f:
+            f.write(payload)
+
+        def load_storage(storage_class):
+            storage = storage_class(data_file, use_journal=False)
+            storage.load()
+            return storage
+
+        results = [
+            ("旧版Book列表", measure(lambda: [LegacyBook(item) for item in json.loads(payload)])),
+            ("__slots__ Book列表", measure(lambda: [Book.from_dict(item) for item in json.loads(payload)])),
+            ("JSON存储(含索引)", measure(lambda: load_storage(JsonStorage))),
+            ("列式存储(含索引)", measure(lambda: load_storage(ColumnarStorage))),
+        ]
+
+    baseline = results[0][1]
+    print(f"书籍数量: {count}")
+    print(f"{'表示方式':<20}{'内存(MB)':>12}{'每本(字节)':>14}{'节省':>10}")
+    for name, used in results:
+        saved = 1 - used / baseline
+        print(f"{name:<20}{used / 1024 / 1024:>12.1f}{used / count:>14.0f}{saved:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
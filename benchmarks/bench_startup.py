@@ -0,0 +1,112 @@
+"""冷启动基准测试：从启动到主窗口第一次绘制、到数据加载完成的耗时
+
+每次在新的Python进程中按main()的流程启动图形界面（offscreen平台，无需显示器），
+多轮交替测量，取中位数：
+- 首次绘制：从进程开始执行（含导入PyQt5和本程序）到主窗口第一次绘制完成
+- 加载完成：到书库分批加载完成、可以修改书籍
+
+可以同时测量另一份源码目录（例如改动前的版本）作比较，它需要支持BOOK_RECORD_DATA_FILE环境变量。
+取出某个提交的源码：
+    mkdir /tmp/old && git archive <提交> | tar -x -C /tmp/old
+
+用法: python benchmarks/bench_startup.py [重复次数] [书籍数量] [另一份源码目录]
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import LIBRARY_SIZES, write_library
+
+# 替换app模块中的QApplication，在应用对象上安装事件过滤器，主窗口第一次绘制后开始等待加载完成
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from PyQt5.QtCore import QEvent, QObject, QTimer
+from PyQt5.QtWidgets import QApplication, QMainWindow
+from book_record.gui import app as gui_app
+marks = {{'import': time.perf_counter() - start}}
+
+class Probe(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and isinstance(obj, QMainWindow) and 'first_paint' not in marks:
+            marks['first_paint'] = None
+            QTimer.singleShot(0, lambda: self.painted(obj))
+        return False
+
+    def painted(self, window):
+        marks['first_paint'] = time.perf_counter() - start
+        self.wait_loaded(window)
+
+    def wait_loaded(self, window):
+        if window.loading:
+            QTimer.singleShot(1, lambda: self.wait_loaded(window))
+            return
+        marks['loaded'] = time.perf_counter() - start
+        QApplication.instance().quit()
+
+class ProbeApplication(QApplication):
+    def __init__(self, argv):
+        super().__init__(argv)
+        self.probe = Probe()
+        self.installEventFilter(self.probe)
+
+gui_app.QApplication = ProbeApplication
+try:
+    gui_app.main()
+except SystemExit:
+    pass
+print(json.dumps(marks))
+"""
+
+
+def run_probe(root, data_file):
+    """在新进程中启动一次，返回各阶段耗时（秒）"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', BOOK_RECORD_DATA_FILE=data_file)
+    # 较早的版本按当前目录查找图标文件，统一从源码目录启动
+    result = subprocess.run([sys.executable, "-c", PROBE.format(root=root)], cwd=root, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"{root} 启动失败:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    count = LIBRARY_SIZES.get(sys.argv[2].lower()) or int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    trees = [("当前版本", ROOT)]
+    if len(sys.argv) > 3:
+        trees.insert(0, ("比较版本", os.path.abspath(sys.argv[3])))
+
+    directory = tempfile.mkdtemp(prefix="book_record_startup_")
+    try:
+        data_file = os.path.join(directory, "books_data.json")
+        write_library(data_file, count)
+        # 预热一次，避免首次编译字节码和读文件的开销算进第一轮
+        for _, root in trees:
+            run_probe(root, data_file)
+        # 各版本交替测量，避免系统负载的波动集中影响某一项
+        samples = {name: [] for name, _ in trees}
+        for _ in range(repeat):
+            for name, root in trees:
+                samples[name].append(run_probe(root, data_file))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"书籍数量: {count}，重复次数: {repeat}，取中位数")
+    print(f"{'版本':<12}{'导入(ms)':>10}{'首次绘制(ms)':>14}{'加载完成(ms)':>14}")
+    for name, _ in trees:
+        medians = {mark: statistics.median(sample[mark] for sample in samples[name]) * 1000
+                   for mark in ('import', 'first_paint', 'loaded')}
+        print(f"{name:<12}{medians['import']:>10.1f}{medians['first_paint']:>14.1f}{medians['loaded']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""BookManager和界面刷新热点路径的基准测试套件
+
+在合成书库（见synthetic.py，1k~1M本）上测量：
+- 数据层：load_data、save_data、get_books_by_status（三种状态）、get_books_by_year（最近一年）、get_years
+- 界面（offscreen平台，无需显示器）：窗口分批加载完成的耗时、refresh_book_lists、update_stats、
+  切换字号（含重新布局和绘制）
+
+每项重复若干次，记录最短、中位数和平均耗时（毫秒），结果连同版本、环境信息写入JSON，
+可用--compare比较两次（例如两个版本）的结果。
+
+用法:
+    python benchmarks/bench_suite.py [--sizes 1k,10k,100k] [--storage json,sqlite] [--repeat 3]
+                                     [--no-gui] [-o results.json]
+    python benchmarks/bench_suite.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import LIBRARY_SIZES, write_library
+from book_record.core import BOOK_STATUSES, BookManager, STORAGE_BACKENDS, set_log_handler
+
+# 结果文件格式版本，格式变化时递增
+RESULT_FORMAT = 1
+
+
+def measure(repeat, run):
+    """重复执行run()，返回耗时统计（毫秒）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'min': min(times), 'median': statistics.median(times), 'mean': statistics.mean(times),
+            'runs': len(times)}
+
+
+def bench_core(data_file, storage, repeat):
+    """测量数据层各操作"""
+    results = {'load_data': measure(repeat, lambda: BookManager(data_file, storage=storage).close())}
+    manager = BookManager(data_file, storage=storage)
+    try:
+        years = manager.get_years()
+        results['save_data'] = measure(repeat, manager.save_data)
+        results['get_books_by_status'] = measure(
+            repeat, lambda: [manager.get_books_by_status(status) for status in BOOK_STATUSES])
+        if years:
+            results['get_books_by_year'] = measure(repeat, lambda: manager.get_books_by_year(years[0]))
+        results['get_years'] = measure(repeat, manager.get_years)
+    finally:
+        manager.close()
+    return results
+
+
+def bench_gui(data_file, storage, repeat):
+    """在offscreen平台上测量主窗口加载和列表、统计刷新"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.environ['BOOK_RECORD_DATA_FILE'] = data_file
+    os.environ['BOOK_RECORD_STORAGE'] = storage
+    from PyQt5.QtWidgets import QApplication
+    from book_record.gui.app import BookRecordApp
+    from book_record.gui.theme import DEFAULT_FONT_SIZE, FONT_MANAGER
+    app = QApplication.instance() or QApplication([])
+
+    def open_window():
+        window = BookRecordApp()
+        window.show()
+        while window.loading:
+            app.processEvents()
+        return window
+
+    def close_window(window):
+        window._index_timer.stop()
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+
+    results = {}
+    windows = []
+    results['gui_load'] = measure(repeat, lambda: windows.append(open_window()))
+    for window in windows[:-1]:
+        close_window(window)
+    window = windows[-1]
+    # 等空闲时的索引建立完成，避免干扰后面的计时
+    while window._index_timer.isActive():
+        app.processEvents()
+    results['refresh_book_lists'] = measure(repeat, window.refresh_book_lists)
+    results['update_stats'] = measure(repeat, window.update_stats)
+
+    def switch_font_size():
+        current = FONT_MANAGER.get_font_size_name()
+        window.change_font_size('12 pt' if current != '12 pt' else DEFAULT_FONT_SIZE)
+        app.processEvents()
+
+    results['change_font_size'] = measure(repeat, switch_font_size)
+    window.change_font_size(DEFAULT_FONT_SIZE)
+    close_window(window)
+    return results
+
+
+def environment():
+    """记录版本和运行环境，便于比较结果"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'format': RESULT_FORMAT,
+        'commit': commit,
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def run_suite(sizes, storages, repeat, gui):
+    """对每个书库规模和存储后端运行全部测量，返回结果字典"""
+    results = {'environment': environment(), 'repeat': repeat, 'results': {}}
+    for size_name in sizes:
+        count = LIBRARY_SIZES.get(size_name.lower()) or int(size_name)
+        for storage in storages:
+            # 每个后端使用新的目录，SQLite首次打开时会导入同目录的JSON数据
+            directory = tempfile.mkdtemp(prefix="book_record_bench_")
+            try:
+                json_file = os.path.join(directory, STORAGE_BACKENDS['json'].default_file)
+                start = time.perf_counter()
+                write_library(json_file, count)
+                data_file = os.path.join(directory, STORAGE_BACKENDS[storage].default_file)
+                # 保存一次，转换为当前版本的存储格式（如笔记库）
+                manager = BookManager(data_file, storage=storage)
+                manager.save_data()
+                manager.close()
+                print(f"[{size_name} / {storage}] 生成书库 {time.perf_counter() - start:.1f} 秒", file=sys.stderr)
+                entry = bench_core(data_file, storage, repeat)
+                if gui:
+                    entry.update(bench_gui(data_file, storage, repeat))
+                results['results'].setdefault(str(count), {})[storage] = entry
+                for name, timing in entry.items():
+                    print(f"[{size_name} / {storage}] {name:<22}{timing['median']:>12.2f} 毫秒", file=sys.stderr)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def compare(old_path, new_path):
+    """按中位数比较两次结果"""
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"旧: {old['environment'].get('commit')}  {old['environment']['time']}")
+    print(f"新: {new['environment'].get('commit')}  {new['environment']['time']}")
+    print(f"{'书籍数':>8} {'存储':<8}{'操作':<22}{'旧(毫秒)':>12}{'新(毫秒)':>12}{'变化':>10}")
+    for count, storages in new['results'].items():
+        for storage, entry in storages.items():
+            for name, timing in entry.items():
+                before = old['results'].get(count, {}).get(storage, {}).get(name)
+                if before is None:
+                    continue
+                ratio = timing['median'] / before['median'] if before['median'] else float('inf')
+                print(f"{count:>8} {storage:<8}{name:<22}{before['median']:>12.2f}{timing['median']:>12.2f}"
+                      f"{ratio - 1:>+10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BookManager和界面刷新的基准测试")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="书库规模，逗号分隔，如1k,10k,100k,1m")
+    parser.add_argument("--storage", default="json",
+                        help=f"存储后端，逗号分隔，可选{','.join(sorted(STORAGE_BACKENDS))}")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数")
+    parser.add_argument("--no-gui", action="store_true", help="不测量界面部分")
+    parser.add_argument("-o", "--output", help="结果JSON文件，默认输出到标准输出")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="比较两个结果文件")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    storages = args.storage.split(",")
+    for storage in storages:
+        if storage not in STORAGE_BACKENDS:
+            parser.error(f"未知的存储后端: {storage}")
+
+    set_log_handler(None)
+    results = run_suite(args.sizes.split(","), storages, args.repeat, not args.no_gui)
+    payload = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+        print(f"结果已写入: {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+
+
+if __name__ == '__main__':
+    main()
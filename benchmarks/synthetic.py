@@ -0,0 +1,129 @@
+"""合成书库生成器：可复现的中文书名、作者、读书笔记和阅读日期
+
+同一数量和随机种子总是生成同样的书库，便于在不同版本之间比较基准测试结果。
+- 书名：由常见词语按"X的Y""论X""X史""X：Y"等格式组合，部分为多卷书（上/下、第一卷……）
+- 作者：中文姓名，部分为带国籍的译名，少数缺失
+- 状态：想读约40%、在读约10%、已读约50%
+- 笔记：约四成为空，多数为几句到十几句，约0.5%为数千到数万字的长篇摘抄
+- 日期：添加日期在2010~2024年间，开始晚于添加，完成晚于开始
+
+用法: python benchmarks/synthetic.py 书籍数量 输出文件 [随机种子]
+"""
+import json
+import os
+import random
+import sys
+from datetime import date
+
+WORDS = ("时间 人类 世界 历史 文明 宇宙 城市 故乡 河流 森林 海洋 山川 星空 少年 父亲 母亲 "
+         "朋友 战争 和平 自由 秘密 记忆 梦想 孤独 沉默 光明 黑夜 黎明 风雨 春天 秋天 冬日 "
+         "旅行 远方 中国 江南 长安 草原 沙漠 王朝 帝国 革命 经济 哲学 心理 艺术 科学 数学 "
+         "算法 语言 思想 逻辑 未来 机器 生命 基因 细胞 疾病 医学 社会 权力 财富 资本 货币 "
+         "教育 文学 诗歌 音乐 电影 建筑 园林 茶 酒 食物 味道 围城 江湖 侠客 书店 图书馆").split()
+
+TITLE_PATTERNS = ("{a}的{b}", "{a}与{b}", "论{a}", "{a}史", "{a}简史", "{a}{b}", "我的{a}",
+                  "{a}：{b}的{c}", "最后的{a}", "{a}之{b}", "寻找{a}", "{a}三十讲", "{a}的故事",
+                  "穿越{a}", "{a}{b}录", "当{a}遇见{b}")
+
+VOLUME_MARKS = ("（上）", "（下）", "（一）", "（二）", "（三）", "第一卷", "第二卷", "2", "3")
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤"
+GIVEN_CHARS = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰萍鹏辉晶红建文斌宇浩凯健俊帆帅旭宁龙林欣佳琳思远然晨雨子轩梓涵一诺博皓天"
+TRANSLATED_AUTHORS = ("[英] 乔治·奥威尔", "[美] 卡尔·萨根", "[法] 加缪", "[日] 村上春树", "[俄] 列夫·托尔斯泰",
+                      "[哥伦比亚] 加西亚·马尔克斯", "[以色列] 尤瓦尔·赫拉利", "[美] 海明威", "[德] 黑塞",
+                      "[日] 东野圭吾", "[英] 简·奥斯汀", "[奥] 茨威格", "[美] 理查德·费曼", "[英] 霍金")
+
+SENTENCES = ("这本书让我重新思考了{a}和{b}之间的关系。", "作者对{a}的描写细腻而克制。",
+             "第三章关于{a}的论述非常精彩，值得反复阅读。", "读到结尾时，关于{a}的那段话让我久久不能平静。",
+             "书中提到：“{a}不是终点，而是{b}的开始。”", "相比上一本，这本在{a}方面的论证略显单薄。",
+             "适合在安静的夜晚慢慢读。", "推荐给对{a}感兴趣的朋友。", "摘录：{a}的意义在于{b}，而{b}的意义在于{c}。",
+             "翻译质量一般，有些段落需要对照原文。", "第二遍读时才注意到{a}这条暗线。", "笔记待补充。")
+
+STATUS_WEIGHTS = (("想读", 40), ("在读", 10), ("已读", 50))
+
+# 书库规模的常用档位
+LIBRARY_SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+
+
+def _fill(rng, pattern):
+    return pattern.format(a=rng.choice(WORDS), b=rng.choice(WORDS), c=rng.choice(WORDS))
+
+
+def generate_title(rng):
+    """组合一个书名，约一成为多卷书"""
+    title = _fill(rng, rng.choice(TITLE_PATTERNS))
+    if rng.random() < 0.1:
+        title += rng.choice(VOLUME_MARKS)
+    return title
+
+
+def generate_author(rng):
+    """中文姓名或带国籍的译名，约3%缺失"""
+    roll = rng.random()
+    if roll < 0.03:
+        return ""
+    if roll < 0.25:
+        return rng.choice(TRANSLATED_AUTHORS)
+    return rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_CHARS) for _ in range(rng.randint(1, 2)))
+
+
+def generate_notes(rng):
+    """读书笔记：约四成为空，约0.5%为长篇摘抄"""
+    roll = rng.random()
+    if roll < 0.4:
+        return ""
+    count = rng.randint(200, 1500) if roll > 0.995 else rng.randint(1, 12)
+    return "".join(_fill(rng, rng.choice(SENTENCES)) for _ in range(count))
+
+
+def generate_books(count, seed=42):
+    """逐本生成书籍字典（与Book.to_dict()格式相同），不一次性占用全部内存"""
+    rng = random.Random(seed)
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    first_day = date(2010, 1, 1).toordinal()
+    last_day = date(2024, 12, 31).toordinal()
+    # 作者池：一位作者平均约8本书
+    authors = [generate_author(rng) for _ in range(max(count // 8, 1))]
+    for book_id in range(1, count + 1):
+        status = rng.choices(statuses, weights)[0]
+        added = rng.randint(first_day, last_day)
+        started = finished = None
+        if status != "想读":
+            started = min(added + int(rng.expovariate(1 / 60)), last_day)
+        if status == "已读":
+            finished = min(started + int(rng.lognormvariate(3, 0.8)), last_day)
+        yield {
+            'id': book_id,
+            'title': generate_title(rng),
+            'author': rng.choice(authors),
+            'status': status,
+            'notes': generate_notes(rng),
+            'add_date': date.fromordinal(added).isoformat(),
+            'finish_date': date.fromordinal(finished).isoformat() if finished else None,
+            'start_date': date.fromordinal(started).isoformat() if started else None,
+        }
+
+
+def write_library(path, count, seed=42):
+    """把合成书库逐本写为本程序的JSON数据文件，返回文件大小（字节）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[")
+        for index, book in enumerate(generate_books(count, seed)):
+            f.write(",\n" if index else "\n")
+            f.write(json.dumps(book, ensure_ascii=False))
+        f.write("\n]\n")
+    return os.path.getsize(path)
+
+
+def main():
+    if len(sys.argv) < 3:
+        raise SystemExit(__doc__)
+    count = LIBRARY_SIZES.get(sys.argv[1].lower()) or int(sys.argv[1])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    size = write_library(sys.argv[2], count, seed)
+    print(f"已生成 {count} 本书籍: {sys.argv[2]}（{size / 1024 / 1024:.1f} MB）")
+
+
+if __name__ == '__main__':
+    main()
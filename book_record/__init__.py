@@ -0,0 +1,6 @@
+"""读书记录工具
+
+- book_record.core：数据层（书籍模型、存储、搜索），不依赖PyQt5
+- book_record.cli：命令行入口，python -m book_record
+- book_record.gui：图形界面，只有启动界面时才导入PyQt5
+"""
@@ -0,0 +1,6 @@
+"""python -m book_record：命令行模式"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
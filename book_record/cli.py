@@ -0,0 +1,225 @@
+"""命令行模式：不启动图形界面，也不导入PyQt5，适合脚本和批量处理
+
+用法示例：
+    python -m book_record add "三体" --author 刘慈欣 --status 已读
+    python -m book_record list --status 在读
+    python -m book_record list --year 2024
+    python -m book_record stats
+    python -m book_record analytics --period year
+    python -m book_record search 红楼梦
+    python -m book_record export --format csv -o books.csv
+    python -m book_record export --year 2024 -o 2024.md
+    python -m book_record import goodreads_library_export.csv
+    python -m book_record dedupe --merge
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from .core import (ANALYTICS_PERIODS, BOOK_STATUSES, EXPORT_FORMATS, IMPORT_FORMATS,
+                   NEAR_DUPLICATE_THRESHOLD, Book, BookManager, DateColumns, DEFAULT_STORAGE,
+                   STORAGE_BACKENDS, backlog_summary, duration_summary, export_books, export_to_file,
+                   configure_from_environment, find_duplicate_groups, import_books, is_instrumented,
+                   merge_books, operation_stats, set_log_handler)
+
+def parse_date(value):
+    """校验'YYYY-MM-DD'格式的日期"""
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为YYYY-MM-DD: {value}")
+    return value
+
+def parse_threshold(value):
+    """校验0~1之间的相似度阈值"""
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = None
+    if threshold is None or not 0 <= threshold <= 1:
+        raise argparse.ArgumentTypeError(f"相似度阈值应在0~1之间: {value}")
+    return threshold
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="book_record", description="读书记录工具（命令行模式）")
+    parser.add_argument("--data-file", help="数据文件路径，默认为程序目录下的数据文件")
+    parser.add_argument("--storage", choices=sorted(STORAGE_BACKENDS),
+                        default=os.environ.get('BOOK_RECORD_STORAGE', DEFAULT_STORAGE),
+                        help="存储后端，默认读取环境变量BOOK_RECORD_STORAGE")
+    parser.add_argument("-v", "--verbose", action="store_true", help="把数据层日志输出到标准错误")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="添加书籍")
+    add_parser.add_argument("title", help="书名")
+    add_parser.add_argument("--author", default="", help="作者")
+    add_parser.add_argument("--status", choices=BOOK_STATUSES, default="想读", help="阅读状态")
+    add_parser.add_argument("--notes", default="", help="读书笔记")
+    add_parser.add_argument("--finish-date", type=parse_date, help="完成日期（已读时默认为今天）")
+
+    list_parser = commands.add_parser("list", help="列出书籍")
+    list_filter = list_parser.add_mutually_exclusive_group()
+    list_filter.add_argument("--status", choices=BOOK_STATUSES, help="只列出该状态的书籍")
+    list_filter.add_argument("--year", type=int, help="只列出该年份读完的书籍")
+
+    commands.add_parser("stats", help="统计各状态、各年月的书籍数量，平均阅读天数、连续阅读月数和常读作者")
+
+    analytics_parser = commands.add_parser("analytics", help="阅读天数分布、想读积压时长和各时期读完的数量")
+    analytics_parser.add_argument("--period", choices=ANALYTICS_PERIODS, default="month",
+                                  help="按年或按月统计读完的数量，默认按月")
+    
+    search_parser = commands.add_parser("search", help="按书名、作者、笔记全文搜索")
+    search_parser.add_argument("query", help="搜索内容")
+    search_parser.add_argument("--limit", type=int, default=20, help="最多显示的结果数")
+
+    export_parser = commands.add_parser("export", help="导出书籍（可按状态或年份筛选）")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS,
+                               help="导出格式，默认按输出文件扩展名判断，输出到标准输出时为json")
+    export_filter = export_parser.add_mutually_exclusive_group()
+    export_filter.add_argument("--status", choices=BOOK_STATUSES, help="只导出该状态的书籍")
+    export_filter.add_argument("--year", type=int, help="只导出该年份读完的书籍")
+    export_parser.add_argument("-o", "--output", default="-", help="输出文件，默认为标准输出")
+
+    import_parser = commands.add_parser("import", help="从CSV/JSON导出文件（含豆瓣、Goodreads导出）批量导入")
+    import_parser.add_argument("file", help="要导入的文件")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="文件格式，默认按扩展名判断")
+    import_parser.add_argument("--dry-run", action="store_true", help="只校验并统计，不写入书库")
+
+    dedupe_parser = commands.add_parser("dedupe", help="找出（并合并）重复和近似重复的书籍")
+    dedupe_parser.add_argument("--threshold", type=parse_threshold, default=NEAR_DUPLICATE_THRESHOLD,
+                               help="书名、作者的相似度阈值（0~1），默认%(default)s")
+    dedupe_parser.add_argument("--merge", action="store_true",
+                               help="把每组合并到ID最小的一本，其余删除")
+    return parser
+
+def format_book(book):
+    """一本书一行，字段以制表符分隔"""
+    return "\t".join([str(book.id), book.status, book.title, book.author or "", book.finish_date or ""])
+
+def cmd_add(manager, args, out):
+    if args.status == "已读" and args.finish_date is None:
+        args.finish_date = datetime.now().strftime("%Y-%m-%d")
+    for duplicate in manager.find_duplicates(args.title, args.author):
+        print(f"警告: 书库中已有相同的书籍: {format_book(duplicate)}", file=sys.stderr)
+    book = Book(title=args.title, author=args.author, status=args.status, notes=args.notes,
+                finish_date=args.finish_date if args.status == "已读" else None)
+    manager.add_book(book)
+    if book.id is None:
+        return 1  # 未能写入，存储已报告错误
+    print(format_book(book), file=out)
+
+def cmd_list(manager, args, out):
+    if args.status is not None:
+        books = manager.get_books_by_status(args.status)
+    elif args.year is not None:
+        books = manager.get_books_by_year(args.year)
+    else:
+        books = manager.iter_books(with_notes=False)
+    for book in books:
+        print(format_book(book), file=out)
+
+def cmd_stats(manager, args, out):
+    print(f"总计: {manager.count()}", file=out)
+    for status in BOOK_STATUSES:
+        print(f"{status}: {manager.count(status)}", file=out)
+    stats = manager.reading_stats
+    for year, count in stats.year_counts().items():
+        months = " ".join(f"{month}月{n}" for month, n in enumerate(stats.month_counts(year), 1) if n)
+        print(f"{year}年: {count}" + (f"（{months}）" if months else ""), file=out)
+    average = stats.average_reading_days()
+    if average is not None:
+        print(f"平均阅读天数: {average:.1f}", file=out)
+    longest, first, last, current = stats.streaks()
+    if longest:
+        print(f"最长连续阅读: {longest}个月（{first[0]}-{first[1]:02d} ~ {last[0]}-{last[1]:02d}），"
+              f"当前连续: {current}个月", file=out)
+    authors = stats.top_authors()
+    if authors:
+        print("读得最多的作者: " + "，".join(f"{author}({count})" for author, count in authors), file=out)
+
+def print_summary(title, summary, out):
+    """输出一项天数分布"""
+    if not summary['count']:
+        print(f"{title}: 无数据", file=out)
+        return
+    print(f"{title}: {summary['count']}本，平均 {summary['mean']:.1f} 天，中位数 {summary['median']} 天，"
+          f"90%在 {summary['p90']} 天以内", file=out)
+    print("  " + " | ".join(f"{label}: {count}" for label, count in summary['histogram']), file=out)
+
+def cmd_analytics(manager, args, out):
+    columns = DateColumns.from_manager(manager)
+    print_summary("阅读天数", duration_summary(columns), out)
+    print_summary("想读积压", backlog_summary(columns), out)
+    for period, count in columns.throughput(args.period).items():
+        print(f"{period}: {count}", file=out)
+
+def cmd_search(manager, args, out):
+    for book in manager.search(args.query, args.limit):
+        print(format_book(book), file=out)
+
+def cmd_export(manager, args, out):
+    if args.output != "-":
+        count = export_to_file(manager, args.output, args.format, args.status, args.year)
+        print(f"已导出 {count} 本书籍到: {args.output}", file=sys.stderr)
+    else:
+        export_books(manager, out, args.format or "json", args.status, args.year)
+
+def cmd_import(manager, args, out):
+    result = import_books(manager, args.file, args.format, dry_run=args.dry_run)
+    for line_number, reason in result.errors[:20]:
+        print(f"第{line_number}行: {reason}", file=sys.stderr)
+    if result.invalid > 20:
+        print(f"……共 {result.invalid} 行无效", file=sys.stderr)
+    print(result.summary(), file=out)
+    if result.books and not args.dry_run and not result.committed:
+        return 1  # 未能写入，存储已报告错误
+
+def cmd_dedupe(manager, args, out):
+    groups = find_duplicate_groups(manager, args.threshold)
+    for book_ids in groups:
+        for book in manager.get_books(book_ids, with_notes=False):
+            print(format_book(book), file=out)
+        if args.merge:
+            print(f"-> 合并到 {merge_books(manager, book_ids).id}", file=out)
+        print(file=out)
+    removed = sum(len(book_ids) - 1 for book_ids in groups)
+    if args.merge:
+        print(f"合并了 {len(groups)} 组，删除了 {removed} 本重复书籍", file=out)
+    else:
+        print(f"找到 {len(groups)} 组疑似重复，合并后可减少 {removed} 本；确认后加 --merge 合并", file=out)
+
+COMMANDS = {
+    'add': cmd_add,
+    'list': cmd_list,
+    'stats': cmd_stats,
+    'analytics': cmd_analytics,
+    'search': cmd_search,
+    'export': cmd_export,
+    'import': cmd_import,
+    'dedupe': cmd_dedupe,
+}
+
+def main(argv=None):
+    """命令行入口，返回退出码：成功为0，文件无法读写或数据无效时输出一行错误并返回1"""
+    args = build_parser().parse_args(argv)
+    set_log_handler((lambda message: print(message, file=sys.stderr)) if args.verbose else None)
+    configure_from_environment()
+    data_file = os.path.abspath(args.data_file) if args.data_file else None
+    try:
+        manager = BookManager(data_file, storage=args.storage)
+    except (OSError, ValueError) as e:
+        print(f"错误: 无法打开书库: {e}", file=sys.stderr)
+        return 1
+    try:
+        status = COMMANDS[args.command](manager, args, sys.stdout) or 0
+    except (OSError, ValueError) as e:
+        print(f"错误: {args.command}: {e}", file=sys.stderr)
+        status = 1
+    finally:
+        manager.close()
+    if is_instrumented():
+        for name, stats, _ in operation_stats():
+            print(f"[耗时] {name}: {stats['total']}次，平均 {stats['mean']:.1f} 毫秒，"
+                  f"最大 {stats['max']:.1f} 毫秒", file=sys.stderr)
+    return status
@@ -0,0 +1,33 @@
+"""数据层：书籍模型、存储后端、全文搜索、阅读统计与分析和数据管理器，不依赖PyQt5"""
+from .models import (BOOK_STATUSES, Book, BookEvent, pack_date, unpack_date, intern_status,
+                     parse_finish_year, get_finish_year)
+from .journal import (JOURNAL_SUFFIX, JOURNAL_COMPACT_THRESHOLD, SAVE_COALESCE_DELAY, SaveWorker,
+                      BookJournal, encode_journal_record, append_checkpoint, read_journal,
+                      records_after_checkpoint)
+from .notes import NOTES_SUFFIX, notes_digest, NotesStore
+from .history import (HISTORY_SUFFIX, KEYFRAME_INTERVAL, DIFF_LINE_LIMIT, make_delta, apply_delta,
+                      NotesHistory)
+from .storage import (STREAM_CHUNK_SIZE, STREAM_BATCH_SIZE, JsonArrayReader, get_data_dir,
+                      JsonStorage, SqliteStorage, BookColumns, ColumnarStorage,
+                      STORAGE_BACKENDS, DEFAULT_STORAGE)
+from .indexing import IncrementalIndex
+from .search import (SEARCH_FIELDS, SEARCH_MASK_WEIGHTS, SEARCH_RESULT_LIMIT, tokenize,
+                     tokenize_query, SearchIndex)
+from .stats import (TOP_AUTHOR_LIMIT, finish_month, reading_days, month_index, month_of,
+                    ReadingStats)
+from .analytics import (EPOCH_ORDINAL, NO_DATE, DURATION_BINS, BACKLOG_BINS, ANALYTICS_PERIODS,
+                        load_numpy, epoch_day, DateColumns, summarize, duration_summary, backlog_summary)
+from .manager import ITER_CHUNK_SIZE, BookManager
+from .dedupe import (NEAR_DUPLICATE_THRESHOLD, normalize_text, dedupe_key, core_title, core_author,
+                     DuplicateIndex, find_duplicate_groups, merge_books)
+from .importer import (IMPORT_FORMATS, FIELD_ALIASES, STATUS_ALIASES, ImportResult, MalformedRow,
+                       detect_format, iter_rows, resolve_columns, normalize_date, normalize_status,
+                       parse_row, read_import_file, import_books)
+from .exporter import (EXPORT_FORMATS, EXPORT_EXTENSIONS, EXPORT_FIELDS, detect_export_format,
+                       select_book_ids, write_csv, write_json, write_jsonl, write_markdown_report,
+                       export_books, export_to_file)
+from .instrument import (INSTRUMENT_ENV, PROFILE_ENV, HISTOGRAM_BUCKETS, SLOW_OPERATION_THRESHOLD,
+                         RollingHistogram, enable_instrumentation, is_instrumented, record,
+                         instrumented, operation_stats, slowest_operations, reset_instrumentation,
+                         is_profiling, start_profiling, stop_profiling, configure_from_environment)
+from .report import log, report_error, set_log_handler, set_error_handler
@@ -0,0 +1,171 @@
+"""阅读时间分析：阅读天数分布、想读书籍的积压时长和各时期读完的数量
+
+书籍的状态和添加、开始、完成日期一次性打包为整数数组（距1970-01-01的天数），
+之后的分析都在数组上整体计算，不再逐本解析日期字符串。安装了NumPy时使用NumPy向量化计算（用到时才导入），
+否则用标准库array，结果相同。
+"""
+from array import array
+from collections import Counter
+from datetime import date
+
+from .models import BOOK_STATUSES
+
+# 1970-01-01的日序数，日序数减去它即为距1970-01-01的天数
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# 日期缺失或不是标准的YYYY-MM-DD
+NO_DATE = -2 ** 31
+
+# 阅读天数、积压天数分布的分段上限（含）
+DURATION_BINS = (7, 30, 90, 180, 365)
+BACKLOG_BINS = (30, 90, 180, 365, 730)
+
+ANALYTICS_PERIODS = ('year', 'month')
+
+# 已导入的NumPy模块，未安装时为False
+_numpy = None
+
+def load_numpy():
+    """按需导入NumPy（导入本身需要几十毫秒，不拖慢命令行启动），未安装时返回None"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+def epoch_day(packed):
+    """Book中压缩的日期（日序数）转换为距1970-01-01的天数，无法转换时为NO_DATE"""
+    return packed - EPOCH_ORDINAL if isinstance(packed, int) else NO_DATE
+
+def bin_labels(bins):
+    """分段名称，如"≤7天""8~30天"">365天\""""
+    labels = []
+    lower = 0
+    for upper in bins:
+        labels.append(f"≤{upper}天" if not lower else f"{lower}~{upper}天")
+        lower = upper + 1
+    labels.append(f">{bins[-1]}天")
+    return labels
+
+class DateColumns:
+    """打包后的书籍日期：状态编码（BOOK_STATUSES中的下标，其他状态为len(BOOK_STATUSES)）
+    和添加、开始、完成日期（距1970-01-01的天数，缺失为NO_DATE），每列一个整数数组
+    """
+    def __init__(self, statuses, add_days, start_days, finish_days, use_numpy=None):
+        numpy = load_numpy() if use_numpy is not False else None
+        self.use_numpy = numpy is not None
+        if self.use_numpy:
+            self.statuses = numpy.asarray(statuses, dtype=numpy.int8)
+            self.add_days, self.start_days, self.finish_days = (
+                numpy.asarray(days, dtype=numpy.int32) for days in (add_days, start_days, finish_days))
+        else:
+            self.statuses = array('b', statuses)
+            self.add_days, self.start_days, self.finish_days = (
+                array('l', days) for days in (add_days, start_days, finish_days))
+    
+    @classmethod
+    def from_books(cls, books, use_numpy=None):
+        """从书籍打包，只读取已压缩的日期字段，不解析字符串"""
+        status_codes = {status: code for code, status in enumerate(BOOK_STATUSES)}
+        other = len(BOOK_STATUSES)
+        statuses, add_days, start_days, finish_days = array('b'), array('l'), array('l'), array('l')
+        for book in books:
+            statuses.append(status_codes.get(book.status, other))
+            add_days.append(epoch_day(book._add_date))
+            start_days.append(epoch_day(book._start_date))
+            finish_days.append(epoch_day(book._finish_date))
+        return cls(statuses, add_days, start_days, finish_days, use_numpy)
+    
+    @classmethod
+    def from_manager(cls, manager, use_numpy=None):
+        """分批读取书库中的全部书籍并打包"""
+        return cls.from_books(manager.iter_books(with_notes=False), use_numpy)
+    
+    def __len__(self):
+        return len(self.statuses)
+    
+    def _status_code(self, status):
+        return BOOK_STATUSES.index(status)
+    
+    def reading_durations(self):
+        """已读且有开始、完成日期的书籍从开始到完成的天数（日期颠倒的除外）"""
+        finished = self._status_code("已读")
+        if self.use_numpy:
+            mask = ((self.statuses == finished) & (self.start_days != NO_DATE)
+                    & (self.finish_days != NO_DATE) & (self.finish_days >= self.start_days))
+            return self.finish_days[mask] - self.start_days[mask]
+        return array('l', (finish - start for status, start, finish
+                           in zip(self.statuses, self.start_days, self.finish_days)
+                           if status == finished and start != NO_DATE and finish != NO_DATE
+                           and finish >= start))
+    
+    def backlog_ages(self, today=None):
+        """想读书籍从添加到today（默认今天）的天数"""
+        today = epoch_day((today or date.today()).toordinal())
+        wanted = self._status_code("想读")
+        if self.use_numpy:
+            mask = (self.statuses == wanted) & (self.add_days != NO_DATE)
+            return today - self.add_days[mask]
+        return array('l', (today - added for status, added in zip(self.statuses, self.add_days)
+                           if status == wanted and added != NO_DATE))
+    
+    def throughput(self, period='month'):
+        """各时期读完的书籍数量，返回{"YYYY-MM"或"YYYY": 数量}，按时间排序"""
+        if period not in ANALYTICS_PERIODS:
+            raise ValueError(f"不支持的统计周期: {period}")
+        finished = self._status_code("已读")
+        if self.use_numpy:
+            days = self.finish_days[(self.statuses == finished) & (self.finish_days != NO_DATE)]
+            unit = 'M' if period == 'month' else 'Y'
+            numpy = load_numpy()
+            periods, counts = numpy.unique(days.astype('datetime64[D]').astype(f'datetime64[{unit}]'),
+                                           return_counts=True)
+            return {str(key): int(count) for key, count in zip(periods, counts)}
+        # 先按天计数，每个不同的日期只转换一次
+        day_counts = Counter(finish for status, finish in zip(self.statuses, self.finish_days)
+                             if status == finished and finish != NO_DATE)
+        length = 7 if period == 'month' else 4
+        result = Counter()
+        for day, count in day_counts.items():
+            result[date.fromordinal(day + EPOCH_ORDINAL).isoformat()[:length]] += count
+        return dict(sorted(result.items()))
+
+def summarize(values, bins):
+    """天数的统计摘要：数量、平均、中位数、90%分位数和分段计数（无数据时统计值为None）"""
+    count = len(values)
+    if not count:
+        return {'count': 0, 'mean': None, 'median': None, 'p90': None,
+                'histogram': list(zip(bin_labels(bins), [0] * (len(bins) + 1)))}
+    if not isinstance(values, array):
+        numpy = load_numpy()
+        ordered = numpy.sort(values)
+        mean = float(ordered.mean())
+        # 按分段上限（含）计数
+        histogram = numpy.bincount(numpy.searchsorted(numpy.asarray(bins), ordered, side='left'),
+                                   minlength=len(bins) + 1).tolist()
+    else:
+        ordered = sorted(values)
+        mean = sum(ordered) / count
+        histogram = [0] * (len(bins) + 1)
+        position = 0
+        for index, upper in enumerate(bins):
+            start = position
+            while position < count and ordered[position] <= upper:
+                position += 1
+            histogram[index] = position - start
+        histogram[-1] = count - position
+    middle = count // 2
+    median = int(ordered[middle]) if count % 2 else (int(ordered[middle - 1]) + int(ordered[middle])) / 2
+    return {'count': count, 'mean': mean, 'median': median, 'p90': int(ordered[int(0.9 * (count - 1))]),
+            'histogram': list(zip(bin_labels(bins), histogram))}
+
+def duration_summary(columns):
+    """阅读天数分布"""
+    return summarize(columns.reading_durations(), DURATION_BINS)
+
+def backlog_summary(columns, today=None):
+    """想读书籍的积压天数分布"""
+    return summarize(columns.backlog_ages(today), BACKLOG_BINS)
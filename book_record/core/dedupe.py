@@ -0,0 +1,220 @@
+"""重复书籍检测与合并
+
+- DuplicateIndex：归一化(书名, 作者)的哈希索引，添加书籍时O(1)查出完全相同的书
+- find_duplicate_groups()：分块比较找出近似重复（如"三体"与"三体（典藏版）"），不做全量两两比较
+- merge_books()：把一组重复书籍合并为一本
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from .indexing import IncrementalIndex
+from .models import BOOK_STATUSES
+
+# 归一化时去掉的字符：标点、空白和下划线
+_NON_WORD = re.compile(r'[\W_]+')
+
+# 书名中的版本说明、作者中的国籍等括号内容，近似比较时忽略
+_BRACKETED = re.compile(r'[(（\[【〔][^)）\]】〕]*[)）\]】〕]')
+
+# 作者名后的著作方式
+_AUTHOR_ROLE = re.compile(r'(?:编著|主编|编|著|译|等)$')
+
+# 书名中的卷册标记：数字、第X卷、（上）、下册等；卷册不同的书不算重复
+_VOLUME_MARK = re.compile(r'\d+|第[一二三四五六七八九十百]+[卷册部集辑]|[上中下][卷册部]'
+                          r'|[(（\[【〔][上中下一二三四五六七八九十]+[)）\]】〕]')
+
+# 近似重复的默认相似度阈值（0~1）
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+# 分块比较：块内书籍不超过该数量时两两比较，否则按书名排序后只与相邻的若干本比较
+MAX_BLOCK_SIZE = 64
+NEIGHBOR_WINDOW = 8
+
+def normalize_text(text):
+    """查重用的归一化：全角转半角、忽略大小写、去掉标点和空白"""
+    return _NON_WORD.sub('', unicodedata.normalize('NFKC', text or '').casefold())
+
+def dedupe_key(title, author):
+    """查重用的(书名, 作者)键，两本书键相同即视为重复"""
+    return normalize_text(title), normalize_text(author)
+
+def core_title(title):
+    """近似比较用的书名：去掉括号中的版本说明，去掉后为空时保留原书名"""
+    return normalize_text(_BRACKETED.sub('', title or '')) or normalize_text(title)
+
+def core_author(author):
+    """近似比较用的作者：去掉括号中的国籍和末尾的"著""译"等"""
+    return _AUTHOR_ROLE.sub('', normalize_text(_BRACKETED.sub('', author or '')))
+
+def volume_marks(title):
+    """书名中的卷册标记，如"明朝那些事儿（二）"为('二',)"""
+    return tuple(mark.strip('(（[【〔)）]】〕')
+                 for mark in _VOLUME_MARK.findall(unicodedata.normalize('NFKC', title or '')))
+
+class DuplicateIndex(IncrementalIndex):
+    """归一化(书名, 作者)的哈希索引：分批建立（或首次查询时建立），之后随书籍变更事件增量更新
+    
+    只保存键的哈希值，查询时再取出候选书籍核对，哈希冲突不会造成误报。
+    """
+    def _clear(self):
+        """清空索引"""
+        self._ids_by_hash = {}  # 键的哈希 -> 书籍ID，多本书哈希相同时为ID列表
+        self._hash_of = {}      # 书籍ID -> 键的哈希
+    
+    def _contains(self, book_id):
+        return book_id in self._hash_of
+    
+    def _built_message(self):
+        return f"查重索引已建立: {len(self._hash_of)} 本书籍"
+    
+    def _add(self, book):
+        key_hash = hash(dedupe_key(book.title, book.author))
+        self._hash_of[book.id] = key_hash
+        ids = self._ids_by_hash.get(key_hash)
+        if ids is None:
+            self._ids_by_hash[key_hash] = book.id
+        elif isinstance(ids, list):
+            ids.append(book.id)
+        else:
+            self._ids_by_hash[key_hash] = [ids, book.id]
+    
+    def _remove(self, book_id):
+        key_hash = self._hash_of.pop(book_id, None)
+        if key_hash is None:
+            return
+        ids = self._ids_by_hash[key_hash]
+        if not isinstance(ids, list):
+            del self._ids_by_hash[key_hash]
+            return
+        ids.remove(book_id)
+        if len(ids) == 1:
+            self._ids_by_hash[key_hash] = ids[0]
+    
+    def find(self, title, author, exclude_id=None):
+        """查找书名和作者归一化后相同的书籍"""
+        return self.find_key(dedupe_key(title, author), exclude_id)
+    
+    def find_key(self, key, exclude_id=None):
+        """查找dedupe_key()为key的书籍"""
+        self.build()
+        ids = self._ids_by_hash.get(hash(key))
+        if ids is None:
+            return []
+        ids = [book_id for book_id in (ids if isinstance(ids, list) else [ids]) if book_id != exclude_id]
+        return [book for book in self.book_manager.get_books(ids, with_notes=False)
+                if dedupe_key(book.title, book.author) == key]
+
+class _DisjointSet:
+    """并查集，把两两相似的书籍连成组"""
+    def __init__(self):
+        self.parent = {}
+    
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        while parent != item:
+            grandparent = self.parent[parent]
+            self.parent[item] = grandparent
+            item, parent = parent, grandparent
+        return item
+    
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+def _similar(a, b, threshold):
+    """两个归一化字符串是否足够相似"""
+    if a == b:
+        return True
+    if not a or not b:
+        return False
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    return matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
+
+def _may_be_similar(a, b, threshold):
+    """用字符集合快速排除不可能相似的书名，a、b为(书名, 字符集合, 重复字符数)
+    
+    SequenceMatcher的匹配字符数不超过 共有字符种数 + 重复字符数，按此估计相似度的上限。
+    """
+    return 2 * (len(a[1] & b[1]) + min(a[2], b[2])) >= threshold * (len(a[0]) + len(b[0]))
+
+def _is_near_duplicate(a, b, threshold):
+    """a、b为(书籍ID, 近似书名, 近似作者, 卷册标记)；作者有一方为空时只比较书名"""
+    if a[3] != b[3] or not _similar(a[1], b[1], threshold):
+        return False
+    return not a[2] or not b[2] or _similar(a[2], b[2], threshold)
+
+def _compare_block(block, threshold, groups):
+    """比较一个块内的书籍：小块按书名长度排序后两两比较，长度相差过大时提前结束；
+    大块按书名排序后只比较相邻的书籍
+    """
+    small = len(block) <= MAX_BLOCK_SIZE
+    block = sorted(block, key=(lambda record: len(record[1])) if small else (lambda record: record[1]))
+    titles = [(record[1], set(record[1]), len(record[1]) - len(set(record[1]))) for record in block]
+    # 长度为la、lb(la <= lb)的书名相似度不超过 2*la/(la+lb)
+    max_length_ratio = (2 - threshold) / threshold
+    for i, a in enumerate(block):
+        length = len(a[1])
+        last = len(block) if small else min(i + 1 + NEIGHBOR_WINDOW, len(block))
+        for j in range(i + 1, last):
+            b = block[j]
+            if len(b[1]) > length * max_length_ratio:
+                if small:
+                    break
+                continue
+            if (a[1] == b[1] or _may_be_similar(titles[i], titles[j], threshold)) \
+                    and groups.find(a[0]) != groups.find(b[0]) and _is_near_duplicate(a, b, threshold):
+                groups.union(a[0], b[0])
+
+def find_duplicate_groups(manager, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """找出重复和近似重复的书籍，返回书籍ID分组的列表（组内和组间都按ID排序）
+    
+    分块比较：同一作者的书籍为一块，书名前两个字相同的书籍为一块（找出作者写法不同或缺失的重复），
+    只比较同一块中的书籍。
+    """
+    records = [(book.id, core_title(book.title), core_author(book.author), volume_marks(book.title))
+               for book in manager.iter_books(with_notes=False)]
+    groups = _DisjointSet()
+    for block_key in (lambda record: record[2], lambda record: record[1][:2]):
+        blocks = {}
+        for record in records:
+            key = block_key(record)
+            if key:
+                blocks.setdefault(key, []).append(record)
+        for block in blocks.values():
+            if len(block) > 1:
+                _compare_block(block, threshold, groups)
+    
+    members = {}
+    for book_id in groups.parent:
+        members.setdefault(groups.find(book_id), []).append(book_id)
+    return sorted(sorted(ids) for ids in members.values() if len(ids) > 1)
+
+def merge_books(manager, book_ids):
+    """把一组重复书籍合并到ID最小的一本：取最靠后的阅读状态、最早的日期，合并不同的笔记
+    
+    返回保留的书籍。
+    """
+    books = sorted(manager.get_books(book_ids), key=lambda book: book.id)
+    if len(books) < 2:
+        return books[0] if books else None
+    keeper = books[0]
+    furthest = max(books, key=lambda book: BOOK_STATUSES.index(book.status)
+                   if book.status in BOOK_STATUSES else -1)
+    
+    def earliest(field):
+        dates = [getattr(book, field) for book in books if getattr(book, field)]
+        return min(dates) if dates else None
+    
+    keeper.author = keeper.author or next((book.author for book in books if book.author), "")
+    keeper.status = furthest.status
+    keeper.finish_date = furthest.finish_date
+    keeper.start_date = earliest('start_date')
+    keeper.add_date = earliest('add_date') or keeper.add_date
+    notes = [book.notes.strip() for book in books if book.notes and book.notes.strip()]
+    keeper.notes = "\n\n".join(dict.fromkeys(notes))
+    manager.update_book(keeper)
+    for book in books[1:]:
+        manager.delete_book(book.id)
+    return keeper
@@ -0,0 +1,154 @@
+"""流式导出：把书籍写为CSV、JSON、JSON Lines或Markdown读书报告
+
+书籍按ID分批读取、逐本写入文件，不在内存中拼出整个输出，导出大型书库时内存占用不随书籍数量增长。
+"""
+import csv
+import json
+import os
+from datetime import date
+
+from .instrument import instrumented
+from .models import BOOK_STATUSES, get_finish_year
+
+EXPORT_FORMATS = ('csv', 'json', 'jsonl', 'markdown')
+
+# 扩展名 -> 导出格式
+EXPORT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.md': 'markdown',
+    '.markdown': 'markdown',
+}
+
+# CSV导出的列，与Book.to_dict()一致
+EXPORT_FIELDS = ('id', 'title', 'author', 'status', 'notes', 'add_date', 'finish_date', 'start_date')
+
+def detect_export_format(path, default='csv'):
+    """按扩展名判断导出格式"""
+    return EXPORT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+def select_book_ids(manager, status=None, year=None):
+    """按状态或完成年份筛选书籍ID，语义同get_books_by_status()/get_books_by_year()
+    
+    都为None时为全部书籍；指定年份时只包含已读书籍，此时status只能为None或"已读"。
+    """
+    if year is not None:
+        if status not in (None, "已读"):
+            return []
+        return manager.get_book_ids_by_year(year)
+    if status is not None:
+        return manager.get_book_ids_by_status(status)
+    return manager.get_book_ids()
+
+def write_csv(books, f):
+    """逐本写为CSV，返回写入的书籍数"""
+    writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    count = 0
+    for book in books:
+        writer.writerow(book.to_dict())
+        count += 1
+    return count
+
+def write_json(books, f):
+    """逐本写为JSON数组，每本书一行，返回写入的书籍数"""
+    f.write("[")
+    count = 0
+    for book in books:
+        f.write(",\n  " if count else "\n  ")
+        f.write(json.dumps(book.to_dict(), ensure_ascii=False))
+        count += 1
+    f.write("\n]\n" if count else "]\n")
+    return count
+
+def write_jsonl(books, f):
+    """逐本写为JSON Lines，返回写入的书籍数"""
+    count = 0
+    for book in books:
+        f.write(json.dumps(book.to_dict(), ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+def markdown_cell(text):
+    """转义Markdown表格单元格中的特殊字符"""
+    text = (text or "").replace("\\", "\\\\").replace("|", "\\|")
+    return " ".join(text.split())
+
+def write_markdown_table(books, f, date_title, date_field):
+    """逐本写出(日期, 书名, 作者)表格，没有书籍时写"无"，返回写入的书籍数"""
+    count = 0
+    for book in books:
+        if not count:
+            f.write(f"| {date_title} | 书名 | 作者 |\n| --- | --- | --- |\n")
+        f.write(f"| {getattr(book, date_field) or ''} | {markdown_cell(book.title)} | "
+                f"{markdown_cell(book.author)} |\n")
+        count += 1
+    f.write("\n" if count else "无\n\n")
+    return count
+
+def write_markdown_report(manager, f, status=None, year=None):
+    """Markdown读书报告：总览统计，按完成年份从新到旧列出已读书籍，再列出在读和想读书籍
+    
+    返回写入的书籍数。
+    """
+    f.write(f"# 读书报告\n\n生成日期：{date.today().isoformat()}\n\n")
+    if status is None and year is None:
+        f.write("| 状态 | 数量 |\n| --- | --- |\n")
+        for book_status in BOOK_STATUSES:
+            f.write(f"| {book_status} | {manager.count(book_status)} |\n")
+        f.write(f"| 合计 | {manager.count()} |\n\n")
+    
+    count = 0
+    if year is not None:
+        years = [year] if status in (None, "已读") else []
+    elif status in (None, "已读"):
+        years = manager.get_years()
+    else:
+        years = []
+    for report_year in years:
+        book_ids = manager.get_book_ids_by_year(report_year)
+        f.write(f"## {report_year}年已读（{len(book_ids)}本）\n\n")
+        count += write_markdown_table(manager.iter_books(book_ids, with_notes=False), f, "完成日期", 'finish_date')
+    
+    if year is None and status in (None, "已读"):
+        # 没有完成日期的已读书籍不属于任何年份，单独列出
+        undated = [book for book in manager.iter_books(manager.get_book_ids_by_status("已读"), with_notes=False)
+                   if get_finish_year(book) is None]
+        if undated:
+            f.write(f"## 已读，未记录完成日期（{len(undated)}本）\n\n")
+            count += write_markdown_table(undated, f, "添加日期", 'add_date')
+    
+    if year is None:
+        for book_status, date_title, date_field in (("在读", "开始日期", 'start_date'),
+                                                     ("想读", "添加日期", 'add_date')):
+            if status not in (None, book_status):
+                continue
+            book_ids = manager.get_book_ids_by_status(book_status)
+            f.write(f"## {book_status}（{len(book_ids)}本）\n\n")
+            count += write_markdown_table(manager.iter_books(book_ids, with_notes=False), f, date_title, date_field)
+    return count
+
+EXPORT_WRITERS = {
+    'csv': write_csv,
+    'json': write_json,
+    'jsonl': write_jsonl,
+}
+
+@instrumented('export_books')
+def export_books(manager, f, export_format='csv', status=None, year=None):
+    """把书籍（可按状态或年份筛选）流式写入已打开的文本文件，返回写入的书籍数"""
+    if export_format == 'markdown':
+        return write_markdown_report(manager, f, status, year)
+    books = manager.iter_books(select_book_ids(manager, status, year))
+    return EXPORT_WRITERS[export_format](books, f)
+
+def export_to_file(manager, path, export_format=None, status=None, year=None):
+    """导出到文件，格式默认按扩展名判断，返回写入的书籍数"""
+    export_format = export_format or detect_export_format(path)
+    # CSV带BOM，方便Excel正确识别中文
+    encoding = 'utf-8-sig' if export_format == 'csv' else 'utf-8'
+    with open(path, 'w', encoding=encoding, newline='' if export_format == 'csv' else None) as f:
+        return export_books(manager, f, export_format, status, year)
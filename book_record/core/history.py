@@ -0,0 +1,265 @@
+"""笔记修改历史：每次修改保存与上一版本的差异，定期保存完整版本"""
+import base64
+import difflib
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+
+from .notes import notes_digest
+from .report import log
+
+# 历史目录 = 数据文件路径 + HISTORY_SUFFIX，每本书一个文件
+HISTORY_SUFFIX = '.history'
+
+# 每隔多少个版本保存一次完整版本（关键版本），还原任一版本最多应用这么多次差异
+KEYFRAME_INTERVAL = 16
+
+# 差异部分超过该行数时不再逐行比较，整段替换
+DIFF_LINE_LIMIT = 5000
+
+# 比较公共前缀和后缀时每次比较的字数
+_COMPARE_BLOCK = 4096
+
+def _common_prefix(a, b):
+    """两个字符串公共前缀的长度，先按块比较再逐字比较"""
+    n = min(len(a), len(b))
+    i = 0
+    while i + _COMPARE_BLOCK <= n and a[i:i + _COMPARE_BLOCK] == b[i:i + _COMPARE_BLOCK]:
+        i += _COMPARE_BLOCK
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+def _common_suffix(a, b, limit):
+    """两个字符串公共后缀的长度，不超过limit"""
+    len_a, len_b = len(a), len(b)
+    i = 0
+    while i + _COMPARE_BLOCK <= limit and \
+            a[len_a - i - _COMPARE_BLOCK:len_a - i] == b[len_b - i - _COMPARE_BLOCK:len_b - i]:
+        i += _COMPARE_BLOCK
+    while i < limit and a[len_a - i - 1] == b[len_b - i - 1]:
+        i += 1
+    return i
+
+def _line_offsets(lines, start):
+    """各行在原文中的起始位置，末尾附加结束位置"""
+    offsets = [start]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+def make_delta(old, new):
+    """计算把old变为new的差异：[起点, 终点]表示复制old中的一段，字符串表示插入的文字
+    
+    先去掉公共的前缀和后缀（在一段中修改或在末尾追加时差异只有改动的部分），
+    中间部分再逐行比较。
+    """
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    ops = [[0, prefix]] if prefix else []
+    old_middle = old[prefix:len(old) - suffix]
+    new_middle = new[prefix:len(new) - suffix]
+    old_lines = old_middle.splitlines(keepends=True)
+    new_lines = new_middle.splitlines(keepends=True)
+    if old_lines and new_lines and max(len(old_lines), len(new_lines)) <= DIFF_LINE_LIMIT:
+        old_offsets = _line_offsets(old_lines, prefix)
+        new_offsets = _line_offsets(new_lines, 0)
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                ops.append([old_offsets[i1], old_offsets[i2]])
+            elif j1 < j2:
+                ops.append(new_middle[new_offsets[j1]:new_offsets[j2]])
+    elif new_middle:
+        ops.append(new_middle)
+    if suffix:
+        ops.append([len(old) - suffix, len(old)])
+    return ops
+
+def apply_delta(old, ops):
+    """在old上应用make_delta()得到的差异"""
+    return "".join(old[op[0]:op[1]] if isinstance(op, list) else op for op in ops)
+
+def _pack(value):
+    """压缩为可写入JSON的字符串"""
+    data = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.b64encode(zlib.compress(data)).decode('ascii')
+
+def _unpack(text):
+    """还原_pack()压缩的内容"""
+    return json.loads(zlib.decompress(base64.b64decode(text)).decode('utf-8'))
+
+class NotesHistory:
+    """每本书的笔记修改历史，保存为一个追加写的JSON Lines文件
+    
+    每个版本一行：{"rev": 版本号, "time": 修改时间, "size": 字数, "digest": 内容摘要, "key": 是否完整版本,
+    "data": 压缩内容}。
+    关键版本保存完整笔记，其余版本保存与上一版本的差异；还原时从最近的关键版本开始依次应用差异。
+    有后台写盘线程时由record_later()排队，读写历史文件和比较差异都在后台线程中进行；
+    revisions()和reconstruct()只读取已写入文件的版本，界面用revisions_later()在排队的记录写完后取得版本列表。
+    """
+    def __init__(self, path, worker=None):
+        self.path = path
+        self.worker = worker
+        self._pending = []             # 排队的操作（函数），按顺序在后台线程中执行
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.RLock()  # 处理排队的操作或直接读写历史文件时持有
+        self._tails = {}               # 书籍ID -> (下一个版本号, 最近的关键版本号, 最新版本的摘要)，避免每次记录都读文件
+    
+    def _file(self, book_id):
+        return os.path.join(self.path, f"{book_id}.jsonl")
+    
+    def _read(self, book_id):
+        """读取书籍的全部版本记录，忽略崩溃时写了一半的末行"""
+        records = []
+        path = self._file(book_id)
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    log(f"忽略损坏的笔记历史记录: {path}")
+        return records
+    
+    def _append(self, book_id, records):
+        """追加版本记录并落盘"""
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(book_id), 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _tail(self, book_id):
+        """书籍历史的末尾状态：(下一个版本号, 最近的关键版本号, 最新版本的摘要)，没有历史时最新版本视为空笔记"""
+        tail = self._tails.get(book_id)
+        if tail is None:
+            records = self._read(book_id)
+            if records:
+                last_key = next((r['rev'] for r in reversed(records) if r['key']), None)
+                tail = (records[-1]['rev'] + 1, last_key, records[-1]['digest'])
+            else:
+                tail = (0, None, notes_digest(""))
+            self._tails[book_id] = tail
+        return tail
+    
+    def _new_record(self, book_id, time, text, base):
+        """生成下一个版本的记录并更新末尾状态，base为上一版本的笔记；距上一个关键版本KEYFRAME_INTERVAL个版本以内时保存差异"""
+        rev, last_key, _ = self._tail(book_id)
+        record = {'rev': rev, 'time': time, 'size': len(text), 'digest': notes_digest(text), 'key': True}
+        if last_key is not None and rev - last_key < KEYFRAME_INTERVAL:
+            ops = make_delta(base, text)
+            delta = _pack(ops)
+            # 插入的文字不到一半时差异一定更小，否则比较压缩后的大小（如整段重写时直接保存完整版本）
+            if sum(len(op) for op in ops if isinstance(op, str)) * 2 < len(text):
+                record.update(key=False, data=delta)
+            else:
+                full = _pack(text)
+                record.update(key=len(full) <= len(delta), data=min(full, delta, key=len))
+        else:
+            record['data'] = _pack(text)
+        self._tails[book_id] = (rev + 1, rev if record['key'] else last_key, record['digest'])
+        return record
+    
+    def _rebuild(self, records, index):
+        """从不晚于records[index]的最近关键版本开始应用差异，还原该版本"""
+        start = index
+        while not records[start]['key']:
+            start -= 1
+        text = _unpack(records[start]['data'])
+        for record in records[start + 1:index + 1]:
+            text = apply_delta(text, _unpack(record['data']))
+        return text
+    
+    def record(self, book_id, previous, text, time=None):
+        """记录笔记从previous改为text，没有修改时不记录
+        
+        还没有历史、或笔记曾在记录历史之外被修改时，先把previous保存为一个版本（没有修改时间）。
+        """
+        previous = previous or ""
+        if notes_digest(previous) == notes_digest(text):
+            return
+        with self._write_lock:
+            new_records = []
+            if self._tail(book_id)[2] != notes_digest(previous):
+                records = self._read(book_id)
+                last_text = self._rebuild(records, len(records) - 1) if records else ""
+                new_records.append(self._new_record(book_id, None, previous, last_text))
+            time = time or datetime.now().isoformat(timespec='seconds')
+            new_records.append(self._new_record(book_id, time, text, previous))
+            try:
+                self._append(book_id, new_records)
+            except Exception:
+                self._tails.pop(book_id, None)  # 下次重新读取文件
+                raise
+    
+    def record_later(self, book_id, load_previous, text):
+        """排队记录笔记的修改：load_previous()返回修改前的笔记，在后台线程中调用；没有后台写盘线程时立即记录"""
+        time = datetime.now().isoformat(timespec='seconds')
+        self._enqueue(lambda: self.record(book_id, load_previous(), text, time))
+    
+    def _enqueue(self, operation):
+        with self._pending_lock:
+            self._pending.append(operation)
+        if self.worker is not None:
+            self.worker.schedule(self.write_pending)
+        else:
+            self.write_pending()
+    
+    def write_pending(self):
+        """按顺序执行排队的记录和删除，出错时只写日志，不影响之后的操作"""
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            for operation in pending:
+                try:
+                    operation()
+                except Exception as e:
+                    log(f"记录笔记历史时出错: {e}")
+    
+    def flush(self):
+        """等待排队的记录和删除全部完成（会阻塞调用线程，界面应使用revisions_later()）"""
+        if self.worker is not None:
+            self.worker.flush()
+        self.write_pending()
+    
+    def revisions(self, book_id):
+        """书籍笔记已写入文件的各个版本（从旧到新）：[{'rev', 'time', 'size', 'key'}]，不含内容"""
+        return [{name: record[name] for name in ('rev', 'time', 'size', 'key')}
+                for record in self._read(book_id)]
+    
+    def revisions_later(self, book_id, callback):
+        """排在之前的记录之后，在后台线程中读取版本列表并以其调用callback；没有后台写盘线程时立即调用"""
+        self._enqueue(lambda: callback(self.revisions(book_id)))
+    
+    def reconstruct(self, book_id, rev):
+        """还原笔记已写入文件的某个版本，版本不存在时返回None"""
+        records = self._read(book_id)
+        index = next((i for i, record in enumerate(records) if record['rev'] == rev), None)
+        if index is None:
+            return None
+        return self._rebuild(records, index)
+    
+    def remove(self, book_id):
+        """删除书籍的全部历史（排在之前的记录之后执行）"""
+        self._enqueue(lambda: self._remove_now(book_id))
+    
+    def _remove_now(self, book_id):
+        self._tails.pop(book_id, None)
+        try:
+            os.remove(self._file(book_id))
+        except FileNotFoundError:
+            pass
+    
+    def close(self):
+        """写完排队的历史记录并结束后台线程"""
+        if self.worker is not None:
+            self.worker.close()
+        self.write_pending()
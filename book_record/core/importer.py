@@ -0,0 +1,194 @@
+"""批量导入：流式读取CSV/JSON导出文件，校验、去重、映射阅读状态后一次性写入
+
+支持本程序导出的CSV/JSON/JSON Lines，以及豆瓣、Goodreads等导出的CSV：
+列名按FIELD_ALIASES识别，阅读状态按STATUS_ALIASES映射到想读/在读/已读。
+"""
+import csv
+import json
+import os
+import re
+from datetime import date
+
+from .dedupe import dedupe_key
+from .instrument import instrumented
+from .models import Book
+from .report import log
+from .storage import JsonArrayReader
+
+IMPORT_FORMATS = ('csv', 'json', 'jsonl')
+
+# 导出文件中的列名 -> 本程序字段，比较时忽略大小写和首尾空白
+FIELD_ALIASES = {
+    'title': ('title', '书名', '标题', '名称'),
+    'author': ('author', '作者', '作者/译者'),
+    'status': ('status', '状态', '阅读状态', 'exclusive shelf'),
+    'notes': ('notes', '笔记', '读书笔记', '短评', '我的短评', '评语', 'my review', 'private notes'),
+    'add_date': ('add_date', '添加日期', '标记日期', '标记时间', '创建时间', 'date added'),
+    'start_date': ('start_date', '开始日期', 'date started'),
+    'finish_date': ('finish_date', '完成日期', '读完日期', 'date read'),
+}
+
+# 各来源的阅读状态 -> 想读/在读/已读，比较时忽略大小写
+STATUS_ALIASES = {
+    '想读': '想读', 'wish': '想读', 'to-read': '想读', 'to read': '想读', 'want to read': '想读',
+    '在读': '在读', 'do': '在读', 'currently-reading': '在读', 'currently reading': '在读',
+    'reading': '在读',
+    '已读': '已读', '读过': '已读', 'collect': '已读', 'read': '已读', 'finished': '已读',
+}
+
+# 可识别的日期写法：2024-01-31、2024/1/31、2024.01.31、2024年1月31日，后面可带时间
+DATE_PATTERN = re.compile(r'(\d{4})[-/.年](\d{1,2})[-/.月](\d{1,2})')
+
+# 导入结果中最多保留的错误行数
+MAX_REPORTED_ERRORS = 100
+
+class ImportResult:
+    """一次导入的结果"""
+    def __init__(self):
+        self.books = []       # 通过校验、不重复的书籍
+        self.duplicates = 0   # 与书库或文件中前面的行重复而跳过的行数
+        self.invalid = 0      # 未通过校验的行数
+        self.errors = []      # 最多MAX_REPORTED_ERRORS条(行号, 原因)
+        self.committed = False
+    
+    def add_error(self, line_number, reason):
+        """记录一行无效数据"""
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, reason))
+    
+    def summary(self):
+        """一行文字的结果摘要"""
+        action = "可导入" if self.books and not self.committed else "导入"
+        return f"{action} {len(self.books)} 本书籍，跳过重复 {self.duplicates} 行，无效 {self.invalid} 行"
+
+class MalformedRow:
+    """无法解析的一行（如JSON Lines中格式错误的行），parse_row()时作为无效行报告"""
+    def __init__(self, reason):
+        self.reason = reason
+
+def detect_format(path):
+    """按扩展名判断文件格式，无法判断时按CSV处理"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('json', 'jsonl'):
+        return extension
+    if extension == 'ndjson':
+        return 'jsonl'
+    return 'csv'
+
+def iter_rows(path, file_format=None):
+    """逐行产出(行号, 字段字典)，不一次性读入整个文件；JSON Lines中无法解析的行产出MalformedRow"""
+    file_format = file_format or detect_format(path)
+    if file_format == 'csv':
+        # utf-8-sig：兼容Excel和本程序导出的带BOM的CSV
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    elif file_format == 'jsonl':
+        with open(path, encoding='utf-8-sig') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = MalformedRow(f"JSON格式错误: {e.msg}")
+                yield line_number, row
+    else:
+        with open(path, 'rb') as f:
+            for item_number, item in enumerate(JsonArrayReader(f), 1):
+                yield item_number, item
+
+def resolve_columns(keys):
+    """把导出文件的列名映射到本程序字段，返回{字段: 列名}"""
+    lookup = {str(key).strip().lower(): key for key in keys if key is not None}
+    columns = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            if alias in lookup:
+                columns[field] = lookup[alias]
+                break
+    return columns
+
+def normalize_date(value):
+    """把常见日期写法统一为YYYY-MM-DD，空值返回None，无法识别时抛出ValueError"""
+    value = str(value).strip() if value is not None else ""
+    if not value:
+        return None
+    match = DATE_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"无法识别的日期: {value}")
+    return date(*map(int, match.groups())).isoformat()
+
+def normalize_status(value, finish_date):
+    """把各来源的阅读状态映射为想读/在读/已读，为空时按是否有完成日期推断"""
+    value = str(value).strip() if value is not None else ""
+    if not value:
+        return "已读" if finish_date else "想读"
+    status = STATUS_ALIASES.get(value.lower())
+    if status is None:
+        raise ValueError(f"无法识别的阅读状态: {value}")
+    return status
+
+def parse_row(row, columns):
+    """校验一行数据并转换为Book，无效时抛出ValueError"""
+    if isinstance(row, MalformedRow):
+        raise ValueError(row.reason)
+    if not isinstance(row, dict):
+        raise ValueError("不是一条书籍记录")
+    
+    def field(name):
+        value = row.get(columns[name]) if name in columns else None
+        return str(value).strip() if value is not None else ""
+    
+    title = field('title')
+    if not title:
+        raise ValueError("缺少书名")
+    finish_date = normalize_date(field('finish_date'))
+    status = normalize_status(field('status'), finish_date)
+    return Book.from_dict({
+        'title': title,
+        'author': field('author'),
+        'status': status,
+        'notes': field('notes'),
+        'add_date': normalize_date(field('add_date')) or date.today().isoformat(),
+        'start_date': normalize_date(field('start_date')) if status != "想读" else None,
+        'finish_date': finish_date if status == "已读" else None,
+    })
+
+def read_import_file(path, file_format=None, exists=None):
+    """读取并校验导出文件，跳过exists(dedupe_key)为真（书库中已有）的书和文件中重复的行，返回ImportResult"""
+    result = ImportResult()
+    seen = set()
+    columns_by_keys = {}  # CSV只有一种表头；JSON每条记录的键可能不同
+    for line_number, row in iter_rows(path, file_format):
+        keys = tuple(row) if isinstance(row, dict) else ()
+        columns = columns_by_keys.get(keys)
+        if columns is None:
+            columns = columns_by_keys[keys] = resolve_columns(keys)
+        try:
+            book = parse_row(row, columns)
+        except ValueError as e:
+            result.add_error(line_number, str(e))
+            continue
+        key = dedupe_key(book.title, book.author)
+        if key in seen or (exists is not None and exists(key)):
+            result.duplicates += 1
+            continue
+        seen.add(key)
+        result.books.append(book)
+    return result
+
+@instrumented('import_books')
+def import_books(manager, path, file_format=None, dry_run=False):
+    """把导出文件导入书库：全部读完并校验后一次性批量写入，返回ImportResult
+    
+    文件读取出错时抛出异常，此时书库不会有任何修改。
+    """
+    result = read_import_file(path, file_format,
+                              lambda key: bool(manager.duplicate_index.find_key(key)))
+    if not dry_run and result.books:
+        result.committed = manager.add_books(result.books)
+    log(f"从 {path} {result.summary()}")
+    return result
@@ -0,0 +1,101 @@
+"""分批建立、随书籍变更事件增量更新的内存索引，搜索、查重、统计和快速筛选共用"""
+from .models import BookEvent
+from .report import log
+
+class IncrementalIndex:
+    """分批建立（或首次查询时建立），之后随书籍变更事件增量更新的索引
+    
+    子类实现_clear()、_add(book)、_remove(book_id)和_contains(book_id)，
+    按需设置BUILD_BATCH_SIZE、BUILD_WITH_NOTES并覆盖_built_message()。
+    尚未开始建立时忽略书籍变更事件；建立期间的事件直接作用于已建立的部分，分批读取时跳过这些书籍。
+    """
+    BUILD_BATCH_SIZE = 2000
+    BUILD_WITH_NOTES = False  # 建立时是否读取笔记
+    
+    def __init__(self, book_manager):
+        self.book_manager = book_manager
+        self.built = False
+        self._builder = None  # 正在进行的分批建立
+        self._waiting = []    # 建立完成后要调用的函数
+        self._clear()
+        book_manager.subscribe(self.on_book_event)
+    
+    def _clear(self):
+        """清空索引"""
+        raise NotImplementedError
+    
+    def _add(self, book):
+        """把一本书加入索引"""
+        raise NotImplementedError
+    
+    def _remove(self, book_id):
+        """把一本书移出索引，不在索引中时忽略"""
+        raise NotImplementedError
+    
+    def _contains(self, book_id):
+        """书籍是否已在索引中"""
+        raise NotImplementedError
+    
+    def _built_message(self):
+        """建立完成时写入日志的内容，None表示不写日志"""
+        return None
+    
+    def build(self):
+        """建立索引（已在分批建立时完成剩余部分）"""
+        for _ in self.build_iter():
+            pass
+    
+    def build_iter(self, batch_size=None):
+        """分批建立索引，每批产出进度(0~1)；与build()共用同一个进行中的建立过程"""
+        if self.built:
+            return iter(())
+        if self._builder is None:
+            self._builder = self._build_batches(batch_size or self.BUILD_BATCH_SIZE)
+        return self._builder
+    
+    def when_built(self, callback):
+        """索引建立完成后调用callback，已建立时立即调用；本身不推进建立"""
+        if self.built:
+            callback()
+        else:
+            self._waiting.append(callback)
+    
+    def _build_batches(self, batch_size):
+        self._clear()
+        builder = self._builder
+        book_ids = self.book_manager.get_book_ids()
+        for start in range(0, len(book_ids), batch_size):
+            for book in self.book_manager.get_books(book_ids[start:start + batch_size],
+                                                    with_notes=self.BUILD_WITH_NOTES):
+                # 建立期间发生修改的书籍已由事件加入
+                if not self._contains(book.id):
+                    self._add(book)
+            yield min((start + batch_size) / len(book_ids), 1.0)
+            if self._builder is not builder:
+                return  # 数据已整体重新加载，本次建立作废
+        self.built = True
+        self._builder = None
+        message = self._built_message()
+        if message:
+            log(message)
+        waiting, self._waiting = self._waiting, []
+        for callback in waiting:
+            callback()
+    
+    def on_book_event(self, event):
+        """随书籍变更增量更新索引，尚未开始建立时忽略"""
+        if not self.built and self._builder is None:
+            return
+        if event.kind in (BookEvent.ADDED, BookEvent.UPDATED):
+            self._remove(event.book_id)
+            self._add(event.book)
+        elif event.kind == BookEvent.REMOVED:
+            self._remove(event.book_id)
+        elif event.kind == BookEvent.LOADED:
+            for book in event.books:
+                self._remove(book.id)
+                self._add(book)
+        elif event.kind == BookEvent.RELOADED:
+            self.built = False
+            self._builder = None
+            self._clear()
@@ -0,0 +1,170 @@
+"""可选的耗时记录和性能分析，用于排查界面"卡住"等问题
+
+默认关闭，关闭时被记录的函数只多一次布尔判断。可以用环境变量开启：
+- BOOK_RECORD_INSTRUMENT=1：记录加载、保存、列表和统计刷新等操作的耗时
+- BOOK_RECORD_PROFILE=文件路径：启动时开始cProfile性能分析，退出时保存到该文件（可用 python -m pstats 查看）
+图形界面也可以在"帮助"菜单中开关，并查看诊断信息。
+
+每种操作保留最近HISTOGRAM_WINDOW次耗时的滚动直方图，另保留最近RECENT_OPERATION_LIMIT次操作，
+用于列出最慢的操作；超过SLOW_OPERATION_THRESHOLD的操作会写入日志。
+"""
+import atexit
+import functools
+import heapq
+import os
+import threading
+import time
+from collections import deque
+
+from .report import log
+
+INSTRUMENT_ENV = 'BOOK_RECORD_INSTRUMENT'
+PROFILE_ENV = 'BOOK_RECORD_PROFILE'
+
+# 直方图分段上限（毫秒），最后一段为无上限
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+# 每种操作的直方图统计最近多少次
+HISTOGRAM_WINDOW = 500
+
+# 保留最近多少次操作用于列出最慢的操作
+RECENT_OPERATION_LIMIT = 1000
+
+# 超过该耗时（秒）的操作写入日志
+SLOW_OPERATION_THRESHOLD = 0.1
+
+class RollingHistogram:
+    """一种操作最近若干次耗时的滚动直方图，新样本挤出最旧的样本时同步调整分段计数"""
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self.samples = deque(maxlen=window)  # 耗时（毫秒）
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.total_count = 0                 # 开启记录以来的总次数
+    
+    @staticmethod
+    def bucket_of(milliseconds):
+        """耗时所在的分段"""
+        for index, upper in enumerate(HISTOGRAM_BUCKETS):
+            if milliseconds <= upper:
+                return index
+        return len(HISTOGRAM_BUCKETS)
+    
+    def add(self, milliseconds):
+        """加入一次耗时"""
+        if len(self.samples) == self.samples.maxlen:
+            self.buckets[self.bucket_of(self.samples[0])] -= 1
+        self.samples.append(milliseconds)
+        self.buckets[self.bucket_of(milliseconds)] += 1
+        self.total_count += 1
+    
+    def summary(self):
+        """窗口内的统计：次数、平均、中位数、P95、最大（毫秒）"""
+        ordered = sorted(self.samples)
+        count = len(ordered)
+        return {
+            'total': self.total_count,
+            'count': count,
+            'mean': sum(ordered) / count,
+            'median': ordered[count // 2],
+            'p95': ordered[min(int(count * 0.95), count - 1)],
+            'max': ordered[-1],
+        }
+    
+    def bucket_counts(self):
+        """[(分段名称, 次数)]"""
+        labels = [f"≤{upper}ms" for upper in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}ms"]
+        return list(zip(labels, self.buckets))
+
+_enabled = False
+_histograms = {}                                 # 操作名 -> RollingHistogram
+_recent = deque(maxlen=RECENT_OPERATION_LIMIT)   # (耗时毫秒, 操作名, 结束时间)
+_lock = threading.Lock()  # 后台线程（快速筛选、保存）记录耗时时，界面线程可能正在读取
+_profiler = None
+
+def enable_instrumentation(enabled=True):
+    """开启或关闭耗时记录，已记录的数据保留"""
+    global _enabled
+    _enabled = bool(enabled)
+
+def is_instrumented():
+    """是否正在记录耗时"""
+    return _enabled
+
+def record(name, seconds):
+    """记录一次操作的耗时，可以在任意线程中调用"""
+    milliseconds = seconds * 1000
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = RollingHistogram()
+        histogram.add(milliseconds)
+        _recent.append((milliseconds, name, time.time()))
+    if seconds >= SLOW_OPERATION_THRESHOLD:
+        log(f"耗时较长: {name} {milliseconds:.0f} 毫秒")
+
+def instrumented(name):
+    """装饰器：开启记录时记录每次调用的耗时"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def operation_stats():
+    """各操作的统计和直方图，按窗口内总耗时从多到少：[(操作名, 统计, 直方图分段)]"""
+    with _lock:
+        rows = [(name, histogram.summary(), histogram.bucket_counts())
+                for name, histogram in _histograms.items() if histogram.samples]
+    rows.sort(key=lambda row: row[1]['mean'] * row[1]['count'], reverse=True)
+    return rows
+
+def slowest_operations(limit=20):
+    """最近的操作中最慢的若干次：[(耗时毫秒, 操作名, 结束时间)]"""
+    with _lock:
+        recent = list(_recent)
+    return heapq.nlargest(limit, recent)
+
+def reset_instrumentation():
+    """清空已记录的耗时"""
+    with _lock:
+        _histograms.clear()
+        _recent.clear()
+
+def is_profiling():
+    """是否正在进行cProfile性能分析"""
+    return _profiler is not None
+
+def start_profiling():
+    """开始cProfile性能分析"""
+    global _profiler
+    if _profiler is not None:
+        return
+    import cProfile
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+def stop_profiling(path):
+    """停止性能分析并保存到path（pstats格式），未在分析时返回False"""
+    global _profiler
+    if _profiler is None:
+        return False
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    profiler.dump_stats(path)
+    log(f"性能分析已保存: {path}")
+    return True
+
+def configure_from_environment():
+    """按环境变量开启耗时记录和性能分析"""
+    if os.environ.get(INSTRUMENT_ENV, '').strip() not in ('', '0'):
+        enable_instrumentation()
+    profile_path = os.environ.get(PROFILE_ENV, '').strip()
+    if profile_path and not is_profiling():
+        start_profiling()
+        atexit.register(stop_profiling, os.path.abspath(profile_path))
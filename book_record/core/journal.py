@@ -0,0 +1,180 @@
+"""追加写日志和后台写盘线程"""
+import json
+import os
+import threading
+
+from .report import log
+
+# 日志（追加写）模式设置
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_COMPACT_THRESHOLD = 500  # 日志记录达到该数量时在后台压缩回快照
+SAVE_COALESCE_DELAY = 0.2        # 后台写盘前等待合并后续修改的时间（秒）
+
+class SaveWorker:
+    """后台写盘线程：短时间内的多次修改合并为一次写入，界面线程不等待磁盘I/O"""
+    def __init__(self, delay=SAVE_COALESCE_DELAY):
+        self.delay = delay
+        self.last_error = None
+        self._jobs = {}           # 待执行的写盘函数（按提交顺序，同一函数只保留一次）
+        self._cond = threading.Condition()
+        self._busy = False
+        self._urgent = False      # flush()等待中，不再等待合并
+        self._closed = False
+        self._thread = None
+    
+    def schedule(self, job):
+        """提交写盘函数，稍后在后台线程中执行；未执行前重复提交只执行一次"""
+        with self._cond:
+            self._jobs[job] = None
+            if self._thread is None:
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name="save-worker", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+    
+    def _run(self):
+        with self._cond:
+            while True:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                # 等待一小段时间，让随后到来的修改合并到同一次写入中
+                self._cond.wait_for(lambda: self._urgent or self._closed, timeout=self.delay)
+                jobs = list(self._jobs)
+                self._jobs.clear()
+                self._busy = True
+                self._cond.release()
+                try:
+                    for job in jobs:
+                        try:
+                            job()
+                        except Exception as e:
+                            log(f"后台保存时出错: {e}")
+                            self.last_error = e
+                finally:
+                    self._cond.acquire()
+                    self._busy = False
+                    self._cond.notify_all()
+    
+    def flush(self):
+        """立即执行所有待写入的函数并等待完成"""
+        with self._cond:
+            if self._thread is None:
+                return
+            self._urgent = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._jobs and not self._busy)
+            self._urgent = False
+    
+    def close(self):
+        """写完所有待写入的内容后结束后台线程"""
+        self.flush()
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._closed = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+
+class BookJournal:
+    """追加写日志：每次增删改只追加一行紧凑记录，由快照 + 日志重放得到完整数据"""
+    def __init__(self, path, worker=None):
+        self.path = path
+        self.compacting_path = path + '.compacting'
+        self.record_count = 0
+        self.worker = worker   # 有后台写盘线程时记录先缓冲，由后台线程合并写入
+        self.before_write = None  # 写入记录前调用，如先写入记录引用的笔记文件
+        self._pending = []     # 尚未写入文件的记录行
+        self._lock = threading.RLock()
+        self._file = None
+    
+    def open(self):
+        """以追加方式打开日志文件"""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+    
+    def close(self):
+        """写入缓冲的记录并关闭日志文件"""
+        with self._lock:
+            self.write_pending()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def append(self, record):
+        """追加一条记录：有后台写盘线程时稍后合并落盘，否则立即落盘"""
+        with self._lock:
+            self._pending.append(encode_journal_record(record))
+            self.record_count += 1
+        if self.worker is not None:
+            self.worker.schedule(self.write_pending)
+        else:
+            self.write_pending()
+    
+    def write_pending(self):
+        """把缓冲的记录一次写入日志并落盘，失败时保留以便重试"""
+        with self._lock:
+            if not self._pending:
+                return
+            if self.before_write is not None:
+                self.before_write()
+            self.open()
+            self._file.write(''.join(self._pending))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending.clear()
+    
+    def rotate(self):
+        """将当前日志改名为压缩中日志，并开始一个新的空日志"""
+        with self._lock:
+            self.close()
+            if os.path.exists(self.path):
+                os.replace(self.path, self.compacting_path)
+            self.record_count = 0
+            self.open()
+    
+    def reset(self):
+        """清空日志（快照已包含全部记录）"""
+        with self._lock:
+            self.close()
+            with open(self.path, 'w', encoding='utf-8'):
+                pass
+            self.record_count = 0
+            self.open()
+
+def encode_journal_record(record):
+    """将日志记录编码为单行紧凑JSON"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+def append_checkpoint(path, digest):
+    """在日志末尾写入检查点，标记其之前的记录已包含在摘要为digest的快照中"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(encode_journal_record({'op': 'checkpoint', 'digest': digest}))
+        f.flush()
+        os.fsync(f.fileno())
+
+def read_journal(path):
+    """读取日志文件中的全部记录，忽略崩溃时写了一半的末行"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                log(f"忽略损坏的日志记录: {line[:80]}")
+    return records
+
+def records_after_checkpoint(records, snapshot_digest):
+    """返回快照之后尚未包含的日志记录"""
+    for i in range(len(records) - 1, -1, -1):
+        record = records[i]
+        if record.get('op') == 'checkpoint' and record.get('digest') == snapshot_digest:
+            return records[i + 1:]
+    return [record for record in records if record.get('op') != 'checkpoint']
@@ -0,0 +1,230 @@
+"""书籍数据管理器：界面和命令行共用的数据入口"""
+import os
+
+from .dedupe import DuplicateIndex
+from .history import HISTORY_SUFFIX, NotesHistory
+from .instrument import instrumented
+from .journal import SaveWorker
+from .models import BookEvent, get_finish_year
+from .report import log
+from .search import SEARCH_RESULT_LIMIT, SearchIndex
+from .stats import ReadingStats
+from .storage import STREAM_BATCH_SIZE, STORAGE_BACKENDS, DEFAULT_STORAGE, get_data_dir
+
+# iter_books()每次取出的书籍数量
+ITER_CHUNK_SIZE = 1000
+
+class BookManager:
+    """书籍数据管理器"""
+    def __init__(self, data_file=None, storage=DEFAULT_STORAGE, use_journal=True, load=True):
+        storage_class = STORAGE_BACKENDS.get(storage, STORAGE_BACKENDS[DEFAULT_STORAGE])
+        self.data_file = os.path.join(get_data_dir(), data_file or storage_class.default_file)
+        
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+        
+        self.storage = storage_class(self.data_file, use_journal=use_journal)
+        # 笔记历史由单独的后台线程写入，增删改时界面线程不读写历史文件
+        self.notes_history = NotesHistory(self.data_file + HISTORY_SUFFIX, SaveWorker())
+        self._listeners = []
+        self.search_index = SearchIndex(self)  # 先于界面订阅，界面收到事件时索引已更新
+        self.duplicate_index = DuplicateIndex(self)
+        self.reading_stats = ReadingStats(self)
+        log(f"数据文件路径: {self.data_file}")
+        log(f"文件存在: {os.path.exists(self.data_file)}")
+        # load=False时由调用方通过load_incrementally()分批加载，不支持分批加载的存储仍直接打开
+        if load or not self.storage.streaming_load:
+            self.load_data()
+        if load:
+            # load=False时加载结束由load_incrementally()记录
+            log(f"加载了 {self.count()} 本书籍")
+    
+    @property
+    def books(self):
+        """全部书籍列表"""
+        return self.storage.all_books()
+    
+    def subscribe(self, listener):
+        """订阅书籍变更，每次增删改后以BookEvent调用listener"""
+        self._listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        """取消订阅书籍变更"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, event):
+        """通知所有订阅者"""
+        for listener in list(self._listeners):
+            listener(event)
+    
+    @instrumented('add_book')
+    def add_book(self, book):
+        """添加书籍，添加后book.id为新分配的ID"""
+        self.storage.add(book)
+        if book.id is None:
+            return  # 存储未能写入（已报告错误）
+        if book.notes:
+            self.notes_history.record_later(book.id, lambda: "", book.notes)
+        log(f"添加书籍: {book.title}")
+        self._notify(BookEvent(BookEvent.ADDED, book.id, book,
+                               new_state=(book.status, get_finish_year(book))))
+    
+    @instrumented('add_books')
+    def add_books(self, books):
+        """批量添加书籍：只写一次盘，并只发出一个LOADED事件，界面整体刷新一次；不记录笔记历史"""
+        if not books or not self.storage.add_many(books):
+            return False
+        log(f"批量添加了 {len(books)} 本书籍")
+        self._notify(BookEvent(BookEvent.LOADED, None, books=books))
+        return True
+    
+    @instrumented('update_book')
+    def update_book(self, book):
+        """按ID更新书籍信息，book.notes为None时不修改笔记"""
+        old_state = self.storage.get_state(book.id)
+        if old_state is None:
+            return
+        if book.notes is not None and not self.storage.notes_equal(book.id, book.notes):
+            # 存储中仍是修改前的笔记（书籍被原地修改时也是），在后台读取并与新笔记比较
+            self.notes_history.record_later(book.id, self.storage.notes_loader(book.id), book.notes)
+        self.storage.update(book)
+        self._notify(BookEvent(BookEvent.UPDATED, book.id, book, old_state,
+                               (book.status, get_finish_year(book))))
+    
+    @instrumented('delete_book')
+    def delete_book(self, book_id):
+        """按ID删除书籍"""
+        old_state = self.storage.get_state(book_id)
+        if old_state is None:
+            return
+        self.storage.delete(book_id)
+        self.notes_history.remove(book_id)
+        self._notify(BookEvent(BookEvent.REMOVED, book_id, old_state=old_state))
+    
+    def get_book(self, book_id, with_notes=True):
+        """按ID获取书籍，不存在时返回None
+        
+        with_notes为False时存储后端可以不读取笔记（Book.notes为None），用于只显示书籍信息的场合；
+        笔记另用read_notes()分段读取。update_book()时notes为None表示不修改笔记。
+        """
+        return self.storage.get(book_id, with_notes)
+    
+    def get_notes(self, book_id):
+        """获取书籍的完整笔记，书籍不存在时返回None"""
+        return self.storage.get_notes(book_id)
+    
+    def notes_length(self, book_id):
+        """笔记的字数，不读出笔记"""
+        return self.storage.notes_length(book_id)
+    
+    def read_notes(self, book_id, start=0, length=None):
+        """分段读取笔记：从start开始的length个字（默认到结尾），长篇笔记只需读出显示的部分"""
+        if length is None:
+            length = max(self.notes_length(book_id) - start, 0)
+        return self.storage.read_notes(book_id, start, length)
+    
+    def get_notes_revisions(self, book_id):
+        """笔记的历史版本（从旧到新）：[{'rev', 'time', 'size', 'key'}]；会等待排队的历史记录写完"""
+        self.notes_history.flush()
+        return self.notes_history.revisions(book_id)
+    
+    def get_notes_revisions_later(self, book_id, callback):
+        """在后台线程中等排队的历史记录写完后读取历史版本，并以其调用callback（在后台线程中）"""
+        self.notes_history.revisions_later(book_id, callback)
+    
+    def get_notes_revision(self, book_id, rev):
+        """还原笔记的某个历史版本，版本不存在时返回None"""
+        return self.notes_history.reconstruct(book_id, rev)
+    
+    def restore_notes_revision(self, book_id, rev):
+        """把笔记恢复为某个历史版本（恢复本身也记为一个新版本），返回更新后的书籍"""
+        book = self.get_book(book_id)
+        notes = self.get_notes_revision(book_id, rev)
+        if book is None or notes is None:
+            return None
+        book.notes = notes
+        self.update_book(book)
+        return book
+    
+    def get_books(self, book_ids, with_notes=True):
+        """按ID批量获取书籍，with_notes为False时可以不读取笔记（同get_book()）"""
+        return self.storage.get_many(book_ids, with_notes)
+    
+    def iter_books(self, book_ids=None, chunk_size=ITER_CHUNK_SIZE, with_notes=True):
+        """分批读取书籍（默认为全部书籍），不一次性生成全部Book对象"""
+        if book_ids is None:
+            book_ids = self.get_book_ids()
+        for start in range(0, len(book_ids), chunk_size):
+            yield from self.get_books(book_ids[start:start + chunk_size], with_notes)
+    
+    def get_book_ids(self):
+        """获取全部书籍ID"""
+        return self.storage.book_ids()
+    
+    def count(self, status=None):
+        """统计书籍数量，status为None时统计全部"""
+        return self.storage.count(status)
+    
+    def count_by_year(self, year):
+        """统计某年份的已读书籍数量"""
+        return self.storage.count_by_year(year)
+    
+    def get_books_by_status(self, status):
+        """按状态获取书籍"""
+        return self.storage.books_by_status(status)
+    
+    def get_books_by_year(self, year):
+        """按年份获取已读书籍"""
+        return self.storage.books_by_year(year)
+    
+    def get_book_ids_by_status(self, status):
+        """按状态获取书籍ID，与get_books_by_status()顺序相同"""
+        return self.storage.book_ids_by_status(status)
+    
+    def get_book_ids_by_year(self, year):
+        """按年份获取已读书籍ID，与get_books_by_year()顺序相同"""
+        return self.storage.book_ids_by_year(year)
+    
+    def get_years(self):
+        """获取所有已读书籍的年份"""
+        return self.storage.years()
+    
+    @instrumented('search')
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, wait=True):
+        """按书名、作者、笔记全文搜索，返回按相关度排列的书籍（用于显示，不读取笔记）
+        
+        wait为False且搜索索引尚未建立完时返回None，不在调用线程中建立索引。
+        """
+        book_ids = self.search_index.search(query, limit, wait)
+        if book_ids is None:
+            return None
+        return self.get_books(book_ids, with_notes=False)
+    
+    def find_duplicates(self, title, author, exclude_id=None):
+        """查找书名和作者（忽略大小写、全半角、标点和空白）相同的书籍"""
+        return self.duplicate_index.find(title, author, exclude_id)
+    
+    @instrumented('save_data')
+    def save_data(self):
+        """保存数据到文件"""
+        self.storage.save()
+    
+    @instrumented('load_data')
+    def load_data(self):
+        """从文件加载数据"""
+        self.storage.load()
+    
+    def load_incrementally(self, batch_size=STREAM_BATCH_SIZE):
+        """分批加载数据，每批发出LOADED事件并产出加载进度(0~1)"""
+        for books, progress in self.storage.load_iter(batch_size):
+            self._notify(BookEvent(BookEvent.LOADED, None, books=books))
+            yield progress
+        if self.storage.needs_reload:
+            self._notify(BookEvent(BookEvent.RELOADED, None))
+        log(f"加载了 {self.count()} 本书籍")
+    
+    def close(self):
+        """关闭管理器，确保数据落盘"""
+        self.notes_history.close()  # 先于存储关闭，排队的记录还要读取修改前的笔记
+        self.storage.close()
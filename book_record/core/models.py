@@ -0,0 +1,169 @@
+"""书籍数据模型和变更事件"""
+import sys
+from datetime import datetime, date
+
+# 阅读状态
+BOOK_STATUSES = ["想读", "在读", "已读"]
+
+# 日期字符串与日序数的双向缓存：相同日期在所有书籍间共享同一个int/str对象
+_DATE_ORDINALS = {}
+_DATE_STRINGS = {}
+
+def pack_date(value):
+    """将'YYYY-MM-DD'日期压缩为日序数，None、空串和非标准格式原样保留"""
+    if not isinstance(value, str) or len(value) != 10:
+        return value
+    ordinal = _DATE_ORDINALS.get(value)
+    if ordinal is None:
+        try:
+            day = date.fromisoformat(value)
+        except ValueError:
+            return value
+        if day.isoformat() != value:
+            return value
+        ordinal = day.toordinal()
+        _DATE_ORDINALS[value] = ordinal
+        _DATE_STRINGS[ordinal] = value
+    return ordinal
+
+def unpack_date(value):
+    """将日序数还原为'YYYY-MM-DD'日期字符串"""
+    if not isinstance(value, int):
+        return value
+    text = _DATE_STRINGS.get(value)
+    if text is None:
+        text = date.fromordinal(value).isoformat()
+        _DATE_STRINGS[value] = text
+        _DATE_ORDINALS[text] = value
+    return text
+
+def intern_status(status):
+    """驻留状态字符串，所有书籍共享同一个对象"""
+    return sys.intern(status) if isinstance(status, str) else status
+
+class Book:
+    """书籍数据类"""
+    # 不使用实例__dict__；日期以日序数保存，状态字符串驻留共享
+    __slots__ = ('id', 'title', 'author', 'notes', '_status', '_add_date', '_start_date', '_finish_date')
+    
+    def __init__(self, title="", author="", status="想读", notes="", finish_date=None):
+        self.id = None  # 由存储后端在添加时分配，之后保持不变
+        self.title = title
+        self.author = author
+        self.status = status
+        self.notes = notes
+        self.add_date = datetime.now().strftime("%Y-%m-%d")
+        self.finish_date = finish_date
+        self.start_date = None
+        if status == "在读":
+            self.start_date = datetime.now().strftime("%Y-%m-%d")
+        elif status == "已读" and not finish_date:
+            self.finish_date = datetime.now().strftime("%Y-%m-%d")
+    
+    @property
+    def status(self):
+        return self._status
+    
+    @status.setter
+    def status(self, value):
+        self._status = intern_status(value)
+    
+    @property
+    def add_date(self):
+        return unpack_date(self._add_date)
+    
+    @add_date.setter
+    def add_date(self, value):
+        self._add_date = pack_date(value)
+    
+    @property
+    def start_date(self):
+        return unpack_date(self._start_date)
+    
+    @start_date.setter
+    def start_date(self, value):
+        self._start_date = pack_date(value)
+    
+    @property
+    def finish_date(self):
+        return unpack_date(self._finish_date)
+    
+    @finish_date.setter
+    def finish_date(self, value):
+        self._finish_date = pack_date(value)
+    
+    def to_dict(self):
+        """转换为字典，方便JSON序列化"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'author': self.author,
+            'status': self.status,
+            'notes': self.notes,
+            'add_date': self.add_date,
+            'finish_date': self.finish_date,
+            'start_date': self.start_date
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """从字典创建Book对象"""
+        book = cls.__new__(cls)  # 不调用__init__，避免为每本书生成当前日期
+        book.id = data.get('id')
+        book.title = data.get('title', '')
+        book.author = data.get('author', '')
+        book.status = data.get('status', '想读')
+        book.notes = data.get('notes', '')
+        book.add_date = data.get('add_date', '')
+        book.finish_date = data.get('finish_date')
+        book.start_date = data.get('start_date')
+        return book
+    
+    @classmethod
+    def from_packed(cls, book_id, title, author, status, notes, add_date, start_date, finish_date):
+        """从已压缩的字段直接创建Book对象（日期为日序数）"""
+        book = cls.__new__(cls)
+        book.id = book_id
+        book.title = title
+        book.author = author
+        book.notes = notes
+        book._status = status
+        book._add_date = add_date
+        book._start_date = start_date
+        book._finish_date = finish_date
+        return book
+    
+    def copy(self):
+        """复制书籍，修改副本不影响原书籍"""
+        return Book.from_packed(self.id, self.title, self.author, self._status, self.notes,
+                                self._add_date, self._start_date, self._finish_date)
+
+def parse_finish_year(status, finish_date):
+    """已读书籍的完成年份，未读完或无法解析时返回None"""
+    if status != "已读" or not finish_date:
+        return None
+    try:
+        return int(finish_date[:4])
+    except:
+        return None
+
+def get_finish_year(book):
+    """书籍的完成年份"""
+    return parse_finish_year(book.status, book.finish_date)
+
+class BookEvent:
+    """书籍变更事件，携带变更前后的状态和完成年份"""
+    ADDED = 'book_added'
+    UPDATED = 'book_updated'
+    REMOVED = 'book_removed'
+    LOADED = 'books_loaded'      # 流式加载或批量导入了一批书籍，见books
+    RELOADED = 'books_reloaded'  # 数据整体变化（如加载时重放了日志），需全部刷新
+    
+    def __init__(self, kind, book_id, book=None, old_state=(None, None), new_state=(None, None),
+                 books=None):
+        self.kind = kind
+        self.book_id = book_id
+        self.book = book  # 删除事件中为None
+        self.old_status, self.old_year = old_state
+        self.new_status, self.new_year = new_state
+        self.books = books or []
@@ -0,0 +1,123 @@
+"""内容寻址的笔记库：笔记正文与书籍数据分开保存，按需读取"""
+import hashlib
+import os
+import threading
+
+from .report import log
+
+# 笔记库目录 = 数据文件路径 + NOTES_SUFFIX
+NOTES_SUFFIX = '.notes'
+
+def notes_digest(text):
+    """笔记内容的摘要，即笔记在笔记库中的引用"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class NotesStore:
+    """笔记库：每份笔记按内容摘要保存为一个UTF-8文本文件，书籍数据中只记录摘要
+    
+    内容相同的笔记只保存一次，笔记未修改时保存书籍不需要写笔记文件。
+    有后台写盘线程时笔记先缓冲在内存中，由后台线程写入；引用笔记的日志和快照写入前须先调用write_pending()。
+    不再被引用的文件由collect()清理。
+    """
+    def __init__(self, path, worker=None):
+        self.path = path
+        self.worker = worker
+        self._lock = threading.Lock()        # 修改_pending和_recent时短暂持有，不在持有时读写文件
+        self._write_lock = threading.Lock()  # 写入和删除文件时持有
+        self._pending = {}             # 摘要 -> 尚未写入文件的笔记
+        self._recent = set()           # 上次清理以来写入或引用过的摘要，本次清理不删除
+        self._pinned = {}              # 摘要 -> 次数，稍后还要读取（如记录笔记历史）、清理时不删除的笔记
+        self._cached = (None, None)    # 最近读取的(摘要, 笔记)，分段显示同一篇笔记时不重复读文件
+    
+    def _blob_path(self, digest):
+        """笔记文件路径：按摘要前两位分目录，避免单个目录中文件过多"""
+        return os.path.join(self.path, digest[:2], digest)
+    
+    def put(self, text):
+        """保存笔记并返回其摘要：有后台写盘线程时稍后写入，否则立即写入"""
+        digest = notes_digest(text)
+        with self._lock:
+            self._recent.add(digest)
+            self._pending[digest] = text
+        if self.worker is not None:
+            self.worker.schedule(self.write_pending)
+        else:
+            self.write_pending()
+        return digest
+    
+    def pin(self, digest):
+        """保留笔记文件直到unpin()，即使已不再被书籍引用"""
+        with self._lock:
+            self._pinned[digest] = self._pinned.get(digest, 0) + 1
+    
+    def unpin(self, digest):
+        with self._lock:
+            count = self._pinned.pop(digest, 1) - 1
+            if count > 0:
+                self._pinned[digest] = count
+    
+    def write_pending(self):
+        """把缓冲的笔记写入文件并落盘，内容相同的文件已存在时不再写入；失败时保留以便重试"""
+        with self._write_lock:
+            with self._lock:
+                pending = list(self._pending.items())
+            for digest, text in pending:
+                path = self._blob_path(digest)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    # 先写临时文件再原子替换，引用笔记的记录落盘前笔记文件已完整
+                    temp_file = path + '.tmp'
+                    with open(temp_file, 'wb') as f:
+                        f.write(text.encode('utf-8'))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_file, path)
+                # 文件就绪后才移出缓冲，read()总能读到其中之一
+                with self._lock:
+                    self._pending.pop(digest, None)
+    
+    def read(self, digest):
+        """读取摘要对应的笔记，文件丢失时返回空串"""
+        text = self._pending.get(digest)
+        if text is not None:
+            return text
+        cached_digest, text = self._cached
+        if cached_digest == digest:
+            return text
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                text = f.read().decode('utf-8')
+        except FileNotFoundError:
+            log(f"笔记文件丢失: {digest}")
+            return ""
+        self._cached = (digest, text)
+        return text
+    
+    def collect(self, live_digests):
+        """删除不再被引用的笔记文件，返回删除的文件数
+        
+        live_digests()返回仍被引用的摘要集合，在开始清理后才调用，
+        因此清理期间新写入的笔记和刚被引用、尚未记入书籍数据的笔记都不会被删除。
+        """
+        with self._lock:
+            recent, self._recent = self._recent, set()
+        if not os.path.isdir(self.path):
+            return 0
+        live = live_digests() | recent
+        removed = 0
+        for entry in os.scandir(self.path):
+            if not entry.is_dir():
+                continue
+            for blob in os.scandir(entry.path):
+                if blob.name in live:
+                    continue
+                with self._write_lock:
+                    # 临时文件只在write_pending()持有锁时存在，这里看到的是上次中断留下的
+                    with self._lock:
+                        keep = blob.name in self._recent or blob.name in self._pinned
+                    if not keep:
+                        os.remove(blob.path)
+                        removed += 1
+        if removed:
+            log(f"清理了 {removed} 个不再使用的笔记文件")
+        return removed
@@ -0,0 +1,31 @@
+"""数据层的日志和错误提示
+
+默认打印到控制台；图形界面可以用set_error_handler()改为弹出对话框，
+命令行可以用set_log_handler()关闭或重定向日志。
+"""
+import sys
+
+_log_handler = print
+_error_handler = None
+
+def set_log_handler(handler):
+    """设置日志输出函数，None表示不输出"""
+    global _log_handler
+    _log_handler = handler
+
+def set_error_handler(handler):
+    """设置错误提示函数handler(标题, 内容, critical)，None表示打印到标准错误"""
+    global _error_handler
+    _error_handler = handler
+
+def log(message):
+    """输出一条日志"""
+    if _log_handler is not None:
+        _log_handler(message)
+
+def report_error(title, message, critical=False):
+    """提示需要用户注意的错误"""
+    if _error_handler is not None:
+        _error_handler(title, message, critical)
+    else:
+        print(f"{title}: {message}", file=sys.stderr)
@@ -0,0 +1,161 @@
+"""书名、作者、笔记的全文搜索"""
+import heapq
+import math
+import re
+from array import array
+
+from .indexing import IncrementalIndex
+
+# 全文搜索设置：(字段, 掩码位, 权重)
+SEARCH_FIELDS = (('title', 1, 3.0), ('author', 2, 2.0), ('notes', 4, 1.0))
+SEARCH_MASK_WEIGHTS = [sum(weight for _, bit, weight in SEARCH_FIELDS if mask & bit) for mask in range(8)]
+SEARCH_RESULT_LIMIT = 200
+
+# 搜索词：连续的中日韩文字，或英文单词/数字
+SEARCH_TOKEN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[0-9a-z]+')
+
+def tokenize(text):
+    """把文本切分为索引词：英文和数字按单词，中日韩文字取单字和相邻的二字组"""
+    terms = set()
+    for run in SEARCH_TOKEN_PATTERN.findall(text.lower()):
+        if run[0] < '\u3400':
+            terms.add(run)
+        else:
+            terms.update(run)
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+def tokenize_query(text):
+    """把查询切分为搜索词：连续的中文只取二字组（只有一个字时取单字），全部命中才算匹配"""
+    terms = []
+    for run in SEARCH_TOKEN_PATTERN.findall(text.lower()):
+        if run[0] < '\u3400' or len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return list(dict.fromkeys(terms))
+
+class SearchIndex(IncrementalIndex):
+    """书名、作者、笔记的倒排索引：分批建立（或首次搜索时建立），之后随书籍变更事件增量更新
+    
+    每本书每次建索引得到一个文档序号，倒排表中保存 (文档序号 << 3) | 字段掩码。
+    书籍修改或删除时只把旧文档标记为失效，失效条目过多时再统一清理。
+    """
+    BUILD_BATCH_SIZE = 500
+    BUILD_WITH_NOTES = True
+    
+    def _clear(self):
+        """清空索引"""
+        self._postings = {}            # 搜索词 -> array('I')
+        self._doc_books = array('q')   # 文档序号 -> 书籍ID，失效的文档为-1
+        self._doc_sizes = array('I')   # 文档序号 -> 倒排条目数
+        self._doc_of = {}              # 书籍ID -> 当前文档序号
+        self._live_entries = 0
+        self._dead_entries = 0
+    
+    def _contains(self, book_id):
+        return book_id in self._doc_of
+    
+    def _built_message(self):
+        return f"搜索索引已建立: {len(self._doc_of)} 本书籍, {len(self._postings)} 个索引词"
+    
+    def _add(self, book):
+        """为书籍建立一个新文档"""
+        term_masks = {}
+        for field, bit, _ in SEARCH_FIELDS:
+            text = getattr(book, field)
+            if text is None and field == 'notes':
+                # 事件中的书籍没有读取笔记，从存储读取
+                text = self.book_manager.get_notes(book.id)
+            for term in tokenize(text or ""):
+                term_masks[term] = term_masks.get(term, 0) | bit
+        doc = len(self._doc_books)
+        self._doc_books.append(book.id)
+        self._doc_sizes.append(len(term_masks))
+        self._doc_of[book.id] = doc
+        postings = self._postings
+        for term, mask in term_masks.items():
+            entries = postings.get(term)
+            if entries is None:
+                entries = postings[term] = array('I')
+            entries.append(doc << 3 | mask)
+        self._live_entries += len(term_masks)
+    
+    def _remove(self, book_id):
+        """将书籍的当前文档标记为失效"""
+        doc = self._doc_of.pop(book_id, None)
+        if doc is None:
+            return
+        self._doc_books[doc] = -1
+        self._live_entries -= self._doc_sizes[doc]
+        self._dead_entries += self._doc_sizes[doc]
+    
+    def _compact(self):
+        """清除失效文档：从倒排表中去掉它们的条目，存活的文档按原顺序重新编号"""
+        renumbered = [-1] * len(self._doc_books)  # 旧文档序号 -> 新文档序号，失效的为-1
+        doc_books = array('q')
+        doc_sizes = array('I')
+        for doc, book_id in enumerate(self._doc_books):
+            if book_id >= 0:
+                renumbered[doc] = len(doc_books)
+                doc_books.append(book_id)
+                doc_sizes.append(self._doc_sizes[doc])
+        for term, entries in list(self._postings.items()):
+            # 重新编号不改变文档的先后顺序，倒排条目仍然有序
+            kept = array('I', (renumbered[entry >> 3] << 3 | entry & 7 for entry in entries
+                               if renumbered[entry >> 3] >= 0))
+            if kept:
+                self._postings[term] = kept
+            else:
+                del self._postings[term]
+        self._doc_books = doc_books
+        self._doc_sizes = doc_sizes
+        self._doc_of = {book_id: doc for doc, book_id in enumerate(doc_books)}
+        self._dead_entries = 0
+    
+    def on_book_event(self, event):
+        """随书籍变更增量更新索引，失效条目过多时清理"""
+        super().on_book_event(event)
+        if self._dead_entries > max(self._live_entries, 100000):
+            self._compact()
+    
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, wait=True):
+        """搜索书籍，返回按相关度从高到低排列的书籍ID
+        
+        每个搜索词的得分为 idf × 命中字段的权重之和，书名命中高于作者，作者高于笔记；
+        idf只按存活的文档计算，被修改或删除的书籍的旧文档不影响排名。
+        索引尚未建立完时，wait为True则同步建立，为False则返回None（索引建立中）。
+        """
+        terms = tokenize_query(query)
+        if not terms:
+            return []
+        if not self.built:
+            if not wait:
+                return None
+            self.build()
+        matches = [self._postings.get(term) for term in terms]
+        if not all(matches):
+            return []
+        total = max(len(self._doc_of), 1)
+        doc_books = self._doc_books
+        scores = None
+        # 从最短的倒排表开始求交集
+        for entries in sorted(matches, key=len):
+            live = 0
+            weights = {}
+            for entry in entries:
+                doc = entry >> 3
+                if doc_books[doc] < 0:
+                    continue
+                live += 1
+                if scores is None or doc in scores:
+                    weights[doc] = SEARCH_MASK_WEIGHTS[entry & 7]
+            if not weights:
+                return []
+            idf = math.log(1 + total / live)
+            if scores is None:
+                scores = {doc: idf * weight for doc, weight in weights.items()}
+            else:
+                scores = {doc: scores[doc] + idf * weight for doc, weight in weights.items()}
+        ranked = heapq.nlargest(limit, ((score, -doc) for doc, score in scores.items()))
+        return [doc_books[-doc] for _, doc in ranked]
@@ -0,0 +1,163 @@
+"""阅读统计：按年月、作者汇总的已读数量、平均阅读天数和连续阅读月数
+
+统计结果预先汇总并随书籍变更事件增量调整，查询时不再遍历书籍。
+"""
+import heapq
+from datetime import date
+
+from .indexing import IncrementalIndex
+from .models import get_finish_year, pack_date
+
+# 统计页默认列出的作者数量
+TOP_AUTHOR_LIMIT = 10
+
+def finish_month(book):
+    """已读书籍的完成(年, 月)，无法解析时返回None"""
+    year = get_finish_year(book)
+    if year is None:
+        return None
+    try:
+        month = int(book.finish_date[5:7])
+    except ValueError:
+        return None
+    return (year, month) if 1 <= month <= 12 else None
+
+def reading_days(book):
+    """已读书籍从开始到完成的天数，缺少日期或日期颠倒时返回None"""
+    if book.status != "已读":
+        return None
+    start, finish = pack_date(book.start_date), pack_date(book.finish_date)
+    if not isinstance(start, int) or not isinstance(finish, int) or finish < start:
+        return None
+    return finish - start
+
+def month_index(year, month):
+    """(年, 月) -> 连续的月序号，相邻月份相差1"""
+    return year * 12 + month - 1
+
+def month_of(index):
+    """连续的月序号 -> (年, 月)"""
+    return None if index is None else (index // 12, index % 12 + 1)
+
+class ReadingStats(IncrementalIndex):
+    """预先汇总的阅读统计：分批建立（或首次查询时建立），之后随书籍变更事件增量更新
+    
+    每本书记住自己计入的(状态, 年份, 年月, 作者, 阅读天数)，修改或删除时先减去旧值再加上新值；
+    作者排行和连续月数由汇总结果派生，只在汇总变化后首次查询时重新计算。
+    """
+    def _clear(self):
+        """清空统计"""
+        self._contribution = {}   # 书籍ID -> 计入统计的(状态, 年份, 年月, 作者, 阅读天数)
+        self._status_counts = {}  # 状态 -> 数量
+        self._year_counts = {}    # 完成年份 -> 已读数量
+        self._month_counts = {}   # (年, 月) -> 已读数量
+        self._author_counts = {}  # 作者 -> 已读数量
+        self._days_total = 0      # 有开始和完成日期的已读书籍的阅读天数之和
+        self._days_count = 0
+        self._version = 0         # 汇总每次变化加一，派生结果按此判断是否过期
+        self._derived = {}        # 派生结果名 -> (版本, 结果)
+    
+    def _contains(self, book_id):
+        return book_id in self._contribution
+    
+    def _built_message(self):
+        return f"阅读统计已建立: {len(self._contribution)} 本书籍"
+    
+    @staticmethod
+    def _adjust(counts, key, delta):
+        """调整一项计数，减到0时删除"""
+        if key is None:
+            return
+        value = counts.get(key, 0) + delta
+        if value > 0:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+    
+    def _apply(self, contribution, delta):
+        status, year, month, author, days = contribution
+        self._adjust(self._status_counts, status, delta)
+        self._adjust(self._year_counts, year, delta)
+        self._adjust(self._month_counts, month, delta)
+        self._adjust(self._author_counts, author, delta)
+        if days is not None:
+            self._days_total += days * delta
+            self._days_count += delta
+        self._version += 1
+    
+    def _add(self, book):
+        year = get_finish_year(book)
+        author = (book.author or "").strip() if year is not None else ""
+        contribution = (book.status, year, finish_month(book), author or None, reading_days(book))
+        self._contribution[book.id] = contribution
+        self._apply(contribution, 1)
+    
+    def _remove(self, book_id):
+        contribution = self._contribution.pop(book_id, None)
+        if contribution is not None:
+            self._apply(contribution, -1)
+    
+    def _cached(self, name, compute):
+        """汇总未变化时复用派生结果"""
+        cached = self._derived.get(name)
+        if cached is None or cached[0] != self._version:
+            cached = self._derived[name] = (self._version, compute())
+        return cached[1]
+    
+    def status_counts(self):
+        """各状态的书籍数量"""
+        self.build()
+        return dict(self._status_counts)
+    
+    def year_counts(self):
+        """各完成年份的已读数量，按年份从新到旧"""
+        self.build()
+        return {year: self._year_counts[year] for year in sorted(self._year_counts, reverse=True)}
+    
+    def month_counts(self, year):
+        """某年1~12月的已读数量"""
+        self.build()
+        return [self._month_counts.get((year, month), 0) for month in range(1, 13)]
+    
+    def top_authors(self, limit=TOP_AUTHOR_LIMIT):
+        """读完书最多的作者，返回[(作者, 数量)]"""
+        self.build()
+        return self._cached(('authors', limit), lambda: heapq.nsmallest(
+            limit, self._author_counts.items(), key=lambda item: (-item[1], item[0])))
+    
+    def author_count(self):
+        """读过的作者数"""
+        self.build()
+        return len(self._author_counts)
+    
+    def average_reading_days(self):
+        """已读书籍从开始到完成的平均天数，没有可统计的书籍时返回None"""
+        self.build()
+        return self._days_total / self._days_count if self._days_count else None
+    
+    def _compute_streaks(self):
+        months = sorted(month_index(year, month) for year, month in self._month_counts)
+        longest = (0, None, None)
+        run_start = None
+        for position, index in enumerate(months):
+            if run_start is None or index != months[position - 1] + 1:
+                run_start = index
+            if index - run_start + 1 > longest[0]:
+                longest = (index - run_start + 1, run_start, index)
+        current = 0
+        if months:
+            today = date.today()
+            this_month = month_index(today.year, today.month)
+            # 本月还没读完书时，截至上个月的连续月数仍算当前连续
+            if this_month - 1 <= months[-1] <= this_month:
+                current = months[-1] - run_start + 1
+        return longest, current
+    
+    def streaks(self):
+        """连续每月都读完至少一本书的月数
+        
+        返回(最长连续月数, 最长连续的起始(年, 月), 结束(年, 月), 当前连续月数)，没有已读书籍时起止为None。
+        """
+        self.build()
+        (longest, first, last), current = self._cached('streaks', self._compute_streaks)
+        return longest, month_of(first), month_of(last), current
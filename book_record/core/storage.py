@@ -0,0 +1,1142 @@
+"""存储后端：JSON（快照 + 日志）、列式、SQLite"""
+import codecs
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from array import array
+from collections.abc import MutableMapping
+from pathlib import Path
+
+from .journal import (JOURNAL_SUFFIX, JOURNAL_COMPACT_THRESHOLD, SaveWorker, BookJournal,
+                      append_checkpoint, read_journal, records_after_checkpoint)
+from .models import BOOK_STATUSES, Book, unpack_date, intern_status, parse_finish_year, get_finish_year
+from .notes import NOTES_SUFFIX, NotesStore, notes_digest
+from .report import log, report_error
+
+# 流式加载设置
+STREAM_CHUNK_SIZE = 256 * 1024  # 每次从数据文件读取的字节数
+STREAM_BATCH_SIZE = 2000        # 每批交给界面的书籍数
+
+class JsonArrayReader:
+    """流式读取文件中的JSON数组：逐块读入并逐个解析元素，同时计算整个文件的摘要"""
+    _SEPARATORS = re.compile(r'[ \t\r\n,]*')
+    
+    def __init__(self, f, chunk_size=STREAM_CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._hasher = hashlib.sha1()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.bytes_read = 0
+        self.eof = False
+    
+    def _read(self, size):
+        """读取一块数据并解码（多字节字符被截断时可能返回空串）"""
+        chunk = self._file.read(size)
+        self.bytes_read += len(chunk)
+        self.eof = not chunk
+        self._hasher.update(chunk)
+        return self._text_decoder.decode(chunk, final=self.eof)
+    
+    def __iter__(self):
+        decoder = json.JSONDecoder()
+        buf, pos = "", 0
+        started = False
+        skip = self._SEPARATORS.match
+        while True:
+            pos = skip(buf, pos).end()
+            if pos < len(buf):
+                if not started:
+                    if buf[pos] != '[':
+                        raise json.JSONDecodeError("数据文件不是JSON数组", buf, pos)
+                    started = True
+                    pos += 1
+                    continue
+                if buf[pos] == ']':
+                    return
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if self.eof:
+                        raise
+                else:
+                    # 元素恰好在缓冲区末尾结束时可能还没读完（如数字），需再读一块确认
+                    if end < len(buf) or self.eof:
+                        yield item
+                        pos = end
+                        continue
+            elif self.eof:
+                raise json.JSONDecodeError("JSON数组不完整", buf, pos)
+            
+            # 一个元素放不下时按待解析长度加倍读取，避免超长笔记被反复解析
+            text = self._read(max(self._chunk_size, len(buf) - pos))
+            buf, pos = buf[pos:] + text, 0
+    
+    def hexdigest(self):
+        """读完剩余内容并返回整个文件的摘要"""
+        while not self.eof:
+            self._read(self._chunk_size)
+        return self._hasher.hexdigest()
+
+def get_data_dir():
+    """获取数据文件所在目录：打包后为exe所在目录，否则为主程序脚本所在目录（book_record包的上一级）"""
+    if getattr(sys, 'frozen', False):
+        # 如果是打包后的exe
+        return os.path.dirname(sys.executable)
+    # 如果是Python脚本
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class JsonStorage:
+    """JSON存储（默认）：快照 + 追加日志，书籍信息全部保存在内存中
+    
+    笔记正文保存在笔记库（见notes.py）中，快照和日志只记录笔记的摘要notes_ref，
+    内存中这些书籍的notes为None，需要时才从笔记库读取。
+    """
+    default_file = 'books_data.json'
+    streaming_load = True  # 支持load_iter()分批加载
+    
+    def __init__(self, data_file, use_journal=True, migrate_notes=True):
+        self.data_file = data_file
+        self.migrate_notes = migrate_notes  # 加载旧格式数据后在后台把笔记移到笔记库
+        self.books_by_id = self._new_book_table()  # 书籍ID -> 书籍，保持添加顺序
+        self._next_id = 1          # 下一个可分配的ID，只增不减，写入快照和删除日志，删除的ID重启后也不会复用
+        self._notes_refs = {}      # 书籍ID -> 笔记摘要，只包含笔记在笔记库中的书籍
+        self._inline_notes = {}    # 书籍ID -> 尚未存入笔记库的笔记（批量添加、旧格式数据），写快照时移入笔记库
+        self.loaded = False        # 快照和日志已全部加载
+        self.needs_reload = False
+        
+        # 二级索引：随增删改增量维护，统计和分类查询不再遍历全部书籍
+        self._indexed_keys = {}    # 书籍ID -> 建索引时的(状态, 年份)，书籍被原地修改后仍能正确移除
+        self._state_cache = {}     # 共享相同的(状态, 年份)元组
+        self._indexes = {
+            'status': {},          # 状态 -> {书籍ID: None}
+            'year': {},            # 完成年份 -> {书籍ID: None}，只包含已读书籍
+        }
+        self._unsorted = set()     # 插入顺序被打乱、读取前需要按ID重新排序的(索引, 键)
+        
+        # 日志模式下每次修改只追加一条记录，定期在后台压缩回快照
+        # 日志追加和（非日志模式下的）快照写入都交给后台线程，界面线程不等待磁盘
+        self.save_worker = SaveWorker()
+        # 笔记文件也由后台线程写入，日志记录写入前先写入它引用的笔记
+        self.notes_store = NotesStore(self.data_file + NOTES_SUFFIX, self.save_worker)
+        self.journal = BookJournal(self.data_file + JOURNAL_SUFFIX, self.save_worker) if use_journal else None
+        if self.journal is not None:
+            self.journal.before_write = self.notes_store.write_pending
+        self._compaction_thread = None
+        self._data_lock = threading.Lock()      # 修改书籍时持有，后台线程读取快照数据时不会读到一半
+        self._snapshot_lock = threading.Lock()  # 同一时间只写一个快照
+    
+    def _insert(self, book):
+        """为书籍分配ID并加入索引，调用方持有_data_lock"""
+        if book.id is None or book.id in self.books_by_id:
+            book.id = self._next_id
+        self._next_id = max(self._next_id, book.id + 1)
+        self.books_by_id[book.id] = book
+        self._index_book(book)
+    
+    def _store_notes(self, text):
+        """笔记存入笔记库，返回笔记摘要，没有笔记时返回None"""
+        if not text:
+            return None
+        return self.notes_store.put(text)
+    
+    def _detach_notes(self, book):
+        """取出要保存的书籍的笔记：(笔记摘要, 尚未存入笔记库的笔记)，book.notes为None（未读取笔记）时保持已保存的笔记"""
+        if book.notes is not None:
+            return self._store_notes(book.notes), None
+        return self._notes_refs.get(book.id), self._inline_notes.get(book.id)
+    
+    def _stored_copy(self, book, has_notes):
+        """内存中保存的书籍不含笔记：有笔记时notes为None，没有笔记时为空串，不符时保存副本"""
+        notes = None if has_notes else ""
+        if notes == book.notes:
+            return book
+        return Book.from_packed(book.id, book.title, book.author, book.status, notes,
+                                book._add_date, book._start_date, book._finish_date)
+    
+    def _set_notes(self, book_id, notes_ref, inline):
+        """记录书籍已保存的笔记（摘要或尚未存入笔记库的笔记），调用方持有_data_lock"""
+        self._notes_refs.pop(book_id, None)
+        self._inline_notes.pop(book_id, None)
+        if notes_ref is not None:
+            self._notes_refs[book_id] = notes_ref
+        elif inline:
+            self._inline_notes[book_id] = inline
+    
+    def _snapshot_record(self, book):
+        """书籍在快照和日志中的记录：笔记在笔记库中时只记录摘要
+        
+        笔记取已保存的值，书籍被原地修改了笔记、尚未update()时不会把修改写入文件。
+        """
+        record = book.to_dict()
+        del record['notes']
+        notes_ref = self._notes_refs.get(book.id)
+        if notes_ref is not None:
+            record['notes_ref'] = notes_ref
+        elif book.id in self._inline_notes:
+            record['notes'] = self._inline_notes[book.id]
+        return record
+    
+    def add(self, book):
+        """添加书籍，并为其分配ID"""
+        notes_ref = self._store_notes(book.notes)
+        with self._data_lock:
+            if book.id is None or book.id in self.books_by_id:
+                book.id = self._next_id
+            stored = self._stored_copy(book, notes_ref is not None)
+            self._insert(stored)
+            self._set_notes(book.id, notes_ref, None)
+        self._record_change({'op': 'add', 'book': self._snapshot_record(stored)})
+    
+    def add_many(self, books):
+        """批量添加书籍：不逐本记日志，全部加入后只写一次快照，返回是否成功
+        
+        笔记先保留在内存中，在后台写快照时才存入笔记库。
+        """
+        with self._data_lock:
+            for book in books:
+                notes = book.notes
+                self._insert(book)
+                stored = self._stored_copy(book, bool(notes))
+                self.books_by_id[book.id] = stored
+                self._set_notes(book.id, None, notes)
+        self._snapshot_in_background()
+        return True
+    
+    def _snapshot_in_background(self):
+        """在后台写一次快照：日志模式下连同之前的日志一起压缩进快照，切换日志失败时同步保存"""
+        if self.journal is None:
+            self.save_worker.schedule(self._write_pending_snapshot)
+            return
+        self.wait_for_compaction()
+        if not self.compact_async():
+            self.save()
+    
+    def update(self, book):
+        """更新书籍信息，book.notes为None时不修改笔记；笔记未修改时不写笔记文件"""
+        if book.id in self.books_by_id:
+            notes_ref, inline = self._detach_notes(book)
+            stored = self._stored_copy(book, notes_ref is not None or bool(inline))
+            with self._data_lock:
+                self._unindex_book(book.id)
+                self.books_by_id[book.id] = stored
+                self._set_notes(book.id, notes_ref, inline)
+                self._index_book(stored)
+            self._record_change({'op': 'update', 'book': self._snapshot_record(stored)})
+    
+    def delete(self, book_id):
+        """删除书籍"""
+        if book_id in self.books_by_id:
+            with self._data_lock:
+                self._unindex_book(book_id)
+                del self.books_by_id[book_id]
+                self._set_notes(book_id, None, None)
+            self._record_change({'op': 'delete', 'id': book_id, 'next_id': self._next_id})
+    
+    def _with_notes(self, book):
+        """有笔记时返回读入了笔记的副本，不把笔记留在内存中"""
+        if book.notes is not None:
+            return book
+        return Book.from_packed(book.id, book.title, book.author, book.status, self.get_notes(book.id),
+                                book._add_date, book._start_date, book._finish_date)
+    
+    def get(self, book_id, with_notes=True):
+        """按ID获取书籍；with_notes为False时不读取笔记库（笔记在笔记库中时Book.notes为None）"""
+        book = self.books_by_id.get(book_id)
+        if book is None or not with_notes:
+            return book
+        return self._with_notes(book)
+    
+    def get_many(self, book_ids, with_notes=True):
+        """按ID批量获取书籍，保持传入顺序"""
+        books = [self.books_by_id[book_id] for book_id in book_ids if book_id in self.books_by_id]
+        if with_notes:
+            books = [self._with_notes(book) for book in books]
+        return books
+    
+    def get_notes(self, book_id):
+        """获取书籍的笔记，书籍不存在时返回None"""
+        if book_id not in self.books_by_id:
+            return None
+        # 不看Book.notes：书籍被原地修改了笔记、尚未update()时仍返回已保存的笔记
+        notes_ref = self._notes_refs.get(book_id)
+        if notes_ref is not None:
+            return self.notes_store.read(notes_ref)
+        return self._inline_notes.get(book_id, "")
+    
+    def notes_equal(self, book_id, text):
+        """已保存的笔记是否与text相同：笔记在笔记库中时只比较摘要，不读取笔记文件"""
+        notes_ref = self._notes_refs.get(book_id)
+        if notes_ref is not None:
+            return bool(text) and notes_digest(text) == notes_ref
+        return self._inline_notes.get(book_id, "") == (text or "")
+    
+    def notes_loader(self, book_id):
+        """返回读取书籍当前已保存笔记的函数，可以稍后在后台线程中调用，之后的修改不影响其结果
+        
+        笔记在笔记库中时只记下摘要并保留文件，调用时才读取。
+        """
+        notes_ref = self._notes_refs.get(book_id)
+        if notes_ref is None:
+            notes = self._inline_notes.get(book_id, "")
+            return lambda: notes
+        self.notes_store.pin(notes_ref)
+        
+        def load():
+            try:
+                return self.notes_store.read(notes_ref)
+            finally:
+                self.notes_store.unpin(notes_ref)
+        return load
+    
+    def notes_length(self, book_id):
+        """笔记的字数"""
+        return len(self.get_notes(book_id) or "")
+    
+    def read_notes(self, book_id, start, length):
+        """读取笔记中从start开始的length个字"""
+        return (self.get_notes(book_id) or "")[start:start + length]
+    
+    def get_state(self, book_id):
+        """获取书籍已保存的(状态, 完成年份)，书籍被原地修改时仍返回修改前的值"""
+        return self._indexed_keys.get(book_id)
+    
+    def _new_book_table(self):
+        """创建保存书籍的表：书籍ID -> 书籍"""
+        return {}
+    
+    def _remember_state(self, book_id, state):
+        """记录建索引时的(状态, 年份)"""
+        self._indexed_keys[book_id] = self._state_cache.setdefault(state, state)
+    
+    def _pop_state(self, book_id):
+        """取出并删除建索引时的(状态, 年份)"""
+        return self._indexed_keys.pop(book_id)
+    
+    def book_ids(self):
+        """获取全部书籍ID"""
+        return list(self.books_by_id)
+    
+    def _add_to_bucket(self, name, key, book):
+        """把书籍放入索引桶，ID小于桶尾时标记为需要重新排序"""
+        bucket = self._indexes[name].setdefault(key, {})
+        if bucket and book.id < next(reversed(bucket)):
+            self._unsorted.add((name, key))
+        bucket[book.id] = None
+    
+    def _index_book(self, book):
+        """将书籍加入状态和年份索引"""
+        year = get_finish_year(book)
+        self._remember_state(book.id, (book.status, year))
+        self._add_to_bucket('status', book.status, book)
+        if year is not None:
+            self._add_to_bucket('year', year, book)
+    
+    def _unindex_book(self, book_id):
+        """将书籍从索引中移除"""
+        status, year = self._pop_state(book_id)
+        del self._indexes['status'][status][book_id]
+        if year is not None:
+            year_index = self._indexes['year']
+            del year_index[year][book_id]
+            if not year_index[year]:
+                del year_index[year]
+    
+    def _rebuild_indexes(self):
+        """根据全部书籍重建索引"""
+        self._indexed_keys.clear()
+        for index in self._indexes.values():
+            index.clear()
+        self._unsorted.clear()
+        for book in self.books_by_id.values():
+            self._index_book(book)
+    
+    def _bucket_ids(self, name, key):
+        """按添加顺序（ID顺序）取出索引桶中的书籍ID"""
+        index = self._indexes[name]
+        bucket = index.get(key)
+        if not bucket:
+            return []
+        if (name, key) in self._unsorted:
+            index[key] = bucket = dict.fromkeys(sorted(bucket))
+            self._unsorted.discard((name, key))
+        return list(bucket)
+    
+    def _bucket_books(self, name, key):
+        """按添加顺序（ID顺序）取出索引桶中的书籍"""
+        return [self.books_by_id[book_id] for book_id in self._bucket_ids(name, key)]
+    
+    def all_books(self):
+        """获取全部书籍（包括笔记库中的笔记）"""
+        return [self._with_notes(book) for book in self.books_by_id.values()]
+    
+    def count(self, status=None):
+        """统计书籍数量"""
+        if status is None:
+            return len(self.books_by_id)
+        return len(self._indexes['status'].get(status, ()))
+    
+    def count_by_year(self, year):
+        """统计某年份的已读书籍数量"""
+        if year == "全部":
+            return self.count("已读")
+        try:
+            return len(self._indexes['year'].get(int(year), ()))
+        except:
+            return 0
+    
+    def books_by_status(self, status):
+        """按状态获取书籍"""
+        return self._bucket_books('status', status)
+    
+    def books_by_year(self, year):
+        """按年份获取已读书籍"""
+        if year == "全部":
+            return self.books_by_status("已读")
+        try:
+            year_int = int(year)
+        except:
+            return []
+        return self._bucket_books('year', year_int)
+    
+    def book_ids_by_status(self, status):
+        """按状态获取书籍ID，不生成Book对象"""
+        return self._bucket_ids('status', status)
+    
+    def book_ids_by_year(self, year):
+        """按年份获取已读书籍ID，year为"全部"时返回全部已读书籍"""
+        if year == "全部":
+            return self.book_ids_by_status("已读")
+        try:
+            year_int = int(year)
+        except:
+            return []
+        return self._bucket_ids('year', year_int)
+    
+    def years(self):
+        """获取所有已读书籍的年份"""
+        return sorted(self._indexes['year'], reverse=True)  # 从新到旧排序
+    
+    def _record_change(self, record):
+        """记录一次修改：日志模式下追加一条记录，否则在后台重写整个文件"""
+        if self.journal is None:
+            self.save_worker.schedule(self._write_pending_snapshot)
+            return
+        try:
+            self.journal.append(record)
+        except Exception as e:
+            log(f"写入日志时出错: {e}")
+            report_error("错误", f"写入日志时出错: {e}", critical=True)
+            return
+        if self.journal.record_count >= JOURNAL_COMPACT_THRESHOLD:
+            self.compact_async()
+    
+    def _snapshot_data(self):
+        """快照记录：开头是记录下一个ID的元数据，之后是全部书籍，调用方持有_data_lock或在界面线程中"""
+        return [{'next_id': self._next_id}] + [self._snapshot_record(book) for book in self.books_by_id.values()]
+    
+    def _serialize_snapshot(self, data):
+        """序列化快照，返回内容和摘要；仍在内存中的笔记（批量添加、旧格式数据）这时存入笔记库"""
+        moved = []
+        for record in data:
+            notes = record.pop('notes', None)
+            if notes:
+                record['notes_ref'] = self.notes_store.put(notes)
+                moved.append((record['id'], notes, record['notes_ref']))
+        # 快照引用的笔记（包括刚修改、仍在缓冲中的）先落盘
+        self.notes_store.write_pending()
+        self._release_notes(moved)
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        return payload, hashlib.sha1(payload).hexdigest()
+    
+    def _release_notes(self, moved):
+        """笔记已存入笔记库、之后未被修改的书籍改为记录摘要，不再在内存中保留笔记"""
+        with self._data_lock:
+            for book_id, notes, notes_ref in moved:
+                if self._inline_notes.get(book_id) is notes:
+                    self._set_notes(book_id, notes_ref, None)
+    
+    def _collect_notes(self, data):
+        """快照写入后清理不再被引用的笔记文件"""
+        def live_digests():
+            with self._data_lock:
+                live = set(self._notes_refs.values())
+            live.update(record['notes_ref'] for record in data if 'notes_ref' in record)
+            return live
+        try:
+            self.notes_store.collect(live_digests)
+        except OSError as e:
+            log(f"清理笔记文件时出错: {e}")
+    
+    def _write_snapshot(self, payload):
+        """先写临时文件再原子替换，避免写到一半时损坏数据文件"""
+        temp_file = self.data_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.data_file)
+    
+    def _write_pending_snapshot(self):
+        """在后台线程中写入当前快照，合并期间的多次修改只写一次"""
+        with self._snapshot_lock:
+            with self._data_lock:
+                data = self._snapshot_data()
+            self._write_snapshot(self._serialize_snapshot(data)[0])
+            log(f"数据已保存到: {self.data_file}")
+            self._collect_notes(data)
+    
+    def compact_async(self):
+        """在后台线程中将日志压缩回快照，返回是否开始了压缩"""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return False
+        data = self._snapshot_data()
+        try:
+            self.journal.rotate()
+        except Exception as e:
+            log(f"切换日志文件时出错: {e}")
+            return False
+        self._compaction_thread = threading.Thread(
+            target=self._compact_worker, args=(data,), name="journal-compaction", daemon=True)
+        self._compaction_thread.start()
+        return True
+    
+    def _compact_worker(self, data):
+        """后台压缩：写检查点 -> 替换快照 -> 删除已压缩的日志"""
+        try:
+            payload, digest = self._serialize_snapshot(data)
+            append_checkpoint(self.journal.compacting_path, digest)
+            self._write_snapshot(payload)
+            os.remove(self.journal.compacting_path)
+            log(f"日志已压缩到: {self.data_file}")
+            self._collect_notes(data)
+        except Exception as e:
+            # 压缩失败时保留压缩中日志，下次加载时会重放
+            log(f"压缩日志时出错: {e}")
+    
+    def wait_for_compaction(self):
+        """等待正在进行的后台压缩完成"""
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+    
+    def save(self):
+        """保存数据到文件"""
+        try:
+            self.wait_for_compaction()
+            data = self._snapshot_data()
+            payload, digest = self._serialize_snapshot(data)
+            if self.journal is not None:
+                # 缓冲的记录必须先于检查点写入，否则会在新快照上被重复重放
+                self.journal.write_pending()
+                # 所有现存日志都写入检查点，替换快照后即使崩溃也不会重复重放
+                for path in (self.journal.compacting_path, self.journal.path):
+                    if os.path.exists(path):
+                        append_checkpoint(path, digest)
+            with self._snapshot_lock:
+                self._write_snapshot(payload)
+            if self.journal is not None:
+                if os.path.exists(self.journal.compacting_path):
+                    os.remove(self.journal.compacting_path)
+                self.journal.reset()
+            log(f"数据已保存到: {self.data_file}")
+            self._collect_notes(data)
+        except Exception as e:
+            log(f"保存数据时出错: {e}")
+            report_error("错误", f"保存数据时出错: {e}", critical=True)
+    
+    def close(self):
+        """关闭存储：写完后台线程中尚未落盘的修改，等待压缩并关闭文件"""
+        self.save_worker.close()
+        if self.save_worker.last_error is not None:
+            report_error("错误", f"后台保存时出错: {self.save_worker.last_error}", critical=True)
+        if self.journal is None:
+            if self.loaded:  # 加载中途关闭时不能用不完整的数据覆盖快照
+                self.save()
+            return
+        self.wait_for_compaction()
+        try:
+            self.journal.close()
+        except Exception as e:
+            log(f"写入日志时出错: {e}")
+            report_error("错误", f"写入日志时出错: {e}", critical=True)
+    
+    def _replay_journal(self, snapshot_digest):
+        """在快照基础上重放日志，返回重放的记录数"""
+        replayed = 0
+        for path in (self.journal.compacting_path, self.journal.path):
+            records = read_journal(path)
+            for record in records_after_checkpoint(records, snapshot_digest):
+                self._apply_record(record)
+                replayed += 1
+        return replayed
+    
+    def _apply_record(self, record):
+        """将一条日志记录应用到内存数据"""
+        op = record.get('op')
+        self._seed_next_id(record)
+        book = self._book_from_record(record['book']) if 'book' in record else None
+        if 'index' in record:
+            # 兼容按位置记录的旧日志
+            ids = list(self.books_by_id)
+            if not 0 <= record['index'] < len(ids):
+                return
+            book_id = ids[record['index']]
+        else:
+            book_id = record.get('id', book.id if book else None)
+        
+        if op == 'add':
+            self._adopt(book, record['book'].get('notes_ref'))
+        elif op == 'update' and book_id in self.books_by_id:
+            book.id = book_id
+            notes = book.notes
+            book = self._stored_copy(book, record['book'].get('notes_ref') is not None or bool(notes))
+            self._unindex_book(book_id)
+            self.books_by_id[book_id] = book
+            self._set_notes(book_id, record['book'].get('notes_ref'), notes)
+            self._index_book(book)
+        elif op == 'delete' and book_id in self.books_by_id:
+            self._unindex_book(book_id)
+            del self.books_by_id[book_id]
+            self._set_notes(book_id, None, None)
+    
+    def _book_from_record(self, item):
+        """快照或日志记录转换为Book对象，笔记在笔记库中时notes为None"""
+        book = Book.from_dict(item)
+        if 'notes_ref' in item:
+            book.notes = None
+        return book
+    
+    def _seed_next_id(self, item):
+        """按快照元数据或日志记录中的next_id推进下一个ID，返回item是否为快照元数据"""
+        next_id = item.get('next_id')
+        if isinstance(next_id, int):
+            self._next_id = max(self._next_id, next_id)
+        return 'next_id' in item and 'title' not in item
+    
+    def _adopt(self, book, notes_ref=None):
+        """加入一本已加载的书籍并建立索引，没有ID（旧数据）或ID重复时分配新ID"""
+        if not isinstance(book.id, int) or book.id in self.books_by_id:
+            book.id = self._next_id
+        self._next_id = max(self._next_id, book.id + 1)
+        notes = book.notes
+        book = self._stored_copy(book, notes_ref is not None or bool(notes))
+        self.books_by_id[book.id] = book
+        self._set_notes(book.id, notes_ref, notes)
+        self._index_book(book)
+        return book
+    
+    def _clear(self):
+        """清空内存中的书籍和索引"""
+        self.books_by_id = self._new_book_table()
+        self._next_id = 1
+        self._notes_refs.clear()
+        self._inline_notes.clear()
+        self._rebuild_indexes()
+    
+    def load(self):
+        """从文件加载数据"""
+        for _ in self.load_iter():
+            pass
+    
+    def load_iter(self, batch_size=STREAM_BATCH_SIZE):
+        """流式加载数据：逐批解析快照并建立索引，每批产出(书籍列表, 进度)，最后重放日志"""
+        self._clear()
+        self.loaded = False
+        self.needs_reload = False  # 已产出的书籍在日志重放或出错后发生了变化
+        try:
+            snapshot_digest = None
+            inline_notes = False  # 旧格式的数据文件，笔记直接保存在其中
+            if os.path.exists(self.data_file):
+                total_size = max(os.path.getsize(self.data_file), 1)
+                with open(self.data_file, 'rb') as f:
+                    reader = JsonArrayReader(f)
+                    batch = []
+                    for item in reader:
+                        if self._seed_next_id(item):
+                            continue
+                        if item.get('notes'):
+                            inline_notes = True
+                        batch.append(self._adopt(self._book_from_record(item), item.get('notes_ref')))
+                        if len(batch) >= batch_size:
+                            yield batch, min(reader.bytes_read / total_size, 1.0)
+                            batch = []
+                    if batch:
+                        yield batch, 1.0
+                    snapshot_digest = reader.hexdigest()
+                log(f"从 {self.data_file} 加载了 {len(self.books_by_id)} 本书籍")
+            else:
+                log(f"数据文件不存在，将创建新文件: {self.data_file}")
+                with open(self.data_file, 'w', encoding='utf-8') as f:
+                    json.dump([], f)
+            
+            if self.journal is not None:
+                had_compacting = os.path.exists(self.journal.compacting_path)
+                replayed = self._replay_journal(snapshot_digest)
+                if replayed:
+                    log(f"从日志重放了 {replayed} 条记录")
+                    self.needs_reload = True
+                if had_compacting:
+                    # 上次压缩未完成，立即同步压缩并清理
+                    self.save()
+                else:
+                    self.journal.record_count = replayed
+                self.journal.open()
+            self.loaded = True
+            if inline_notes and self.migrate_notes:
+                # 在后台把旧格式数据文件中的笔记移到笔记库
+                self._snapshot_in_background()
+        except json.JSONDecodeError as e:
+            log(f"JSON解析错误: {e}")
+            report_error("数据文件错误", f"数据文件格式错误，将创建新文件。\n错误: {e}")
+            with open(self.data_file, 'w', encoding='utf-8') as f:
+                json.dump([], f)
+            self._clear()
+            self.loaded = True
+            self.needs_reload = True
+        except Exception as e:
+            log(f"加载数据时出错: {e}")
+            report_error("加载错误", f"加载数据时出错: {e}")
+            self._clear()
+            self.needs_reload = True
+
+class SqliteStorage:
+    """SQLite存储：按需查询，状态、完成年份和作者上建有索引，启动时不加载全部书籍"""
+    default_file = 'books_data.db'
+    streaming_load = False  # 打开数据库很快，无需分批加载
+    
+    COLUMNS = ('title', 'author', 'status', 'notes', 'add_date', 'finish_date', 'start_date')
+    COLUMNS_WITHOUT_NOTES = tuple(column for column in COLUMNS if column != 'notes')
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL DEFAULT '',
+            author TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT '想读',
+            notes TEXT NOT NULL DEFAULT '',
+            add_date TEXT,
+            finish_date TEXT,
+            start_date TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_books_status ON books(status);
+        CREATE INDEX IF NOT EXISTS idx_books_finish_year ON books(status, substr(finish_date, 1, 4));
+        CREATE INDEX IF NOT EXISTS idx_books_author ON books(author);
+    """
+    
+    def __init__(self, data_file, use_journal=True):
+        # use_journal与JsonStorage的参数相同，但不起作用：每次修改都直接提交到数据库（WAL模式）
+        self.data_file = data_file
+        self.conn = None
+        self._total = 0  # 书籍总数，随增删维护
+        self.needs_reload = False
+        self.read_only = False  # 数据库未能正常打开，拒绝修改，避免修改只存在于内存中而丢失
+    
+    def _select(self, where="", params=(), with_notes=True):
+        """查询书籍并转换为Book对象，with_notes为False时不读取笔记列（Book.notes为None）"""
+        columns = self.COLUMNS if with_notes else self.COLUMNS_WITHOUT_NOTES
+        sql = f"SELECT id, {', '.join(columns)} FROM books {where} ORDER BY id"
+        return [self._row_to_book(row, columns) for row in self.conn.execute(sql, params)]
+    
+    def _row_to_book(self, row, columns=COLUMNS):
+        """数据库行转换为Book对象"""
+        book = Book.from_dict(dict(zip(columns, row[1:])))
+        book.id = row[0]
+        if 'notes' not in columns:
+            book.notes = None
+        return book
+    
+    def _book_values(self, book, columns=COLUMNS):
+        """Book对象转换为列值"""
+        data = book.to_dict()
+        return tuple(data[column] for column in columns)
+    
+    def _check_writable(self):
+        """只读时报告错误，返回是否可以修改"""
+        if self.read_only:
+            report_error("错误", "数据库未能正常打开，当前为只读状态，修改不会被保存。", critical=True)
+            return False
+        return True
+    
+    def _write(self, sql, params=()):
+        """执行写操作并提交"""
+        if not self._check_writable():
+            return None
+        try:
+            with self.conn:
+                return self.conn.execute(sql, params)
+        except Exception as e:
+            log(f"写入数据库时出错: {e}")
+            report_error("错误", f"写入数据库时出错: {e}", critical=True)
+            return None
+    
+    def _insert_sql(self):
+        """插入语句，id为NULL时由数据库分配"""
+        placeholders = ', '.join('?' * (len(self.COLUMNS) + 1))
+        return f"INSERT INTO books (id, {', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+    
+    def _unused_id(self, book_id):
+        """book_id未被占用时原样返回，为None或已被占用时返回None（由数据库分配新ID）"""
+        if book_id is None:
+            return None
+        row = self.conn.execute("SELECT 1 FROM books WHERE id = ?", (book_id,)).fetchone()
+        return None if row is not None else book_id
+    
+    def add(self, book):
+        """添加书籍，书籍ID即数据库行号；没有ID或ID重复时分配新ID"""
+        cursor = self._write(self._insert_sql(), (self._unused_id(book.id),) + self._book_values(book))
+        if cursor is not None:
+            book.id = cursor.lastrowid
+            self._total += 1
+    
+    def add_many(self, books):
+        """批量添加书籍，在同一个事务中插入，返回是否成功"""
+        if not self._check_writable():
+            return False
+        sql = self._insert_sql()
+        try:
+            with self.conn:
+                for book in books:
+                    values = (self._unused_id(book.id),) + self._book_values(book)
+                    book.id = self.conn.execute(sql, values).lastrowid
+        except Exception as e:
+            log(f"写入数据库时出错: {e}")
+            report_error("错误", f"写入数据库时出错: {e}", critical=True)
+            return False
+        self._total += len(books)
+        return True
+    
+    def update(self, book):
+        """更新书籍信息，book.notes为None（未读取笔记）时不修改笔记"""
+        columns = self.COLUMNS if book.notes is not None else self.COLUMNS_WITHOUT_NOTES
+        assignments = ', '.join(f"{column} = ?" for column in columns)
+        self._write(f"UPDATE books SET {assignments} WHERE id = ?",
+                    self._book_values(book, columns) + (book.id,))
+    
+    def delete(self, book_id):
+        """删除书籍"""
+        cursor = self._write("DELETE FROM books WHERE id = ?", (book_id,))
+        if cursor is not None:
+            self._total -= cursor.rowcount
+    
+    def get(self, book_id, with_notes=True):
+        """按ID获取书籍；with_notes为False时不读取笔记（Book.notes为None）"""
+        books = self._select("WHERE id = ?", (book_id,), with_notes)
+        return books[0] if books else None
+    
+    def get_many(self, book_ids, with_notes=True):
+        """按ID批量获取书籍，保持传入顺序"""
+        books = {}
+        for start in range(0, len(book_ids), 500):
+            chunk = book_ids[start:start + 500]
+            for book in self._select(f"WHERE id IN ({', '.join('?' * len(chunk))})", chunk, with_notes):
+                books[book.id] = book
+        return [books[book_id] for book_id in book_ids if book_id in books]
+    
+    def book_ids(self):
+        """获取全部书籍ID"""
+        return [row[0] for row in self.conn.execute("SELECT id FROM books ORDER BY id")]
+    
+    def get_notes(self, book_id):
+        """获取书籍的笔记，书籍不存在时返回None"""
+        row = self.conn.execute("SELECT notes FROM books WHERE id = ?", (book_id,)).fetchone()
+        return row[0] if row is not None else None
+    
+    def notes_equal(self, book_id, text):
+        """已保存的笔记是否与text相同，由数据库比较，不读出笔记"""
+        row = self.conn.execute("SELECT notes = ? FROM books WHERE id = ?", (text or "", book_id)).fetchone()
+        return bool(row and row[0])
+    
+    def notes_loader(self, book_id):
+        """返回读取书籍当前已保存笔记的函数；数据库连接只能在界面线程中使用，这里先读出笔记"""
+        notes = self.get_notes(book_id) or ""
+        return lambda: notes
+    
+    def notes_length(self, book_id):
+        """笔记的字数，由数据库计算，不读出笔记"""
+        row = self.conn.execute("SELECT length(notes) FROM books WHERE id = ?", (book_id,)).fetchone()
+        return row[0] if row is not None else 0
+    
+    def read_notes(self, book_id, start, length):
+        """读取笔记中从start开始的length个字，只从数据库取出这一段"""
+        row = self.conn.execute("SELECT substr(notes, ?, ?) FROM books WHERE id = ?",
+                                (start + 1, length, book_id)).fetchone()
+        return row[0] if row is not None else ""
+    
+    def get_state(self, book_id):
+        """获取书籍已保存的(状态, 完成年份)"""
+        row = self.conn.execute(
+            "SELECT status, finish_date FROM books WHERE id = ?", (book_id,)).fetchone()
+        if row is None:
+            return None
+        return row[0], parse_finish_year(*row)
+    
+    def all_books(self):
+        """获取全部书籍（会加载全部数据，界面不应使用）"""
+        return self._select()
+    
+    def count(self, status=None):
+        """统计书籍数量"""
+        if status is None:
+            return self._total
+        return self.conn.execute("SELECT COUNT(*) FROM books WHERE status = ?", (status,)).fetchone()[0]
+    
+    def count_by_year(self, year):
+        """统计某年份的已读书籍数量"""
+        if year == "全部":
+            return self.count("已读")
+        try:
+            year_int = int(year)
+        except:
+            return 0
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM books WHERE status = '已读' AND substr(finish_date, 1, 4) = ?",
+            (str(year_int),)).fetchone()[0]
+    
+    def books_by_status(self, status):
+        """按状态获取书籍"""
+        return self._select("WHERE status = ?", (status,))
+    
+    def books_by_year(self, year):
+        """按年份获取已读书籍"""
+        if year == "全部":
+            return self.books_by_status("已读")
+        try:
+            year_int = int(year)
+        except:
+            return []
+        return self._select("WHERE status = '已读' AND substr(finish_date, 1, 4) = ?", (str(year_int),))
+    
+    def book_ids_by_status(self, status):
+        """按状态获取书籍ID"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT id FROM books WHERE status = ? ORDER BY id", (status,))]
+    
+    def book_ids_by_year(self, year):
+        """按年份获取已读书籍ID"""
+        if year == "全部":
+            return self.book_ids_by_status("已读")
+        try:
+            year_int = int(year)
+        except:
+            return []
+        return [row[0] for row in self.conn.execute(
+            "SELECT id FROM books WHERE status = '已读' AND substr(finish_date, 1, 4) = ? ORDER BY id",
+            (str(year_int),))]
+    
+    def years(self):
+        """获取所有已读书籍的年份"""
+        years = set()
+        rows = self.conn.execute(
+            "SELECT DISTINCT substr(finish_date, 1, 4) FROM books "
+            "WHERE status = '已读' AND finish_date IS NOT NULL")
+        for (year,) in rows:
+            try:
+                years.add(int(year))
+            except:
+                continue
+        return sorted(list(years), reverse=True)  # 从新到旧排序
+    
+    def save(self):
+        """每次修改都已提交，无需额外保存"""
+        pass
+    
+    def close(self):
+        """关闭数据库连接"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    def _import_json(self, json_file):
+        """首次创建数据库时导入同目录下已有的JSON数据"""
+        storage = JsonStorage(json_file, migrate_notes=False)  # 不改写被导入的文件
+        storage.load()
+        storage.close()
+        books = storage.all_books()
+        with self.conn:
+            self.conn.executemany(
+                self._insert_sql(), ((book.id,) + self._book_values(book) for book in books))
+        log(f"从 {json_file} 导入了 {len(books)} 本书籍")
+    
+    def load(self):
+        """打开数据库，只加载书籍行号"""
+        # 只有使用SQLite存储时才需要导入sqlite3
+        import sqlite3
+        try:
+            is_new = not os.path.exists(self.data_file)
+            self.conn = sqlite3.connect(self.data_file)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(self.SCHEMA)
+            json_file = os.path.join(os.path.dirname(self.data_file), JsonStorage.default_file)
+            if is_new and os.path.exists(json_file):
+                self._import_json(json_file)
+            self._total = self.conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        except Exception as e:
+            log(f"打开数据库时出错: {e}")
+            report_error("加载错误", f"打开数据库时出错: {e}\n本次以只读方式打开，修改不会被保存。")
+            self._open_read_only(sqlite3)
+    
+    def _open_read_only(self, sqlite3):
+        """数据库未能正常打开时以只读方式打开，仍无法读取时使用空的内存数据库；两种情况都拒绝修改"""
+        self.read_only = True
+        if self.conn is not None:
+            self.conn.close()
+        try:
+            self.conn = sqlite3.connect(Path(self.data_file).absolute().as_uri() + "?mode=ro", uri=True)
+            self._total = self.conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        except Exception as e:
+            log(f"以只读方式打开数据库时出错: {e}")
+            self.conn = sqlite3.connect(":memory:")
+            self.conn.executescript(self.SCHEMA)
+            self._total = 0
+    
+    def load_iter(self, batch_size=STREAM_BATCH_SIZE):
+        """数据库按需查询，打开即可使用，不分批产出书籍；加载结束时通知订阅者重新读取"""
+        if self.conn is None:
+            self.load()
+        self.needs_reload = True
+        return iter(())
+
+class BookColumns(MutableMapping):
+    """列式书籍表：书名、作者、笔记各占一个列表，状态和日期保存在紧凑数组中，读取时才生成Book对象"""
+    # 日期列的特殊取值
+    DATE_NONE = 0
+    DATE_EMPTY = -1
+    DATE_IRREGULAR = -2  # 非标准日期，原文保存在_irregular_dates中
+    
+    def __init__(self):
+        self._row_of = {}                # 书籍ID -> 行号，按行号顺序插入
+        self._titles = []
+        self._authors = []
+        self._notes = []
+        self._statuses = array('B')      # 状态编码，对应_status_values
+        self._status_values = list(BOOK_STATUSES)
+        self._dates = {name: array('l') for name in ('add', 'start', 'finish')}
+        self._irregular_dates = {}       # (日期列, 书籍ID) -> 原始日期字符串
+        self._deleted = 0
+    
+    def _encode_status(self, status):
+        """状态转换为编码"""
+        try:
+            return self._status_values.index(status)
+        except ValueError:
+            self._status_values.append(intern_status(status))
+            return len(self._status_values) - 1
+    
+    def _encode_date(self, name, book_id, packed):
+        """压缩后的日期转换为数组中的整数"""
+        self._irregular_dates.pop((name, book_id), None)
+        if packed is None:
+            return self.DATE_NONE
+        if isinstance(packed, int):
+            return packed
+        if packed == '':
+            return self.DATE_EMPTY
+        self._irregular_dates[(name, book_id)] = packed
+        return self.DATE_IRREGULAR
+    
+    def _decode_date(self, name, book_id, value):
+        """数组中的整数还原为Book使用的日期字段"""
+        if value > 0:
+            return value
+        if value == self.DATE_EMPTY:
+            return ''
+        if value == self.DATE_IRREGULAR:
+            return self._irregular_dates[(name, book_id)]
+        return None
+    
+    def __setitem__(self, book_id, book):
+        fields = (book._add_date, book._start_date, book._finish_date)
+        row = self._row_of.get(book_id)
+        if row is None:
+            self._row_of[book_id] = len(self._titles)
+            self._titles.append(book.title)
+            self._authors.append(book.author)
+            self._notes.append(book.notes)
+            self._statuses.append(self._encode_status(book.status))
+            for name, packed in zip(self._dates, fields):
+                self._dates[name].append(self._encode_date(name, book_id, packed))
+        else:
+            self._titles[row] = book.title
+            self._authors[row] = book.author
+            self._notes[row] = book.notes
+            self._statuses[row] = self._encode_status(book.status)
+            for name, packed in zip(self._dates, fields):
+                self._dates[name][row] = self._encode_date(name, book_id, packed)
+    
+    def __getitem__(self, book_id):
+        row = self._row_of[book_id]
+        return Book.from_packed(
+            book_id, self._titles[row], self._authors[row],
+            self._status_values[self._statuses[row]], self._notes[row],
+            *(self._decode_date(name, book_id, column[row]) for name, column in self._dates.items()))
+    
+    def __delitem__(self, book_id):
+        row = self._row_of.pop(book_id)
+        self._titles[row] = self._authors[row] = self._notes[row] = None
+        for name in self._dates:
+            self._irregular_dates.pop((name, book_id), None)
+        self._deleted += 1
+        if self._deleted > 1024 and self._deleted * 4 > len(self._titles):
+            self._compact_rows()
+    
+    def __contains__(self, book_id):
+        return book_id in self._row_of
+    
+    def __iter__(self):
+        return iter(self._row_of)
+    
+    def __len__(self):
+        return len(self._row_of)
+    
+    def notes(self, book_id):
+        """直接从列中读取笔记，不生成Book对象"""
+        return self._notes[self._row_of[book_id]]
+    
+    def state(self, book_id):
+        """直接从列中读取(状态, 完成年份)，不生成Book对象"""
+        row = self._row_of[book_id]
+        status = self._status_values[self._statuses[row]]
+        finish_date = unpack_date(self._decode_date('finish', book_id, self._dates['finish'][row]))
+        return status, parse_finish_year(status, finish_date)
+    
+    def _compact_rows(self):
+        """删除较多时去掉已删除的行"""
+        live = list(self._row_of.values())
+        self._titles = [self._titles[row] for row in live]
+        self._authors = [self._authors[row] for row in live]
+        self._notes = [self._notes[row] for row in live]
+        self._statuses = array('B', (self._statuses[row] for row in live))
+        for name, column in self._dates.items():
+            self._dates[name] = array('l', (column[row] for row in live))
+        self._row_of = {book_id: row for row, book_id in enumerate(self._row_of)}
+        self._deleted = 0
+
+class ColumnarStorage(JsonStorage):
+    """列式内存存储：文件格式与JSON存储相同，内存中按列保存书籍，适合数十万本的大型书库"""
+    
+    def _new_book_table(self):
+        return BookColumns()
+    
+    def _remember_state(self, book_id, state):
+        # 列中保存的就是修改前的状态，无需额外记录
+        pass
+    
+    def _pop_state(self, book_id):
+        return self.books_by_id.state(book_id)
+    
+    def get_state(self, book_id):
+        if book_id not in self.books_by_id:
+            return None
+        return self.books_by_id.state(book_id)
+
+
+# 可选的存储后端，默认使用JSON
+STORAGE_BACKENDS = {
+    'json': JsonStorage,
+    'columnar': ColumnarStorage,
+    'sqlite': SqliteStorage,
+}
+DEFAULT_STORAGE = 'json'
@@ -0,0 +1,9 @@
+"""图形界面（PyQt5）
+
+- theme：护眼配色、字号和应用图标
+- models：书籍列表的Qt数据模型和快速筛选
+- widgets：书籍编辑对话框、年度阅读页
+- app：主窗口和入口 main()
+
+数据层book_record.core不依赖本包，只有启动图形界面时才导入PyQt5。
+"""
@@ -0,0 +1,806 @@
+"""主窗口和图形界面入口"""
+import sys
+import os
+import itertools
+import time
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                             QPushButton, QLineEdit, QLabel, QMessageBox, QGroupBox,
+                             QFormLayout, QTabWidget, QAction, QActionGroup, QProgressBar,
+                             QFileDialog, QDialog)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QPalette, QColor
+
+from ..core import (BOOK_STATUSES, BookEvent, BookManager, DEFAULT_STORAGE, configure_from_environment,
+                    detect_export_format, enable_instrumentation, export_to_file, get_finish_year,
+                    import_books, instrumented, is_instrumented, is_profiling, record, set_error_handler,
+                    start_profiling, stop_profiling)
+from .theme import EYE_PROTECTION_COLORS, FONT_MANAGER, FONT_SIZES, get_app_icon, main_window_style_sheet
+from .models import BOOK_ID_ROLE, BookListModel, QuickFilter, SearchResultModel
+from .widgets import (BookDialog, DiagnosticsDialog, NotesHistoryDialog, NotesViewer, StatisticsWidget,
+                      YearReadingWidget, create_book_list_view, show_error_dialog)
+
+# 界面分批加载数据时，每次定时器触发占用界面线程的时间上限（秒）
+LOAD_TIME_BUDGET = 0.03
+
+# 快速筛选在停止输入多少毫秒后开始
+QUICK_FILTER_DELAY = 150
+
+# 全文搜索在停止输入多少毫秒后开始（搜索在界面线程中进行，首次搜索可能需要先建立索引）
+SEARCH_DELAY = 300
+
+class BookRecordApp(QMainWindow):
+    """主应用程序窗口"""
+    def __init__(self):
+        super().__init__()
+        set_error_handler(show_error_dialog)
+        # 可通过环境变量 BOOK_RECORD_STORAGE=sqlite 切换到SQLite存储，BOOK_RECORD_DATA_FILE 指定数据文件
+        # 窗口先显示出来，第一次绘制后数据在事件循环中分批加载
+        self.book_manager = BookManager(os.environ.get('BOOK_RECORD_DATA_FILE'),
+                                        storage=os.environ.get('BOOK_RECORD_STORAGE', DEFAULT_STORAGE),
+                                        load=False)
+        self.book_manager.subscribe(self.on_book_event)
+        self.selected_book = None
+        self.loading = False
+        self.search_pending = False  # 有搜索在等待搜索索引建立完成
+        self.startup_pending = True  # 第一次绘制后还有启动工作要做
+        self.status_counts = {}  # 状态 -> 数量，随变更事件增量更新
+        self.year_counts = {}    # 完成年份 -> 数量
+        
+        self.init_ui()
+        
+        # 应用初始字体设置和护眼主题（各只做一次，书籍列表由分批加载填充，不在这里刷新）
+        self.apply_font_settings()
+        
+        self.start_loading()
+    
+    def paintEvent(self, event):
+        """第一次绘制之后再做加载数据、设置图标等启动工作，窗口尽快显示出来"""
+        super().paintEvent(event)
+        if self.startup_pending:
+            self.startup_pending = False
+            QTimer.singleShot(0, self.finish_startup)
+    
+    def finish_startup(self):
+        """窗口显示后的启动工作：设置应用程序图标（没有图标文件时需要生成），开始分批加载数据"""
+        QApplication.instance().setWindowIcon(get_app_icon())
+        if self.loading:
+            self._load_timer = self.run_incrementally(
+                self._loader, lambda progress: self.load_progress.setValue(int(progress * 100)),
+                self.finish_loading, 'load_step')
+    
+    def init_ui(self):
+        self.setWindowTitle('读书记录工具 v1.0')
+        self.setGeometry(100, 100, 1200, 1200)
+        
+        # 创建菜单栏
+        self.create_menu_bar()
+        
+        # 控件只指定字体粗细，字族和字号统一来自应用程序字体（见apply_font_settings）
+        
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        main_layout = QHBoxLayout(central_widget)
+        main_layout.setSpacing(20)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        
+        left_widget = QWidget()
+        left_widget.setObjectName("leftWidget")
+        left_layout = QVBoxLayout(left_widget)
+        left_layout.setSpacing(15)
+        
+        # 添加新书按钮 - 使用更大字体
+        self.add_button = QPushButton("📖 添加新书")
+        self.add_button.clicked.connect(self.show_add_dialog)
+        self.add_button.setMinimumHeight(45)
+        self.add_button.setFont(FONT_MANAGER.get_weight_font())
+        self.add_button.setObjectName("addButton")
+        left_layout.addWidget(self.add_button)
+        
+        # 搜索框：停止输入片刻后才搜索，不在每次按键时搜索
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("🔍 搜索书名、作者、笔记...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setMinimumHeight(36)
+        self.search_box.setObjectName("searchBox")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_box.textChanged.connect(lambda: self.search_timer.start())
+        
+        # 快速筛选框：停止输入片刻后在后台筛选三个列表
+        self.filter_box = QLineEdit()
+        self.filter_box.setPlaceholderText("⚡ 筛选书名/作者...")
+        self.filter_box.setClearButtonEnabled(True)
+        self.filter_box.setMinimumHeight(36)
+        self.filter_box.setObjectName("filterBox")
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(QUICK_FILTER_DELAY)
+        self.filter_timer.timeout.connect(self.run_quick_filter)
+        self.filter_box.textChanged.connect(lambda: self.filter_timer.start())
+        
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_box, 3)
+        search_layout.addWidget(self.filter_box, 2)
+        left_layout.addLayout(search_layout)
+        
+        # 标签页
+        self.tab_widget = QTabWidget()
+        self.tab_widget.setObjectName("tabWidget")
+        self.tab_widget.setFont(FONT_MANAGER.get_weight_font())
+        
+        # 每个列表有自己的数据模型，只读取对应状态（年份）的书籍；快速筛选同时作用于全部列表
+        self.quick_filter = QuickFilter(self.book_manager, self)
+        
+        # 想读标签页
+        self.want_read_widget = QWidget()
+        want_read_layout = QVBoxLayout(self.want_read_widget)
+        self.want_read_model = BookListModel(self.book_manager, status="想读", parent=self)
+        self.want_read_list = create_book_list_view(self.want_read_model)
+        self.want_read_list.clicked.connect(self.on_book_selected)
+        want_read_layout.addWidget(self.want_read_list)
+        self.tab_widget.addTab(self.want_read_widget, "📚 想读")
+        
+        # 在读标签页
+        self.reading_widget = QWidget()
+        reading_layout = QVBoxLayout(self.reading_widget)
+        self.reading_model = BookListModel(self.book_manager, status="在读", parent=self)
+        self.reading_list = create_book_list_view(self.reading_model)
+        self.reading_list.clicked.connect(self.on_book_selected)
+        reading_layout.addWidget(self.reading_list)
+        self.tab_widget.addTab(self.reading_widget, "📖 在读")
+        
+        # 年份查看标签页
+        self.year_reading_widget = YearReadingWidget(self.book_manager, self)
+        self.list_models = [self.want_read_model, self.reading_model, self.year_reading_widget.finished_model]
+        for model in self.list_models:
+            self.quick_filter.results_ready.connect(model.set_filter)
+        self.tab_widget.addTab(self.year_reading_widget, "📅 年份查看")
+        
+        # 阅读统计标签页
+        self.statistics_widget = StatisticsWidget(self.book_manager, self)
+        self.tab_widget.addTab(self.statistics_widget, "📈 统计")
+        
+        # 搜索结果标签页
+        self.search_model = SearchResultModel(self.book_manager, self)
+        self.search_list = create_book_list_view(self.search_model)
+        self.search_list.clicked.connect(self.on_book_selected)
+        self.search_tab_index = self.tab_widget.addTab(self.search_list, "🔍 搜索结果")
+        
+        left_layout.addWidget(self.tab_widget)
+        
+        right_widget = QWidget()
+        right_widget.setObjectName("rightWidget")
+        right_layout = QVBoxLayout(right_widget)
+        right_layout.setSpacing(15)
+        
+        # 书籍详情区域
+        detail_group = QGroupBox("📋 书籍详情")
+        detail_group.setObjectName("detailGroup")
+        detail_group.setFont(FONT_MANAGER.get_weight_font())
+        detail_layout = QFormLayout()
+        detail_layout.setSpacing(12)
+        detail_layout.setLabelAlignment(Qt.AlignRight)
+        
+        # 设置标签和值标签的字体（只指定粗细）
+        label_font = FONT_MANAGER.get_weight_font()
+        value_font = FONT_MANAGER.get_weight_font(bold=False)
+        
+        self.title_label = QLabel("")
+        self.title_label.setWordWrap(True)
+        self.title_label.setFont(value_font)
+        detail_layout.addRow(QLabel("书名:"), self.title_label)
+        
+        self.author_label = QLabel("")
+        self.author_label.setFont(value_font)
+        detail_layout.addRow(QLabel("作者:"), self.author_label)
+        
+        self.status_label = QLabel("")
+        self.status_label.setFont(value_font)
+        detail_layout.addRow(QLabel("状态:"), self.status_label)
+        
+        self.add_date_label = QLabel("")
+        self.add_date_label.setFont(value_font)
+        detail_layout.addRow(QLabel("添加日期:"), self.add_date_label)
+        
+        self.start_date_label = QLabel("")
+        self.start_date_label.setFont(value_font)
+        detail_layout.addRow(QLabel("开始日期:"), self.start_date_label)
+        
+        self.finish_date_label = QLabel("")
+        self.finish_date_label.setFont(value_font)
+        detail_layout.addRow(QLabel("完成日期:"), self.finish_date_label)
+        
+        file_info_label = QLabel(f"数据文件位置: {os.path.basename(self.book_manager.data_file)}")
+        file_info_label.setFont(label_font)
+        file_info_label.setStyleSheet("color: #666666;")
+        file_info_label.setToolTip(f"完整路径: {self.book_manager.data_file}")
+        detail_layout.addRow(QLabel("数据文件:"), file_info_label)
+        for row in range(detail_layout.rowCount()):
+            detail_layout.itemAt(row, QFormLayout.LabelRole).widget().setFont(label_font)
+        
+        detail_group.setLayout(detail_layout)
+        right_layout.addWidget(detail_group)
+        
+        # 笔记区域
+        notes_group = QGroupBox("📝 读书笔记")
+        notes_group.setObjectName("notesGroup")
+        notes_group.setFont(FONT_MANAGER.get_weight_font())
+        notes_layout = QVBoxLayout()
+        
+        self.notes_display = NotesViewer(self.book_manager)
+        self.notes_display.setMinimumHeight(200)
+        self.notes_display.setFont(value_font)
+        self.notes_display.setObjectName("notesDisplay")
+        notes_layout.addWidget(self.notes_display)
+        
+        # 长篇笔记只显示了一部分时提示
+        self.notes_progress_label = QLabel()
+        self.notes_progress_label.setFont(value_font)
+        self.notes_progress_label.setStyleSheet("color: #666666;")
+        self.notes_progress_label.hide()
+        self.notes_display.progress_changed.connect(self.show_notes_progress)
+        notes_layout.addWidget(self.notes_progress_label)
+        
+        notes_group.setLayout(notes_layout)
+        right_layout.addWidget(notes_group)
+        
+        # 操作按钮 - 使用更大字体
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(15)
+        
+        button_font = FONT_MANAGER.get_weight_font()
+        
+        self.edit_button = QPushButton("✏️ 编辑")
+        self.edit_button.clicked.connect(self.edit_book)
+        self.edit_button.setEnabled(False)
+        self.edit_button.setMinimumHeight(40)
+        self.edit_button.setMinimumWidth(120)
+        self.edit_button.setFont(button_font)
+        self.edit_button.setObjectName("editButton")
+        button_layout.addWidget(self.edit_button)
+        
+        self.history_button = QPushButton("🕘 笔记历史")
+        self.history_button.clicked.connect(self.show_notes_history)
+        self.history_button.setEnabled(False)
+        self.history_button.setMinimumHeight(40)
+        self.history_button.setMinimumWidth(120)
+        self.history_button.setFont(button_font)
+        self.history_button.setObjectName("historyButton")
+        button_layout.addWidget(self.history_button)
+        
+        self.delete_button = QPushButton("🗑️ 删除")
+        self.delete_button.clicked.connect(self.delete_book)
+        self.delete_button.setEnabled(False)
+        self.delete_button.setMinimumHeight(40)
+        self.delete_button.setMinimumWidth(120)
+        self.delete_button.setFont(button_font)
+        self.delete_button.setObjectName("deleteButton")
+        button_layout.addWidget(self.delete_button)
+        
+        right_layout.addLayout(button_layout)
+        
+        # 统计信息
+        stats_group = QGroupBox("📊 阅读统计")
+        stats_group.setObjectName("statsGroup")
+        stats_group.setFont(FONT_MANAGER.get_weight_font())
+        stats_layout = QVBoxLayout()
+        
+        stats_font = FONT_MANAGER.get_weight_font(bold=False)
+        
+        self.stats_label = QLabel("总计: 0 | 想读: 0 | 在读: 0 | 已读: 0")
+        self.stats_label.setObjectName("statsLabel")
+        self.stats_label.setAlignment(Qt.AlignCenter)
+        self.stats_label.setFont(stats_font)
+        stats_layout.addWidget(self.stats_label)
+        
+        self.year_stats_label = QLabel("年份统计: 无数据")
+        self.year_stats_label.setObjectName("yearStatsLabel")
+        self.year_stats_label.setAlignment(Qt.AlignCenter)
+        self.year_stats_label.setFont(stats_font)
+        stats_layout.addWidget(self.year_stats_label)
+        
+        # 当前字体大小显示
+        self.font_size_label = QLabel(f"当前字体大小: {FONT_MANAGER.get_font_size_name()}")
+        self.font_size_label.setAlignment(Qt.AlignCenter)
+        self.font_size_label.setFont(stats_font)
+        self.font_size_label.setStyleSheet("color: #666666;")
+        stats_layout.addWidget(self.font_size_label)
+        
+        stats_group.setLayout(stats_layout)
+        right_layout.addWidget(stats_group)
+        
+        main_layout.addWidget(left_widget, 3)
+        main_layout.addWidget(right_widget, 2)
+        
+        # 状态栏中的加载进度
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 100)
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.hide()
+        self.statusBar().addPermanentWidget(self.load_progress)
+        
+        # 统计标签显示初始的零计数
+        self.show_status_stats()
+        self.update_year_stats()
+    
+    def create_menu_bar(self):
+        """创建菜单栏"""
+        menubar = self.menuBar()
+        
+        # 文件菜单
+        file_menu = menubar.addMenu('文件')
+        
+        self.import_action = QAction('导入...', self)
+        self.import_action.setShortcut('Ctrl+I')
+        self.import_action.triggered.connect(self.show_import_dialog)
+        file_menu.addAction(self.import_action)
+        
+        self.export_action = QAction('导出...', self)
+        self.export_action.setShortcut('Ctrl+E')
+        self.export_action.triggered.connect(self.show_export_dialog)
+        file_menu.addAction(self.export_action)
+        file_menu.addSeparator()
+        
+        exit_action = QAction('退出', self)
+        exit_action.setShortcut('Ctrl+Q')
+        exit_action.triggered.connect(self.close)
+        file_menu.addAction(exit_action)
+        
+        # 视图菜单
+        view_menu = menubar.addMenu('视图')
+        
+        # 字体大小菜单
+        font_size_menu = view_menu.addMenu('字体大小')
+        
+        # 创建动作组，确保单选
+        FONT_MANAGER.font_action_group = QActionGroup(self)
+        FONT_MANAGER.font_action_group.setExclusive(True)  # 确保单选
+        
+        # 创建字体大小菜单项
+        for size_name in FONT_SIZES.keys():
+            action = QAction(size_name, self)
+            action.setCheckable(True)  # 设置为可勾选
+            action.setChecked(size_name == FONT_MANAGER.current_size)  # 默认选中当前字体大小
+            action.triggered.connect(lambda checked, name=size_name: self.change_font_size(name))
+            
+            FONT_MANAGER.font_actions[size_name] = action
+            FONT_MANAGER.font_action_group.addAction(action)
+            font_size_menu.addAction(action)
+        
+        # 帮助菜单
+        help_menu = menubar.addMenu('帮助')
+        
+        # 诊断：耗时记录和性能分析，用于排查界面卡顿
+        self.instrument_action = QAction('记录耗时', self)
+        self.instrument_action.setCheckable(True)
+        self.instrument_action.setChecked(is_instrumented())
+        self.instrument_action.toggled.connect(enable_instrumentation)
+        help_menu.addAction(self.instrument_action)
+        
+        diagnostics_action = QAction('诊断信息...', self)
+        diagnostics_action.triggered.connect(lambda: DiagnosticsDialog(self).exec_())
+        help_menu.addAction(diagnostics_action)
+        
+        self.profile_action = QAction(self)
+        self.profile_action.triggered.connect(self.toggle_profiling)
+        self.update_profile_action()
+        help_menu.addAction(self.profile_action)
+        help_menu.addSeparator()
+        
+        about_action = QAction('关于', self)
+        about_action.triggered.connect(self.show_about)
+        help_menu.addAction(about_action)
+    
+    def update_profile_action(self):
+        """按是否正在分析更新菜单文字"""
+        self.profile_action.setText('停止性能分析并保存...' if is_profiling() else '开始性能分析')
+    
+    def toggle_profiling(self):
+        """开始cProfile性能分析，或停止并保存结果"""
+        if not is_profiling():
+            start_profiling()
+            self.statusBar().showMessage("正在进行性能分析，重现卡顿后在「帮助」菜单中停止并保存", 5000)
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, "保存性能分析结果", "book_record.prof",
+                                                  "性能分析文件 (*.prof);;所有文件 (*)")
+            if not path:
+                return
+            stop_profiling(path)
+            self.statusBar().showMessage(f"性能分析已保存到: {path}", 5000)
+        self.update_profile_action()
+    
+    def change_font_size(self, size_name):
+        """改变字体大小"""
+        if FONT_MANAGER.set_font_size(size_name):
+            self.apply_font_settings()
+            self.font_size_label.setText(f"当前字体大小: {FONT_MANAGER.get_font_size_name()}")
+            # 不再显示提示消息，让用户通过查看统计面板了解当前字体大小
+    
+    @instrumented('apply_font_settings')
+    def apply_font_settings(self):
+        """应用当前字号：控件只指定了粗细，设置应用程序字体和样式表即可，不必逐个控件设置，也不重建列表"""
+        QApplication.instance().setFont(FONT_MANAGER.base_font)
+        self.set_eye_protection_theme()
+    
+    @instrumented('set_eye_protection_theme')
+    def set_eye_protection_theme(self):
+        """设置护眼主题"""
+        self.apply_style_sheet(main_window_style_sheet(FONT_MANAGER.get_font_size()))
+        
+        palette = self.palette()
+        palette.setColor(QPalette.Window, QColor(EYE_PROTECTION_COLORS['background']))
+        palette.setColor(QPalette.WindowText, QColor(EYE_PROTECTION_COLORS['text']))
+        palette.setColor(QPalette.Base, QColor(EYE_PROTECTION_COLORS['list_bg']))
+        palette.setColor(QPalette.Text, QColor(EYE_PROTECTION_COLORS['text']))
+        self.setPalette(palette)
+    
+    def apply_style_sheet(self, style_sheet):
+        """设置样式表；与当前相同时跳过，避免Qt重新解析样式表并重新应用到全部子控件"""
+        if style_sheet != self.styleSheet():
+            self.setStyleSheet(style_sheet)
+    
+    @instrumented('refresh_book_lists')
+    def refresh_book_lists(self):
+        """重新加载所有书籍列表"""
+        for model in self.list_models:
+            model.reload()
+        
+        if hasattr(self.year_reading_widget, 'refresh_year_filter'):
+            self.year_reading_widget.refresh_year_filter()
+    
+    def start_loading(self):
+        """进入加载状态，禁止修改；数据在窗口第一次绘制后分批加载（见finish_startup）"""
+        self.loading = True
+        self.add_button.setEnabled(False)
+        self.import_action.setEnabled(False)
+        self.export_action.setEnabled(False)
+        self.load_progress.setValue(0)
+        self.load_progress.show()
+        self.statusBar().showMessage("正在加载书籍...")
+        self._loader = self.book_manager.load_incrementally()
+        self._load_timer = None
+    
+    def run_incrementally(self, steps, on_step=None, on_done=None, name='incremental_step'):
+        """在事件循环中逐步执行生成器，每次定时器触发占用界面线程不超过LOAD_TIME_BUDGET
+        
+        开启耗时记录时，每次触发的耗时以name记录。
+        """
+        timer = QTimer(self)
+        
+        def run_steps():
+            start = time.perf_counter()
+            deadline = start + LOAD_TIME_BUDGET
+            for value in steps:
+                if on_step is not None:
+                    on_step(value)
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                timer.stop()
+                if on_done is not None:
+                    on_done()
+            if is_instrumented():
+                record(name, time.perf_counter() - start)
+        
+        timer.timeout.connect(run_steps)
+        timer.start(0)
+        return timer
+    
+    def finish_loading(self):
+        """加载完成，恢复修改操作，并在空闲时建立筛选、查重、统计和搜索索引"""
+        self._loader = None
+        self.loading = False
+        self.load_progress.hide()
+        self.add_button.setEnabled(True)
+        self.import_action.setEnabled(True)
+        self.export_action.setEnabled(True)
+        if self.selected_book is not None:
+            self.show_book_details()
+        self.run_search()
+        self.year_reading_widget.refresh_year_filter()
+        self.statusBar().showMessage(f"已加载 {self.book_manager.count()} 本书籍", 5000)
+        self._index_timer = self.run_incrementally(itertools.chain(
+            self.quick_filter.build_iter(), self.book_manager.duplicate_index.build_iter(),
+            self.book_manager.reading_stats.build_iter(), self.book_manager.search_index.build_iter()),
+            name='index_step')
+    
+    @instrumented('run_search')
+    def run_search(self):
+        """按搜索框内容搜索，并切换到搜索结果标签页"""
+        query = self.search_box.text().strip()
+        if not query:
+            self.search_model.set_results([])
+            return
+        if self.loading:
+            return  # 加载完成后再搜索（见finish_loading）
+        start = time.perf_counter()
+        books = self.book_manager.search(query, wait=False)
+        if books is None:
+            self.wait_for_search_index()
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self.search_model.set_results(books)
+        self.tab_widget.setCurrentIndex(self.search_tab_index)
+        self.statusBar().showMessage(f"找到 {len(books)} 本书籍（{elapsed:.1f} 毫秒）", 5000)
+    
+    def run_quick_filter(self):
+        """按筛选框内容在后台筛选书籍列表"""
+        self.quick_filter.request(self.filter_box.text())
+    
+    @instrumented('app_book_event')
+    def on_book_event(self, event):
+        """根据书籍变更事件增量调整计数"""
+        if self.filter_box.text().strip():
+            # 修改后的书籍可能进入或离开筛选结果，稍后重新筛选
+            self.filter_timer.start()
+        if (self.search_box.text().strip() and not self.loading
+                and event.kind in (BookEvent.ADDED, BookEvent.UPDATED, BookEvent.REMOVED)):
+            # 搜索结果可能受影响，重新搜索（索引已增量更新，只需几毫秒）；分批加载期间等加载完成后再搜索
+            self.refresh_search_results()
+        if event.kind == BookEvent.LOADED:
+            for book in event.books:
+                self.status_counts[book.status] = self.status_counts.get(book.status, 0) + 1
+                year = get_finish_year(book)
+                if year is not None:
+                    self.year_counts[year] = self.year_counts.get(year, 0) + 1
+            self.show_status_stats()
+            self.update_year_stats()
+            return
+        if event.kind == BookEvent.RELOADED:
+            self.update_stats()
+            return
+        for status, year, delta in ((event.old_status, event.old_year, -1),
+                                    (event.new_status, event.new_year, 1)):
+            if status is not None:
+                self.status_counts[status] = self.status_counts.get(status, 0) + delta
+            if year is not None:
+                self.year_counts[year] = self.year_counts.get(year, 0) + delta
+                if self.year_counts[year] <= 0:
+                    del self.year_counts[year]
+        if event.old_status != event.new_status:
+            self.show_status_stats()
+        if event.old_year != event.new_year:
+            self.update_year_stats()
+    
+    def refresh_search_results(self):
+        """重新执行当前搜索，不切换标签页"""
+        books = self.book_manager.search(self.search_box.text().strip(), wait=False)
+        if books is None:
+            self.wait_for_search_index()
+            return
+        self.search_model.set_results(books)
+    
+    def wait_for_search_index(self):
+        """搜索索引仍在空闲时分批建立（见finish_loading），建立完成后再搜索，不在界面线程中同步建立"""
+        self.statusBar().showMessage("正在建立搜索索引，完成后显示搜索结果...")
+        if not self.search_pending:
+            self.search_pending = True
+            self.book_manager.search_index.when_built(self.on_search_index_built)
+    
+    def on_search_index_built(self):
+        """搜索索引建立完成，执行等待中的搜索"""
+        self.search_pending = False
+        self.run_search()
+    
+    @instrumented('update_stats')
+    def update_stats(self):
+        """重新统计全部数量"""
+        self.status_counts = {status: self.book_manager.count(status) for status in BOOK_STATUSES}
+        self.year_counts = {year: self.book_manager.count_by_year(year)
+                            for year in self.book_manager.get_years()}
+        self.show_status_stats()
+        self.update_year_stats()
+    
+    @instrumented('show_status_stats')
+    def show_status_stats(self):
+        """显示各状态数量"""
+        want_read = self.status_counts.get("想读", 0)
+        reading = self.status_counts.get("在读", 0)
+        finished = self.status_counts.get("已读", 0)
+        total = sum(self.status_counts.values())
+        
+        self.stats_label.setText(f"📊 总计: {total} | 📚 想读: {want_read} | 📖 在读: {reading} | ✅ 已读: {finished}")
+    
+    @instrumented('update_year_stats')
+    def update_year_stats(self):
+        """更新年份统计信息"""
+        years = sorted(self.year_counts, reverse=True)
+        if years:
+            year_stats_text = "📅 年份统计: "
+            for i, year in enumerate(years[:3]):
+                books_count = self.year_counts[year]
+                year_stats_text += f"{year}年: {books_count}本"
+                if i < len(years[:3]) - 1:
+                    year_stats_text += " | "
+            if len(years) > 3:
+                year_stats_text += f" ... (共{len(years)}年)"
+            self.year_stats_label.setText(year_stats_text)
+        else:
+            self.year_stats_label.setText("📅 年份统计: 无已读书籍")
+    
+    def on_book_selected(self, index):
+        """书籍被选中时显示详情"""
+        # 笔记由笔记查看器分段读取，这里不读取
+        book = self.book_manager.get_book(index.data(BOOK_ID_ROLE), with_notes=False)
+        if book is not None:
+            self.selected_book = book
+            self.show_book_details()
+    
+    def on_year_book_selected(self, index):
+        """年份查看标签页中书籍被选中时显示详情"""
+        self.on_book_selected(index)
+    
+    @instrumented('show_book_details')
+    def show_book_details(self):
+        """显示书籍详情"""
+        if self.selected_book is None:
+            return
+        
+        self.title_label.setText(self.selected_book.title or "无")
+        self.author_label.setText(self.selected_book.author or "未知")
+        self.status_label.setText(self.selected_book.status)
+        self.add_date_label.setText(self.selected_book.add_date or "无")
+        self.start_date_label.setText(self.selected_book.start_date or "未开始")
+        
+        if self.selected_book.finish_date:
+            self.finish_date_label.setText(self.selected_book.finish_date)
+        else:
+            self.finish_date_label.setText("未完成" if self.selected_book.status == "已读" else "未完成")
+        
+        self.notes_display.show_notes(self.selected_book.id)
+        # 加载完成前不允许修改，避免与日志重放冲突
+        self.edit_button.setEnabled(not self.loading)
+        self.history_button.setEnabled(not self.loading)
+        self.delete_button.setEnabled(not self.loading)
+    
+    def show_notes_progress(self, loaded, total):
+        """长篇笔记未全部显示时，显示已显示的比例"""
+        if loaded < total:
+            self.notes_progress_label.setText(
+                f"已显示 {loaded}/{total} 字（{loaded / total:.0%}），向下滚动继续显示")
+            self.notes_progress_label.show()
+        else:
+            self.notes_progress_label.hide()
+    
+    def show_add_dialog(self):
+        """显示添加书籍对话框"""
+        dialog = BookDialog(self.book_manager, parent=self)
+        dialog.exec_()
+    
+    def show_import_dialog(self):
+        """从CSV/JSON导出文件批量导入书籍，全部写入后界面只刷新一次"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "导入书籍", "", "书籍导出文件 (*.csv *.json *.jsonl);;所有文件 (*)")
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = import_books(self.book_manager, path)
+        except Exception as e:
+            QMessageBox.warning(self, "导入失败", f"读取文件时出错，未导入任何书籍。\n错误: {e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        message = result.summary()
+        if result.errors:
+            details = "\n".join(f"第{line_number}行: {reason}" for line_number, reason in result.errors[:10])
+            message += f"\n\n无效的行：\n{details}"
+            if result.invalid > 10:
+                message += "\n……"
+        QMessageBox.information(self, "导入完成", message)
+    
+    def show_export_dialog(self):
+        """把全部书籍导出为CSV、JSON Lines、JSON或Markdown读书报告"""
+        filters = {
+            "CSV 文件 (*.csv)": 'csv',
+            "JSON Lines 文件 (*.jsonl)": 'jsonl',
+            "JSON 文件 (*.json)": 'json',
+            "Markdown 读书报告 (*.md)": 'markdown',
+        }
+        path, selected_filter = QFileDialog.getSaveFileName(self, "导出书籍", "books.csv", ";;".join(filters))
+        if not path:
+            return
+        export_format = filters.get(selected_filter) or detect_export_format(path)
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            count = export_to_file(self.book_manager, path, export_format)
+        except Exception as e:
+            QMessageBox.warning(self, "导出失败", f"写入文件时出错: {e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.statusBar().showMessage(f"已导出 {count} 本书籍到 {path}", 5000)
+    
+    def edit_book(self):
+        """编辑选中的书籍"""
+        if self.selected_book is not None:
+            dialog = BookDialog(self.book_manager, self.selected_book, parent=self)
+            if dialog.exec_() == QDialog.Accepted:
+                # 对话框修改的是副本，重新取得保存后的书籍
+                self.selected_book = self.book_manager.get_book(self.selected_book.id, with_notes=False)
+                self.show_book_details()
+    
+    def show_notes_history(self):
+        """查看选中书籍的笔记历史，恢复了某个版本时刷新详情"""
+        if self.selected_book is not None:
+            dialog = NotesHistoryDialog(self.book_manager, self.selected_book, parent=self)
+            dialog.exec_()
+            if dialog.restored:
+                self.show_book_details()
+    
+    def delete_book(self):
+        """删除选中的书籍"""
+        if self.selected_book is not None:
+            reply = QMessageBox.question(
+                self, 
+                '确认删除', 
+                f'确定要删除《{self.selected_book.title}》吗？',
+                QMessageBox.Yes | QMessageBox.No, 
+                QMessageBox.No
+            )
+            
+            if reply == QMessageBox.Yes:
+                self.book_manager.delete_book(self.selected_book.id)
+                self.clear_book_details()
+    
+    def show_about(self):
+        """显示关于对话框"""
+        about_text = """
+        <h2>读书记录工具 v1.0</h2>
+        <p>一个简单易用的书籍管理工具，支持记录和管理您的阅读进度。</p>
+        <p><b>功能特点：</b></p>
+        <ul>
+            <li>📖 记录想读、在读、已读的书籍</li>
+            <li>📅 按年份查看阅读记录</li>
+            <li>📝 添加读书笔记和感想</li>
+            <li>📊 统计阅读进度和数量</li>
+            <li>🎨 护眼配色方案</li>
+            <li>🔤 可调节字体大小 (8-24pt)</li>
+        </ul>
+        <p><b>数据文件：</b>书籍数据保存在程序目录的 books_data.json 文件中</p>
+        <p><b>作者：</b>AI助手</p>
+        <p><b>版本：</b>1.0</p>
+        """
+        QMessageBox.about(self, "关于读书记录工具", about_text)
+    
+    def clear_book_details(self):
+        """清空书籍详情显示"""
+        self.title_label.setText("")
+        self.author_label.setText("")
+        self.status_label.setText("")
+        self.add_date_label.setText("")
+        self.start_date_label.setText("")
+        self.finish_date_label.setText("")
+        self.notes_display.clear_notes()
+        
+        self.selected_book = None
+        self.edit_button.setEnabled(False)
+        self.history_button.setEnabled(False)
+        self.delete_button.setEnabled(False)
+    
+    def closeEvent(self, event):
+        """关闭窗口时确保数据落盘"""
+        if self.loading:
+            if self._load_timer is not None:
+                self._load_timer.stop()
+            self._loader.close()
+        self.book_manager.close()
+        event.accept()
+
+def main():
+    configure_from_environment()
+    app = QApplication(sys.argv)
+    
+    # 设置应用程序字体
+    app.setFont(FONT_MANAGER.base_font)
+    
+    window = BookRecordApp()
+    window.show()
+    sys.exit(app.exec_())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""书籍列表使用的Qt数据模型和后台快速筛选"""
+import bisect
+import threading
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal, QAbstractListModel, QModelIndex
+
+from ..core import BookEvent, IncrementalIndex, get_finish_year, instrumented
+
+# 列表模型的自定义数据角色
+BOOK_ID_ROLE = Qt.UserRole
+BOOK_STATUS_ROLE = Qt.UserRole + 1
+BOOK_YEAR_ROLE = Qt.UserRole + 2
+BOOK_FINISH_DATE_ROLE = Qt.UserRole + 3
+
+# 视图滚动到底部时每次补充加载的行数
+FETCH_BATCH_SIZE = 200
+
+class BookListModel(QAbstractListModel):
+    """一个书籍列表的数据模型：按状态（和完成年份）取得书籍ID，按需分批加载行，修改时只通知受影响的行
+    
+    每个列表有自己的ID列表，书籍较少的状态或年份不需要先加载其他书籍的行。
+    """
+    def __init__(self, book_manager, status=None, show_finish_date=False, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self.status = status  # None表示全部书籍
+        self.year = None      # None表示全部年份
+        self.show_finish_date = show_finish_date
+        self._ids = []   # 列表中的书籍ID（升序，即添加顺序）
+        self._rows = []  # 已加载行的摘要：(显示文本, 状态, 完成年份, 完成日期)
+        self.filter_ids = None  # 快速筛选结果（集合），None表示不筛选
+        self.reload()
+        self.book_manager.subscribe(self.on_book_event)
+    
+    @staticmethod
+    def _summarize(book):
+        """生成列表行摘要，不保留笔记等大字段"""
+        item_text = f"{book.title}"
+        if book.author:
+            item_text += f" - {book.author}"
+        return (item_text, book.status, get_finish_year(book), book.finish_date)
+    
+    def accepts(self, book):
+        """书籍是否属于这个列表（不考虑快速筛选）"""
+        if self.status is not None and book.status != self.status:
+            return False
+        if self.year is not None and get_finish_year(book) != self.year:
+            return False
+        return True
+    
+    def _list_ids(self):
+        """从存储的状态和年份索引取得列表中的书籍ID（升序）"""
+        if self.year is not None:
+            return self.book_manager.get_book_ids_by_year(self.year)
+        if self.status is not None:
+            return self.book_manager.get_book_ids_by_status(self.status)
+        return sorted(self.book_manager.get_book_ids())
+    
+    @instrumented('book_list_reload')
+    def reload(self):
+        """重新读取列表中的书籍ID，已加载的行全部丢弃"""
+        self.beginResetModel()
+        book_ids = self._list_ids()
+        if self.filter_ids is not None:
+            book_ids = [book_id for book_id in book_ids if book_id in self.filter_ids]
+        self._ids = book_ids
+        self._rows = []
+        self.endResetModel()
+    
+    def set_year(self, year):
+        """设置年份筛选，"全部"表示不按年份筛选"""
+        try:
+            self.year = None if year == "全部" else int(year)
+        except (TypeError, ValueError):
+            self.year = None
+        self.reload()
+    
+    def set_filter(self, book_ids, id_set=None):
+        """只显示给定的书籍（升序ID列表，可同时给出其集合），None表示不筛选"""
+        if book_ids is None:
+            self.filter_ids = None
+        else:
+            self.filter_ids = id_set if id_set is not None else set(book_ids)
+        self.reload()
+    
+    def row_summary(self, row):
+        """获取已加载行的摘要"""
+        return self._rows[row]
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def canFetchMore(self, parent):
+        return not parent.isValid() and len(self._rows) < len(self._ids)
+    
+    @instrumented('book_list_fetch')
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        start = len(self._rows)
+        batch = self._ids[start:start + FETCH_BATCH_SIZE]
+        if not batch:
+            return
+        books = self.book_manager.get_books(batch, with_notes=False)
+        self.beginInsertRows(QModelIndex(), start, start + len(books) - 1)
+        self._rows.extend(self._summarize(book) for book in books)
+        self.endInsertRows()
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        item_text, status, year, finish_date = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            if self.show_finish_date and finish_date:
+                return f"{item_text} ({finish_date})"
+            return item_text
+        if role == BOOK_ID_ROLE:
+            return self._ids[index.row()]
+        if role == BOOK_STATUS_ROLE:
+            return status
+        if role == BOOK_YEAR_ROLE:
+            return year
+        if role == BOOK_FINISH_DATE_ROLE:
+            return finish_date
+        return None
+    
+    def _find_row(self, book_id):
+        """二分查找书籍所在行，找不到返回-1"""
+        row = bisect.bisect_left(self._ids, book_id)
+        if row < len(self._ids) and self._ids[row] == book_id:
+            return row
+        return -1
+    
+    @instrumented('book_list_update')
+    def on_book_event(self, event):
+        """根据书籍变更事件更新对应的行"""
+        if event.kind == BookEvent.ADDED:
+            self.book_added(event.book)
+        elif event.kind == BookEvent.UPDATED:
+            self.book_updated(event.book)
+        elif event.kind == BookEvent.REMOVED:
+            self.book_removed(event.book_id)
+        elif event.kind == BookEvent.LOADED:
+            self.books_loaded(event.books)
+        elif event.kind == BookEvent.RELOADED:
+            self.reload()
+    
+    def books_loaded(self, books):
+        """流式加载的一批书籍：属于列表的追加到ID末尾，原先已全部显示时立即补充一批行"""
+        ids = [book.id for book in books if self.accepts(book)]
+        if self.filter_ids is not None:
+            ids = [book_id for book_id in ids if book_id in self.filter_ids]
+        if not ids:
+            return
+        if (self._ids and ids[0] <= self._ids[-1]) or ids != sorted(ids):
+            # ID不是递增追加（旧数据重新分配过ID，或列表已经重新读取过这一批），只能整体重置
+            self.reload()
+            return
+        fully_fetched = len(self._rows) == len(self._ids)
+        self._ids.extend(ids)
+        if fully_fetched:
+            self.fetchMore(QModelIndex())
+    
+    def book_added(self, book):
+        """新增书籍：落在已加载区域内时插入一行，否则等视图需要时再加载"""
+        if not self.accepts(book):
+            return
+        if self.filter_ids is not None and book.id not in self.filter_ids:
+            return  # 由重新筛选决定是否显示
+        row = bisect.bisect_left(self._ids, book.id)
+        if row < len(self._rows) or len(self._rows) == len(self._ids):
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._ids.insert(row, book.id)
+            self._rows.insert(row, self._summarize(book))
+            self.endInsertRows()
+        else:
+            self._ids.insert(row, book.id)
+    
+    def book_updated(self, book):
+        """书籍修改：只刷新对应的一行；状态或年份变化时移入或移出列表"""
+        row = self._find_row(book.id)
+        if row < 0:
+            self.book_added(book)
+        elif not self.accepts(book):
+            self.book_removed(book.id)
+        elif row < len(self._rows):
+            self._rows[row] = self._summarize(book)
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+    
+    def book_removed(self, book_id):
+        """书籍删除：只移除对应的一行"""
+        row = self._find_row(book_id)
+        if row < 0:
+            return
+        if row < len(self._rows):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._ids[row]
+            del self._rows[row]
+            self.endRemoveRows()
+        else:
+            del self._ids[row]
+
+class QuickFilterKeys(IncrementalIndex):
+    """快速筛选的匹配键：书籍ID -> "\\n书名\\n作者\\n单词..."（小写）"""
+    def _clear(self):
+        self.keys = {}
+    
+    def _contains(self, book_id):
+        return book_id in self.keys
+    
+    @staticmethod
+    def match_key(book):
+        """生成匹配用的字符串：每个可匹配的开头前都有换行符，查询时只需查找"\\n查询" """
+        title = (book.title or "").lower()
+        author = (book.author or "").lower()
+        words = title.split()[1:] + author.split()[1:]
+        return "\n" + "\n".join([title, author] + words)
+    
+    def _add(self, book):
+        self.keys[book.id] = self.match_key(book)
+    
+    def _remove(self, book_id):
+        self.keys.pop(book_id, None)
+
+class QuickFilter(QObject):
+    """列表快速筛选：书名、作者或其中任一单词以输入内容开头即匹配
+    
+    匹配在后台线程中进行，新的查询开始后旧查询会尽快放弃；
+    在上一次结果的基础上继续输入时，只在上一次的结果中查找。
+    匹配键尚未建立完时，查询先等待，匹配键在事件循环中分批建立完成后再执行。
+    """
+    results_ready = pyqtSignal(object, object)       # (匹配的升序书籍ID, 同样内容的集合)，都为None表示不筛选
+    _finished = pyqtSignal(int, str, object, object)  # 后台线程 -> 界面线程：(查询序号, 查询, ID列表, ID集合)
+    
+    def __init__(self, book_manager, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self._index = QuickFilterKeys(book_manager)  # 先于本对象订阅，收到事件时匹配键已更新
+        self._all_ids = None     # 全部书籍ID的副本，供后台线程遍历，书籍增删后重新复制
+        self._generation = 0     # 每次新查询加一，后台线程发现不一致时放弃
+        self._last = ("", None)  # 上一次完成的查询及结果
+        self._pending = None     # 等待匹配键建立完成的查询
+        self._build_timer = QTimer(self)  # 有查询等待时，每次触发建立一批匹配键
+        self._build_timer.setInterval(0)
+        self._build_timer.timeout.connect(self._build_step)
+        self._finished.connect(self._on_finished)
+        book_manager.subscribe(self.on_book_event)
+    
+    def build_iter(self, batch_size=None):
+        """分批建立匹配键，每批产出进度(0~1)；与查询时的分批建立共用同一个过程"""
+        return self._index.build_iter(batch_size)
+    
+    def on_book_event(self, event):
+        """书籍变更后之前的结果不再可复用"""
+        self._all_ids = None
+        self._last = ("", None)
+    
+    def request(self, text):
+        """开始一次查询，未完成的旧查询作废；结果通过results_ready发出"""
+        query = text.strip().lower()
+        self._generation += 1
+        if not query:
+            self._pending = None
+            self._last = ("", None)
+            self.results_ready.emit(None, None)
+            return
+        if not self._index.built:
+            # 不在界面线程中一次建完：分批建立，完成后执行最近一次的查询
+            self._pending = query
+            self._build_timer.start()
+            return
+        self._start(query)
+    
+    def _build_step(self):
+        """建立一批匹配键，全部建立后执行等待中的查询"""
+        if next(self._index.build_iter(), None) is not None or not self._index.built:
+            return  # 尚未建立完，或数据整体重新加载后需要重新建立
+        self._build_timer.stop()
+        query, self._pending = self._pending, None
+        if query is not None:
+            self._start(query)
+    
+    def _start(self, query):
+        """匹配键已建立，在后台线程中开始查询"""
+        keys = self._index.keys
+        last_query, candidates = self._last
+        if candidates is None or not query.startswith(last_query):
+            if self._all_ids is None:
+                self._all_ids = list(keys)
+            candidates = self._all_ids
+        threading.Thread(target=self._run, name="quick-filter", daemon=True,
+                         args=(self._generation, query, keys, candidates)).start()
+    
+    @instrumented('quick_filter')
+    def _run(self, generation, query, keys, candidates):
+        """后台线程：在全部书籍或上一次的结果中查找
+        
+        keys可能同时被界面线程修改，这里只做单次查找；修改后界面会重新筛选。
+        """
+        needle = "\n" + query
+        matched = []
+        for count, book_id in enumerate(candidates):
+            if not count & 4095 and generation != self._generation:
+                return  # 已有更新的查询
+            key = keys.get(book_id)
+            if key is not None and needle in key:
+                matched.append(book_id)
+        # 排序和建集合也在后台完成，界面线程只需替换结果
+        matched.sort()
+        self._finished.emit(generation, query, matched, set(matched))
+    
+    def _on_finished(self, generation, query, matched, matched_set):
+        if generation != self._generation:
+            return
+        self._last = (query, matched)
+        self.results_ready.emit(matched, matched_set)
+
+class SearchResultModel(QAbstractListModel):
+    """搜索结果列表：按相关度排列的书籍"""
+    def __init__(self, book_manager, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self._ids = []
+        self._rows = []  # (显示文本, 状态, 完成年份, 完成日期)
+    
+    @instrumented('search_results')
+    def set_results(self, books):
+        """替换全部搜索结果"""
+        self.beginResetModel()
+        self._ids = [book.id for book in books]
+        self._rows = [BookListModel._summarize(book) for book in books]
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        item_text, status, _, _ = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{item_text} [{status}]"
+        if role == BOOK_ID_ROLE:
+            return self._ids[index.row()]
+        return None
@@ -0,0 +1,488 @@
+"""护眼配色、字号、样式表和应用图标"""
+import functools
+import sys
+import os
+from PyQt5.QtCore import Qt, QPoint, QSize, QStandardPaths
+from PyQt5.QtGui import QFont, QColor, QIcon, QPixmap, QPainter, QBrush, QPen, QPolygon
+
+from ..core import get_data_dir, log
+
+# 设置护眼配色方案
+EYE_PROTECTION_COLORS = {
+    'background': '#F5F5DC',
+    'widget_bg': '#FAFAF0',
+    'text': '#2F4F4F',
+    'button_bg': '#8FBC8F',
+    'button_hover': '#7CCD7C',
+    'button_delete': '#FF7F50',
+    'button_delete_hover': '#FF6347',
+    'list_bg': '#FFFFF0',
+    'list_selected': '#EEE8AA',
+    'group_bg': '#F0F8FF',
+    'tab_bg': '#F5F5F5',
+    'tab_selected': '#E0EEE0',
+    'year_filter_bg': '#E6E6FA',
+}
+
+# 字体大小设置 - 增加更多选项
+FONT_SIZES = {
+    '8 pt': 8,
+    '9 pt': 9,
+    '10 pt': 10,
+    '11 pt': 11,
+    '12 pt': 12,  # 默认
+    '13 pt': 13,
+    '14 pt': 14,
+    '15 pt': 15,
+    '16 pt': 16,
+    '17 pt': 17,
+    '18 pt': 18,
+    '20 pt': 20,
+    '22 pt': 22,
+    '24 pt': 24,
+}
+
+# 默认字体大小
+DEFAULT_FONT_SIZE = '18 pt'
+
+# 程序生成的图标的尺寸
+ICON_SIZES = (16, 24, 32, 48, 64, 128, 256)
+
+# 生成图标的缓存版本，修改create_book_icon的画法后递增
+ICON_CACHE_VERSION = 1
+
+# 全局字体管理器
+class FontManager:
+    """字体管理器"""
+    def __init__(self):
+        self.current_size = DEFAULT_FONT_SIZE
+        self._fonts = {}  # (字号, 粗体, 倍数) -> QFont，首次使用时才创建，导入模块时不触碰Qt
+        self.font_actions = {}  # 存储字体菜单项
+        self.font_action_group = None  # 字体菜单动作组
+    
+    @property
+    def base_font(self):
+        """当前基础字体"""
+        return self.get_font()
+    
+    def get_font_size(self):
+        """获取当前字体大小"""
+        return FONT_SIZES[self.current_size]
+    
+    def get_font_size_name(self):
+        """获取当前字体大小名称"""
+        return self.current_size
+    
+    def set_font_size(self, size_name):
+        """设置字体大小"""
+        if size_name in FONT_SIZES:
+            self.current_size = size_name
+            
+            # 更新菜单项的勾选状态
+            if self.font_action_group:
+                for action_name, action in self.font_actions.items():
+                    action.setChecked(action_name == size_name)
+            
+            return True
+        return False
+    
+    def get_font(self, bold=False, size_multiplier=1.0):
+        """获取当前字号的字体，按(字号, 粗体, 倍数)缓存；返回的QFont是共享的，不要修改"""
+        key = (self.get_font_size(), bold, size_multiplier)
+        font = self._fonts.get(key)
+        if font is None:
+            font = QFont("Microsoft YaHei", int(key[0] * size_multiplier))
+            font.setBold(bold)
+            self._fonts[key] = font
+        return font
+    
+    def get_weight_font(self, bold=True):
+        """只指定粗细的字体：字族和字号继承父控件直至应用程序字体，切换字号时不必逐个控件重新设置"""
+        key = (None, bold, None)
+        font = self._fonts.get(key)
+        if font is None:
+            font = QFont()
+            font.setBold(bold)
+            self._fonts[key] = font
+        return font
+
+FONT_MANAGER = FontManager()
+
+@functools.lru_cache(maxsize=None)
+def main_window_style_sheet(font_size):
+    """主窗口的护眼样式表，按字号缓存，切换回用过的字号时不必重新拼接"""
+    return f"""
+        QMainWindow {{
+            background-color: {EYE_PROTECTION_COLORS['background']};
+        }}
+        QWidget#leftWidget {{
+            background-color: {EYE_PROTECTION_COLORS['widget_bg']};
+            border-radius: 8px;
+            padding: 10px;
+        }}
+        QWidget#rightWidget {{
+            background-color: {EYE_PROTECTION_COLORS['widget_bg']};
+            border-radius: 8px;
+            padding: 10px;
+        }}
+        QPushButton#addButton {{
+            background-color: {EYE_PROTECTION_COLORS['button_bg']};
+            color: white;
+            border: none;
+            border-radius: 6px;
+            padding: 12px;
+            font-size: {font_size}px;
+            font-weight: bold;
+        }}
+        QPushButton#addButton:hover {{
+            background-color: {EYE_PROTECTION_COLORS['button_hover']};
+        }}
+        QTabWidget::pane {{
+            border: 1px solid #C0C0C0;
+            background-color: {EYE_PROTECTION_COLORS['tab_bg']};
+            border-radius: 4px;
+        }}
+        QTabBar::tab {{
+            background-color: {EYE_PROTECTION_COLORS['tab_bg']};
+            color: {EYE_PROTECTION_COLORS['text']};
+            padding: 10px 20px;
+            margin-right: 2px;
+            border-top-left-radius: 4px;
+            border-top-right-radius: 4px;
+            font-size: {font_size}px;
+            font-weight: bold;
+        }}
+        QTabBar::tab:selected {{
+            background-color: {EYE_PROTECTION_COLORS['tab_selected']};
+            font-weight: bold;
+        }}
+        QTabBar::tab:hover {{
+            background-color: {EYE_PROTECTION_COLORS['button_hover']};
+            color: white;
+        }}
+        QComboBox#yearCombo {{
+            background-color: {EYE_PROTECTION_COLORS['year_filter_bg']};
+            border: 1px solid {EYE_PROTECTION_COLORS['button_bg']};
+            border-radius: 4px;
+            padding: 6px;
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-weight: bold;
+            font-size: {font_size}px;
+        }}
+        QLineEdit#searchBox, QLineEdit#filterBox {{
+            background-color: {EYE_PROTECTION_COLORS['list_bg']};
+            border: 1px solid {EYE_PROTECTION_COLORS['button_bg']};
+            border-radius: 4px;
+            padding: 4px 8px;
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QComboBox#yearCombo:hover {{
+            border-color: {EYE_PROTECTION_COLORS['button_hover']};
+        }}
+        QListView#bookList {{
+            background-color: {EYE_PROTECTION_COLORS['list_bg']};
+            border: 1px solid #C0C0C0;
+            border-radius: 4px;
+            font-size: {font_size}px;
+            color: {EYE_PROTECTION_COLORS['text']};
+        }}
+        QListView#bookList::item {{
+            padding: 10px;
+            border-bottom: 1px solid #E0E0E0;
+        }}
+        QListView#bookList::item:selected {{
+            background-color: {EYE_PROTECTION_COLORS['list_selected']};
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-weight: bold;
+        }}
+        QListView#bookList::item:hover {{
+            background-color: #F0F0F0;
+        }}
+        QGroupBox {{
+            background-color: {EYE_PROTECTION_COLORS['group_bg']};
+            border: 2px solid {EYE_PROTECTION_COLORS['button_bg']};
+            border-radius: 8px;
+            margin-top: 10px;
+            padding-top: 10px;
+            font-weight: bold;
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QGroupBox::title {{
+            subcontrol-origin: margin;
+            left: 10px;
+            padding: 0 5px 0 5px;
+        }}
+        QLabel {{
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QLabel[objectName^="title_label"], 
+        QLabel[objectName^="author_label"] {{
+            color: #2E8B57;
+            font-weight: bold;
+        }}
+        QLabel#statsLabel {{
+            color: {EYE_PROTECTION_COLORS['button_bg']};
+            font-size: {font_size}px;
+            font-weight: bold;
+        }}
+        QLabel#yearFilterLabel {{
+        color: {EYE_PROTECTION_COLORS['text']};
+        font-weight: bold;
+        font-size: {font_size}px;
+    }}
+    QLabel#yearStatsLabel {{
+            color: #FF8C00;
+            font-size: {font_size}px;
+            font-weight: bold;
+        }}
+        QTableWidget#statisticsTable {{
+            background-color: {EYE_PROTECTION_COLORS['list_bg']};
+            border: 1px solid #C0C0C0;
+            border-radius: 4px;
+            gridline-color: #E0E0E0;
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QPlainTextEdit#notesDisplay {{
+            background-color: white;
+            border: 1px solid #C0C0C0;
+            border-radius: 4px;
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QPushButton#editButton, QPushButton#historyButton {{
+            background-color: {EYE_PROTECTION_COLORS['button_bg']};
+            color: white;
+            border: none;
+            border-radius: 5px;
+            font-weight: bold;
+            font-size: {font_size}px;
+        }}
+        QPushButton#editButton:hover, QPushButton#historyButton:hover {{
+            background-color: {EYE_PROTECTION_COLORS['button_hover']};
+        }}
+        QPushButton#editButton:disabled, QPushButton#historyButton:disabled {{
+            background-color: #CCCCCC;
+            color: #999999;
+        }}
+        QPushButton#deleteButton {{
+            background-color: {EYE_PROTECTION_COLORS['button_delete']};
+            color: white;
+            border: none;
+            border-radius: 5px;
+            font-weight: bold;
+            font-size: {font_size}px;
+        }}
+        QPushButton#deleteButton:hover {{
+            background-color: {EYE_PROTECTION_COLORS['button_delete_hover']};
+        }}
+        QPushButton#deleteButton:disabled {{
+            background-color: #CCCCCC;
+            color: #999999;
+        }}
+        QMenuBar {{
+            background-color: {EYE_PROTECTION_COLORS['background']};
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QMenuBar::item:selected {{
+            background-color: {EYE_PROTECTION_COLORS['button_bg']};
+            color: white;
+        }}
+        QMenu {{
+            background-color: {EYE_PROTECTION_COLORS['widget_bg']};
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QMenu::item:selected {{
+            background-color: {EYE_PROTECTION_COLORS['button_bg']};
+            color: white;
+        }}
+    """
+
+@functools.lru_cache(maxsize=None)
+def book_dialog_style_sheet(font_size):
+    """书籍编辑对话框的护眼样式表，按字号缓存"""
+    return f"""
+        QDialog {{
+            background-color: {EYE_PROTECTION_COLORS['background']};
+            font-size: {font_size}px;
+        }}
+        QLineEdit, QTextEdit {{
+            background-color: white;
+            border: 1px solid #C0C0C0;
+            border-radius: 4px;
+            padding: 8px;
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QComboBox {{
+            background-color: white;
+            border: 1px solid #C0C0C0;
+            border-radius: 4px;
+            padding: 8px;
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-size: {font_size}px;
+        }}
+        QLabel {{
+            color: {EYE_PROTECTION_COLORS['text']};
+            font-weight: bold;
+            font-size: {font_size}px;
+        }}
+        QPushButton#saveButton {{
+            background-color: {EYE_PROTECTION_COLORS['button_bg']};
+            color: white;
+            border: none;
+            border-radius: 5px;
+            padding: 10px 20px;
+            font-weight: bold;
+            font-size: {font_size}px;
+        }}
+        QPushButton#saveButton:hover {{
+            background-color: {EYE_PROTECTION_COLORS['button_hover']};
+        }}
+        QPushButton#cancelButton {{
+            background-color: #B0B0B0;
+            color: white;
+            border: none;
+            border-radius: 5px;
+            padding: 10px 20px;
+            font-weight: bold;
+            font-size: {font_size}px;
+        }}
+        QPushButton#cancelButton:hover {{
+            background-color: #A0A0A0;
+        }}
+    """
+
+def get_resource_path(relative_path):
+    """获取资源文件的绝对路径，支持打包和开发模式"""
+    # PyInstaller创建临时文件夹，将路径存储在_MEIPASS中；否则在主程序所在目录查找，与当前目录无关
+    base_path = getattr(sys, '_MEIPASS', None) or get_data_dir()
+    return os.path.join(base_path, relative_path)
+
+def get_icon_cache_dir():
+    """程序生成的图标的缓存目录"""
+    return os.path.join(QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation), 'book_record')
+
+def get_icon_cache_path(size):
+    """某一尺寸的生成图标的缓存文件，文件名带版本号，图标画法改变后旧缓存不再使用"""
+    return os.path.join(get_icon_cache_dir(), f"book_icon_v{ICON_CACHE_VERSION}_{size}.png")
+
+def create_book_icon():
+    """创建一个书籍图标的QIcon"""
+    # 创建不同大小的图标
+    icon = QIcon()
+    
+    for size in ICON_SIZES:
+        pixmap = QPixmap(size, size)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # 计算缩放比例
+        scale = size / 64.0
+        
+        # 使用护眼主题颜色
+        book_color = QColor(143, 188, 143)  # 暗海绿色
+        book_outline = QColor(111, 156, 111)
+        page_color = QColor(245, 245, 220)  # 米色
+        
+        # 根据大小调整线宽
+        line_width = max(1, int(2 * scale))
+        
+        # 绘制书脊
+        painter.setBrush(QBrush(book_color))
+        painter.setPen(QPen(book_outline, line_width))
+        x1, y1 = int(20 * scale), int(12 * scale)
+        w1, h1 = int(12 * scale), int(40 * scale)
+        painter.drawRect(x1, y1, w1, h1)
+        
+        # 绘制封面
+        painter.setBrush(QBrush(page_color))
+        painter.setPen(QPen(book_outline, line_width))
+        points = QPolygon([
+            QPoint(int(32 * scale), int(12 * scale)),    # 左上
+            QPoint(int(52 * scale), int(24 * scale)),    # 右上
+            QPoint(int(52 * scale), int(52 * scale)),    # 右下
+            QPoint(int(32 * scale), int(40 * scale))     # 左下
+        ])
+        painter.drawPolygon(points)
+        
+        # 绘制书页线
+        if size >= 32:  # 只在较大图标上绘制细节
+            painter.setPen(QPen(QColor(180, 180, 180), max(1, int(1 * scale))))
+            for i in range(3):
+                y = int((20 + i * 10) * scale)
+                painter.drawLine(int(32 * scale), y, int(52 * scale), int((y + 12 * scale)))
+        
+        painter.end()
+        icon.addPixmap(pixmap)
+    
+    return icon
+
+def load_cached_book_icon():
+    """从磁盘缓存读取生成的图标，缓存不完整时返回None"""
+    paths = [get_icon_cache_path(size) for size in ICON_SIZES]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    icon = QIcon()
+    for size, path in zip(ICON_SIZES, paths):
+        icon.addFile(path, QSize(size, size))
+    return icon
+
+def save_book_icon_cache(icon):
+    """把生成的图标按尺寸保存到磁盘缓存，失败时只记录日志，下次启动重新生成"""
+    try:
+        os.makedirs(get_icon_cache_dir(), exist_ok=True)
+        for size in ICON_SIZES:
+            if not icon.pixmap(size, size).save(get_icon_cache_path(size), 'PNG'):
+                raise OSError(get_icon_cache_path(size))
+    except OSError as e:
+        log(f"保存图标缓存失败: {e}")
+
+def get_application_icon():
+    """获取应用程序图标，优先从文件加载，其次读取生成图标的缓存，都没有时生成并缓存"""
+    # 1. 首先尝试从ICO文件加载
+    try:
+        icon_path = get_resource_path("book_icon.ico")
+        if os.path.exists(icon_path):
+            icon = QIcon(icon_path)
+            if not icon.isNull():
+                return icon
+    except:
+        pass
+    
+    # 2. 尝试从PNG文件加载
+    try:
+        icon_path = get_resource_path("book_icon.png")
+        if os.path.exists(icon_path):
+            icon = QIcon(icon_path)
+            if not icon.isNull():
+                return icon
+    except:
+        pass
+    
+    # 3. 读取上次生成的图标
+    icon = load_cached_book_icon()
+    if icon is not None:
+        return icon
+    
+    # 4. 如果文件加载失败，使用程序生成的图标，并缓存到磁盘
+    icon = create_book_icon()
+    save_book_icon_cache(icon)
+    return icon
+
+# 全局图标变量
+APP_ICON = None
+
+def get_app_icon():
+    """获取应用程序图标（单例模式）"""
+    global APP_ICON
+    if APP_ICON is None:
+        APP_ICON = get_application_icon()
+    return APP_ICON
@@ -0,0 +1,655 @@
+"""书籍编辑对话框、笔记查看器、年度阅读页、阅读统计页、诊断信息和笔记历史对话框等界面组件"""
+import time
+from datetime import datetime
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListView, QLineEdit,
+                             QTextEdit, QPlainTextEdit, QLabel, QComboBox, QMessageBox, QFormLayout, QDialog,
+                             QFrame, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor
+
+from ..core import (BOOK_STATUSES, INSTRUMENT_ENV, Book, BookEvent, get_finish_year, instrumented,
+                    is_instrumented, operation_stats, reset_instrumentation, slowest_operations)
+from .theme import FONT_MANAGER, book_dialog_style_sheet, get_app_icon
+from .models import BookListModel
+
+class BookDialog(QDialog):
+    """书籍编辑对话框：编辑书籍的副本，保存时才更新书库，取消时不留下任何修改"""
+    def __init__(self, book_manager, book=None, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self.current_book = book.copy() if book is not None else None
+        self.is_edit_mode = book is not None
+        self.parent_window = parent
+        
+        self.init_ui()
+        self.set_eye_protection_theme()
+        
+        # 设置对话框图标
+        self.setWindowIcon(get_app_icon())
+        
+        if self.is_edit_mode:
+            self.load_book_data()
+    
+    def init_ui(self):
+        self.setWindowTitle("编辑书籍" if self.is_edit_mode else "添加新书")
+        self.setMinimumSize(500, 500)
+        self.resize(550, 500)
+        
+        self.setWindowFlags(self.windowFlags() | Qt.WindowMinMaxButtonsHint)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        form_layout = QFormLayout()
+        form_layout.setSpacing(12)
+        form_layout.setLabelAlignment(Qt.AlignRight)
+        
+        # 设置字体
+        label_font = FONT_MANAGER.get_font(bold=True)
+        input_font = FONT_MANAGER.get_font()
+        
+        self.title_input = QLineEdit()
+        self.title_input.setPlaceholderText("请输入书名（必填）")
+        self.title_input.setMinimumHeight(35)
+        self.title_input.setFont(input_font)
+        form_layout.addRow(QLabel("书名:"), self.title_input)
+        
+        self.author_input = QLineEdit()
+        self.author_input.setPlaceholderText("请输入作者")
+        self.author_input.setMinimumHeight(35)
+        self.author_input.setFont(input_font)
+        form_layout.addRow(QLabel("作者:"), self.author_input)
+        
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(BOOK_STATUSES)
+        self.status_combo.setMinimumHeight(35)
+        self.status_combo.setFont(input_font)
+        self.status_combo.currentTextChanged.connect(self.on_status_changed)
+        form_layout.addRow(QLabel("状态:"), self.status_combo)
+        
+        notes_label = QLabel("笔记:")
+        notes_label.setAlignment(Qt.AlignRight | Qt.AlignTop)
+        notes_label.setFont(label_font)
+        
+        self.notes_text = QTextEdit()
+        self.notes_text.setPlaceholderText("请输入读书笔记或感想...")
+        self.notes_text.setMinimumHeight(150)
+        self.notes_text.setFont(input_font)
+        form_layout.addRow(notes_label, self.notes_text)
+        
+        layout.addLayout(form_layout)
+        layout.addStretch(1)
+        
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+        
+        button_font = FONT_MANAGER.get_font(bold=True)
+        
+        self.save_button = QPushButton("保存")
+        self.save_button.clicked.connect(self.save_book)
+        self.save_button.setMinimumHeight(40)
+        self.save_button.setMinimumWidth(100)
+        self.save_button.setFont(button_font)
+        self.save_button.setObjectName("saveButton")
+        button_layout.addWidget(self.save_button)
+        
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(self.close)
+        self.cancel_button.setMinimumHeight(40)
+        self.cancel_button.setMinimumWidth(100)
+        self.cancel_button.setFont(button_font)
+        self.cancel_button.setObjectName("cancelButton")
+        button_layout.addWidget(self.cancel_button)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def load_book_data(self):
+        """加载现有书籍数据"""
+        if self.current_book:
+            self.title_input.setText(self.current_book.title)
+            self.author_input.setText(self.current_book.author)
+            self.status_combo.setCurrentText(self.current_book.status)
+            notes = self.current_book.notes
+            if notes is None:
+                # 只用于显示的书籍没有读取笔记，编辑时才读取
+                notes = self.book_manager.get_notes(self.current_book.id) or ""
+            self.notes_text.setPlainText(notes)
+    
+    def on_status_changed(self, status):
+        """状态改变事件"""
+        if self.is_edit_mode and self.current_book:
+            if status == "已读" and self.current_book.finish_date is None:
+                self.current_book.finish_date = datetime.now().strftime("%Y-%m-%d")
+            elif status == "在读" and self.current_book.start_date is None:
+                self.current_book.start_date = datetime.now().strftime("%Y-%m-%d")
+    
+    def save_book(self):
+        """保存书籍"""
+        title = self.title_input.text().strip()
+        if not title:
+            QMessageBox.warning(self, "警告", "请输入书名！")
+            return
+        
+        author = self.author_input.text().strip()
+        status = self.status_combo.currentText()
+        notes = self.notes_text.toPlainText()
+        
+        if not self.is_edit_mode:
+            duplicates = self.book_manager.find_duplicates(title, author)
+            if duplicates:
+                existing = duplicates[0]
+                reply = QMessageBox.question(
+                    self,
+                    "可能重复",
+                    f"书库中已有《{existing.title}》（{existing.author or '未知作者'}，{existing.status}），"
+                    f"仍要添加吗？",
+                    QMessageBox.Yes | QMessageBox.No,
+                    QMessageBox.No
+                )
+                if reply != QMessageBox.Yes:
+                    return
+            
+            finish_date = datetime.now().strftime("%Y-%m-%d") if status == "已读" else None
+            start_date = datetime.now().strftime("%Y-%m-%d") if status == "在读" else None
+            
+            new_book = Book(
+                title=title,
+                author=author,
+                status=status,
+                notes=notes,
+                finish_date=finish_date
+            )
+            
+            if start_date:
+                new_book.start_date = start_date
+            
+            self.book_manager.add_book(new_book)
+        else:
+            new_status = status
+            old_status = self.current_book.status
+            
+            if new_status == "已读" and old_status != "已读":
+                self.current_book.finish_date = datetime.now().strftime("%Y-%m-%d")
+            
+            if new_status == "在读" and old_status == "想读":
+                self.current_book.start_date = datetime.now().strftime("%Y-%m-%d")
+            
+            self.current_book.title = title
+            self.current_book.author = author
+            self.current_book.status = new_status
+            self.current_book.notes = notes
+            
+            self.book_manager.update_book(self.current_book)
+        
+        self.accept()
+    
+    def set_eye_protection_theme(self):
+        """设置护眼主题"""
+        self.setStyleSheet(book_dialog_style_sheet(FONT_MANAGER.get_font_size()))
+
+def create_book_list_view(model):
+    """创建书籍列表视图"""
+    view = QListView()
+    view.setModel(model)
+    view.setObjectName("bookList")
+    view.setFont(FONT_MANAGER.get_weight_font(bold=False))  # 不随所在标签页加粗
+    view.setUniformItemSizes(True)  # 行高一致，滚动时无需逐行计算大小
+    view.setEditTriggers(QListView.NoEditTriggers)
+    return view
+
+# 笔记查看器每次读取和追加的字数
+NOTES_PAGE_SIZE = 20000
+
+class NotesViewer(QPlainTextEdit):
+    """只读的笔记查看器：笔记分段读取，先显示第一段，滚动到接近底部时再追加下一段
+    
+    选中书籍时只查询笔记字数和第一段，几MB的长篇摘抄也不会一次读出和排版。
+    也可以用show_text()分段显示已读出的笔记（如历史版本）。
+    """
+    progress_changed = pyqtSignal(int, int)  # 已显示字数, 总字数
+    
+    def __init__(self, book_manager, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self.book_id = None
+        self.text = None  # show_text()显示的笔记，显示书籍的笔记时为None
+        self.loaded = 0   # 已显示的字数
+        self.total = 0
+        self.setReadOnly(True)
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+    
+    def show_notes(self, book_id):
+        """显示书籍的笔记，先只读取第一段"""
+        self.book_id = book_id
+        self.text = None
+        self._show_first_page(self.book_manager.notes_length(book_id))
+    
+    def show_text(self, text):
+        """分段显示已读出的笔记"""
+        self.book_id = None
+        self.text = text
+        self._show_first_page(len(text))
+    
+    def _show_first_page(self, total):
+        self.loaded = 0
+        self.total = total
+        if self.total:
+            self.clear()
+            self.load_next_page()
+        else:
+            self.setPlainText("无笔记")
+            self.progress_changed.emit(0, 0)
+    
+    def clear_notes(self):
+        """清空显示"""
+        self.book_id = self.text = None
+        self.loaded = self.total = 0
+        self.clear()
+        self.progress_changed.emit(0, 0)
+    
+    def has_more(self):
+        """是否还有未显示的笔记"""
+        return (self.book_id is not None or self.text is not None) and self.loaded < self.total
+    
+    @instrumented('notes_page')
+    def load_next_page(self):
+        """读取下一段笔记并追加到末尾，不改变当前的滚动位置"""
+        if self.text is not None:
+            text = self.text[self.loaded:self.loaded + NOTES_PAGE_SIZE]
+        else:
+            text = self.book_manager.read_notes(self.book_id, self.loaded, NOTES_PAGE_SIZE)
+        if text:
+            cursor = QTextCursor(self.document())
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+            self.loaded += len(text)
+        else:
+            # 笔记在显示期间变短了
+            self.total = self.loaded
+        self.progress_changed.emit(self.loaded, self.total)
+    
+    def on_scrolled(self, value):
+        """滚动到最后一屏以内时追加下一段"""
+        scroll_bar = self.verticalScrollBar()
+        if self.has_more() and value >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self.load_next_page()
+
+class YearReadingWidget(QWidget):
+    """年份阅读统计部件"""
+    def __init__(self, book_manager, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self.parent_window = parent
+        self.init_ui()
+        self.refresh_year_filter()
+        self.book_manager.subscribe(self.on_book_event)
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        filter_frame = QFrame()
+        filter_layout = QHBoxLayout(filter_frame)
+        filter_layout.setSpacing(10)
+        
+        year_label = QLabel("📅 按年份筛选:")
+        year_label.setObjectName("yearFilterLabel")
+        
+        self.year_combo = QComboBox()
+        self.year_combo.setMinimumWidth(120)
+        self.year_combo.setMinimumHeight(30)
+        self.year_combo.setFont(FONT_MANAGER.get_weight_font(bold=False))
+        self.year_combo.setObjectName("yearCombo")
+        self.year_combo.currentTextChanged.connect(self.on_year_changed)
+        
+        filter_layout.addWidget(year_label)
+        filter_layout.addWidget(self.year_combo)
+        filter_layout.addStretch()
+        
+        layout.addWidget(filter_frame)
+        
+        self.finished_model = BookListModel(self.book_manager, status="已读", show_finish_date=True, parent=self)
+        self.finished_list = create_book_list_view(self.finished_model)
+        self.finished_list.clicked.connect(self.on_book_selected)
+        
+        layout.addWidget(self.finished_list)
+        self.setLayout(layout)
+    
+    @instrumented('refresh_year_filter')
+    def refresh_year_filter(self):
+        """刷新年份筛选器"""
+        years = self.book_manager.get_years()
+        self.year_combo.clear()
+        self.year_combo.addItem("全部")
+        for year in years:
+            self.year_combo.addItem(str(year))
+        
+        if years:
+            self.year_combo.setCurrentText(str(years[0]))
+    
+    def on_book_event(self, event):
+        """只增删受影响的年份选项，保持当前选择"""
+        if event.kind == BookEvent.LOADED:
+            for year in {get_finish_year(book) for book in event.books} - {None}:
+                self._insert_year(year)
+            return
+        if event.kind == BookEvent.RELOADED:
+            self.refresh_year_filter()
+            return
+        if event.old_year == event.new_year:
+            return
+        if event.new_year is not None:
+            self._insert_year(event.new_year)
+        if event.old_year is not None and self.book_manager.count_by_year(event.old_year) == 0:
+            position = self.year_combo.findText(str(event.old_year))
+            if position >= 0:
+                self.year_combo.removeItem(position)
+    
+    def _insert_year(self, year):
+        """按从新到旧的顺序插入年份选项，已存在时忽略"""
+        if self.year_combo.findText(str(year)) >= 0:
+            return
+        # 第0项为"全部"
+        position = 1
+        while (position < self.year_combo.count()
+               and int(self.year_combo.itemText(position)) > year):
+            position += 1
+        self.year_combo.insertItem(position, str(year))
+    
+    def on_year_changed(self, year_text):
+        """年份选择变化"""
+        if year_text:
+            self.refresh_books_by_year(year_text)
+    
+    def refresh_books_by_year(self, year):
+        """按年份筛选书籍列表"""
+        self.finished_model.set_year(year)
+    
+    def on_book_selected(self, index):
+        """书籍被选中"""
+        if self.parent_window and hasattr(self.parent_window, 'on_year_book_selected'):
+            self.parent_window.on_year_book_selected(index)
+
+# 阅读统计页在书籍变更后多少毫秒重新显示，连续变更（如加载、导入）只显示一次
+STATISTICS_REFRESH_DELAY = 200
+
+class StatisticsWidget(QWidget):
+    """阅读统计页：显示预先汇总的ReadingStats，变更后只在可见时重新显示"""
+    def __init__(self, book_manager, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self.stats = book_manager.reading_stats
+        self.dirty = True
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(STATISTICS_REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.init_ui()
+        self.book_manager.subscribe(self.on_book_event)
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        
+        self.summary_label = QLabel("正在统计...")
+        self.summary_label.setObjectName("statisticsSummary")
+        self.summary_label.setWordWrap(True)
+        self.summary_label.setFont(FONT_MANAGER.get_weight_font())
+        layout.addWidget(self.summary_label)
+        
+        # 每年一行：1~12月和全年的已读数量
+        self.month_table = QTableWidget(0, 13)
+        self.month_table.setObjectName("statisticsTable")
+        self.month_table.setHorizontalHeaderLabels([f"{month}月" for month in range(1, 13)] + ["全年"])
+        self.month_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.month_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.month_table.setFont(FONT_MANAGER.get_weight_font(bold=False))
+        layout.addWidget(self.month_table, 3)
+        
+        authors_label = QLabel("✍️ 读得最多的作者")
+        authors_label.setFont(FONT_MANAGER.get_weight_font())
+        layout.addWidget(authors_label)
+        self.author_table = QTableWidget(0, 2)
+        self.author_table.setObjectName("statisticsTable")
+        self.author_table.setHorizontalHeaderLabels(["作者", "已读"])
+        self.author_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.author_table.verticalHeader().hide()
+        self.author_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.author_table.setFont(FONT_MANAGER.get_weight_font(bold=False))
+        layout.addWidget(self.author_table, 2)
+        self.setLayout(layout)
+    
+    def on_book_event(self, event):
+        """标记需要重新显示，可见时稍后合并显示"""
+        self.dirty = True
+        if self.isVisible():
+            self.refresh_timer.start()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.dirty:
+            self.refresh()
+    
+    @instrumented('statistics_refresh')
+    def refresh(self):
+        """按当前统计重新显示（统计尚未建立时先建立）"""
+        self.dirty = False
+        stats = self.stats
+        counts = stats.status_counts()
+        year_counts = stats.year_counts()
+        average = stats.average_reading_days()
+        longest, first, last, current = stats.streaks()
+        
+        summary = [f"📊 总计 {sum(counts.values())} 本，已读 {counts.get('已读', 0)} 本，"
+                   f"共 {stats.author_count()} 位作者"]
+        if average is not None:
+            summary.append(f"⏱️ 平均每本读 {average:.1f} 天")
+        if longest:
+            summary.append(f"🔥 最长连续 {longest} 个月每月都读完书"
+                           f"（{first[0]}年{first[1]}月 ~ {last[0]}年{last[1]}月），当前连续 {current} 个月")
+        self.summary_label.setText("\n".join(summary))
+        
+        self.month_table.setRowCount(len(year_counts))
+        self.month_table.setVerticalHeaderLabels([f"{year}年" for year in year_counts])
+        for row, (year, total) in enumerate(year_counts.items()):
+            for column, count in enumerate(stats.month_counts(year) + [total]):
+                item = QTableWidgetItem(str(count) if count else "")
+                item.setTextAlignment(Qt.AlignCenter)
+                self.month_table.setItem(row, column, item)
+        
+        authors = stats.top_authors()
+        self.author_table.setRowCount(len(authors))
+        for row, (author, count) in enumerate(authors):
+            self.author_table.setItem(row, 0, QTableWidgetItem(author))
+            item = QTableWidgetItem(str(count))
+            item.setTextAlignment(Qt.AlignCenter)
+            self.author_table.setItem(row, 1, item)
+
+class DiagnosticsDialog(QDialog):
+    """诊断信息：各操作的耗时统计和滚动直方图，以及最近最慢的操作"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("诊断信息")
+        self.setWindowIcon(get_app_icon())
+        self.resize(800, 700)
+        self.init_ui()
+        self.refresh()
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        
+        self.state_label = QLabel()
+        self.state_label.setWordWrap(True)
+        layout.addWidget(self.state_label)
+        
+        self.operation_table = QTableWidget(0, 6)
+        self.operation_table.setHorizontalHeaderLabels(["操作", "次数", "平均(ms)", "中位数(ms)", "P95(ms)", "最大(ms)"])
+        self.operation_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.operation_table.verticalHeader().hide()
+        self.operation_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.operation_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.operation_table.currentCellChanged.connect(lambda row, *_: self.show_histogram(row))
+        layout.addWidget(self.operation_table, 3)
+        
+        # 选中操作的耗时分布
+        self.histogram_label = QLabel()
+        self.histogram_label.setFont(FONT_MANAGER.get_font())
+        layout.addWidget(self.histogram_label)
+        
+        layout.addWidget(QLabel("最近最慢的操作"))
+        self.slowest_table = QTableWidget(0, 3)
+        self.slowest_table.setHorizontalHeaderLabels(["时间", "操作", "耗时(ms)"])
+        self.slowest_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.slowest_table.verticalHeader().hide()
+        self.slowest_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.slowest_table, 2)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        for text, slot in (("刷新", self.refresh), ("清空", self.clear), ("关闭", self.accept)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def refresh(self):
+        """重新读取已记录的耗时"""
+        if is_instrumented():
+            self.state_label.setText("正在记录耗时，统计最近若干次操作。")
+        else:
+            self.state_label.setText(f"耗时记录未开启：可在「帮助 → 记录耗时」中开启，"
+                                     f"或启动前设置环境变量 {INSTRUMENT_ENV}=1。")
+        self.operations = operation_stats()
+        self.operation_table.setRowCount(len(self.operations))
+        for row, (name, stats, _) in enumerate(self.operations):
+            values = [name, str(stats['total'])] + [f"{stats[key]:.1f}" for key in ('mean', 'median', 'p95', 'max')]
+            for column, value in enumerate(values):
+                self.operation_table.setItem(row, column, QTableWidgetItem(value))
+        self.show_histogram(self.operation_table.currentRow() if self.operations else -1)
+        
+        slowest = slowest_operations()
+        self.slowest_table.setRowCount(len(slowest))
+        for row, (milliseconds, name, finished) in enumerate(slowest):
+            values = [time.strftime("%H:%M:%S", time.localtime(finished)), name, f"{milliseconds:.1f}"]
+            for column, value in enumerate(values):
+                self.slowest_table.setItem(row, column, QTableWidgetItem(value))
+    
+    def show_histogram(self, row):
+        """以文字条形图显示一种操作的耗时分布，未选中时显示第一种"""
+        if not self.operations:
+            self.histogram_label.setText("")
+            return
+        name, _, buckets = self.operations[max(row, 0)]
+        peak = max(count for _, count in buckets) or 1
+        lines = [f"{name} 的耗时分布："]
+        lines += [f"{label:>9} {'█' * round(count * 30 / peak)} {count}" for label, count in buckets if count]
+        self.histogram_label.setText("\n".join(lines))
+    
+    def clear(self):
+        """清空已记录的耗时"""
+        reset_instrumentation()
+        self.refresh()
+
+class NotesHistoryDialog(QDialog):
+    """笔记历史：列出笔记的各个版本，查看某个版本的内容并可以恢复为该版本
+    
+    版本列表在后台线程中等排队的历史记录写完后读取，界面线程不等待历史文件写入。
+    """
+    revisions_loaded = pyqtSignal(object)  # 后台线程 -> 界面线程：版本列表（从旧到新）
+    
+    def __init__(self, book_manager, book, parent=None):
+        super().__init__(parent)
+        self.book_manager = book_manager
+        self.book = book
+        self.restored = False  # 是否恢复过某个版本，关闭后主窗口据此刷新详情
+        self.revisions = []
+        self.revisions_loaded.connect(self.show_revisions)
+        self.setWindowTitle(f"笔记历史 - {book.title}")
+        self.setWindowIcon(get_app_icon())
+        self.resize(800, 600)
+        self.init_ui()
+        self.refresh()
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        
+        self.revision_table = QTableWidget(0, 2)
+        self.revision_table.setHorizontalHeaderLabels(["修改时间", "字数"])
+        self.revision_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.revision_table.verticalHeader().hide()
+        self.revision_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.revision_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.revision_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.revision_table.currentCellChanged.connect(lambda row, *_: self.show_revision(row))
+        layout.addWidget(self.revision_table, 1)
+        
+        self.revision_text = NotesViewer(self.book_manager)
+        self.revision_text.setFont(FONT_MANAGER.get_font())
+        layout.addWidget(self.revision_text, 2)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.restore_button = QPushButton("恢复此版本")
+        self.restore_button.setEnabled(False)
+        self.restore_button.clicked.connect(self.restore_revision)
+        button_layout.addWidget(self.restore_button)
+        close_button = QPushButton("关闭")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def refresh(self):
+        """在后台重新读取版本列表，读取完成后由show_revisions()显示"""
+        self.restore_button.setEnabled(False)
+        self.book_manager.get_notes_revisions_later(self.book.id, self.revisions_loaded.emit)
+    
+    def show_revisions(self, revisions):
+        """显示版本列表，最新的版本在最上面"""
+        self.revisions = list(reversed(revisions))
+        self.revision_table.setRowCount(0)  # 清除当前行，下面选中第一行时总会显示该版本
+        self.revision_table.setRowCount(len(self.revisions))
+        for row, revision in enumerate(self.revisions):
+            # 没有修改时间的版本是开始记录历史之前的笔记
+            modified = revision['time'].replace('T', ' ') if revision['time'] else "开始记录前"
+            self.revision_table.setItem(row, 0, QTableWidgetItem(modified))
+            self.revision_table.setItem(row, 1, QTableWidgetItem(str(revision['size'])))
+        if self.revisions:
+            self.revision_table.selectRow(0)
+        else:
+            self.revision_text.setPlainText("这本书的笔记还没有修改记录。")
+    
+    def show_revision(self, row):
+        """显示选中版本的笔记，与当前笔记相同的版本不能恢复"""
+        if not 0 <= row < len(self.revisions):
+            self.restore_button.setEnabled(False)
+            return
+        notes = self.book_manager.get_notes_revision(self.book.id, self.revisions[row]['rev'])
+        self.revision_text.show_text(notes or "")
+        self.restore_button.setEnabled(notes is not None and notes != self.book_manager.get_notes(self.book.id))
+    
+    def restore_revision(self):
+        """把笔记恢复为选中的版本"""
+        row = self.revision_table.currentRow()
+        if not 0 <= row < len(self.revisions):
+            return
+        reply = QMessageBox.question(self, "恢复笔记", "确定要把笔记恢复为这个版本吗？当前笔记会保留在历史中。",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        if self.book_manager.restore_notes_revision(self.book.id, self.revisions[row]['rev']) is None:
+            QMessageBox.warning(self, "恢复失败", "无法读取这个版本的笔记。")
+            return
+        self.restored = True
+        self.refresh()
+
+def show_error_dialog(title, message, critical=False):
+    """以对话框提示数据层报告的错误"""
+    if critical:
+        QMessageBox.critical(None, title, message)
+    else:
+        QMessageBox.warning(None, title, message)
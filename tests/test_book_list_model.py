@@ -0,0 +1,66 @@
+"""书籍列表模型：每个列表按自己的状态（年份）分批加载，书籍分布不均时也能显示全部书籍"""
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+
+from book_record.core import Book, BookManager, set_log_handler
+from book_record.gui.models import FETCH_BATCH_SIZE, BookListModel
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def manager(request, tmp_path):
+    set_log_handler(None)
+    suffix = 'db' if request.param == 'sqlite' else 'json'
+    manager = BookManager(str(tmp_path / f"books_data.{suffix}"), storage=request.param)
+    # ID 1~4000为已读（3501~4000在2024年读完），4001~5000为想读
+    books = [Book(title=f"已读{i}", status="已读",
+                  finish_date="2024-05-01" if i > 3500 else "2020-05-01") for i in range(1, 4001)]
+    books += [Book(title=f"想读{i}", status="想读") for i in range(4001, 5001)]
+    manager.add_books(books)
+    yield manager
+    manager.close()
+
+
+def fetch_all(model):
+    while model.canFetchMore(model.index(0).parent()):
+        model.fetchMore(model.index(0).parent())
+    return model.rowCount()
+
+
+def test_rare_status_is_listed_without_loading_other_books(app, manager):
+    model = BookListModel(manager, status="想读")
+    view = QtWidgets.QListView()
+    view.setModel(model)
+    view.show()
+    app.processEvents()
+    assert model.rowCount() == FETCH_BATCH_SIZE
+    assert model.data(model.index(0)) == "想读4001"
+    assert fetch_all(model) == manager.count("想读") == 1000
+
+
+def test_year_list_contains_all_books_of_that_year(app, manager):
+    model = BookListModel(manager, status="已读", show_finish_date=True)
+    model.set_year("2024")
+    assert fetch_all(model) == 500
+    assert model.data(model.index(0)) == "已读3501 (2024-05-01)"
+
+
+def test_new_book_appears_in_its_list(app, manager):
+    model = BookListModel(manager, status="想读")
+    reading = BookListModel(manager, status="在读")
+    book = Book(title="新书", status="在读")
+    manager.add_book(book)
+    assert reading.rowCount() == 1
+    book.status = "想读"
+    manager.update_book(book)
+    assert reading.rowCount() == 0
+    assert fetch_all(model) == 1001
+    assert model.data(model.index(1000)) == "新书"
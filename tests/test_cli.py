@@ -0,0 +1,38 @@
+"""命令行模式：文件无法读取或数据无效时输出一行错误并返回非零退出码"""
+import pytest
+
+from book_record.cli import main
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / "books_data.json")
+
+
+def test_success_returns_zero(data_file, capsys):
+    assert main(["--data-file", data_file, "add", "三体", "--author", "刘慈欣"]) == 0
+    assert main(["--data-file", data_file, "search", "三体"]) == 0
+    assert "三体" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('name, content', [
+    ("missing.csv", None),
+    ("broken.json", '[{"title": "三体"'),
+    ("binary.csv", b'\xff\xfe\x00'),
+])
+def test_unreadable_import_file_is_one_line_error(tmp_path, data_file, capsys, name, content):
+    path = tmp_path / name
+    if isinstance(content, str):
+        path.write_text(content, encoding='utf-8')
+    elif content is not None:
+        path.write_bytes(content)
+    assert main(["--data-file", data_file, "import", str(path)]) == 1
+    err = capsys.readouterr().err
+    assert err.startswith("错误: import: ")
+    assert err.count("\n") == 1
+
+
+def test_unwritable_export_is_one_line_error(tmp_path, data_file, capsys):
+    output = str(tmp_path / "missing" / "books.csv")
+    assert main(["--data-file", data_file, "export", "-o", output]) == 1
+    assert capsys.readouterr().err.startswith("错误: export: ")
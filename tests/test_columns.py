@@ -0,0 +1,51 @@
+"""列式书籍表：日期压缩为整数保存，空串、缺失和非标准日期原样还原，状态按编码保存"""
+import pytest
+
+from book_record.core import Book, BookColumns, pack_date
+
+
+def make_book(book_id, **fields):
+    book = Book.from_dict(dict({'title': f"书{book_id}", 'author': "作者", 'status': "已读",
+                                'notes': "", 'add_date': "2024-01-01"}, **fields))
+    book.id = book_id
+    return book
+
+
+def round_trip(book):
+    columns = BookColumns()
+    columns[book.id] = book
+    return columns[book.id]
+
+
+@pytest.mark.parametrize('value', ["2024-02-29", "", None, "2024年春", "2024-1-5", "1999-12-31"])
+def test_dates_round_trip(value):
+    book = round_trip(make_book(1, start_date=value, finish_date=value))
+    assert book.start_date == value
+    assert book.finish_date == value
+    assert book.add_date == "2024-01-01"
+
+
+def test_regular_dates_are_packed():
+    columns = BookColumns()
+    columns[1] = make_book(1, start_date="2024年春", finish_date="2024-03-01")
+    assert columns._dates['add'][0] == pack_date("2024-01-01")
+    assert columns._dates['start'][0] == BookColumns.DATE_IRREGULAR
+    assert columns._irregular_dates == {('start', 1): "2024年春"}
+
+
+def test_unknown_status_is_kept():
+    assert round_trip(make_book(1, status="弃读")).status == "弃读"
+
+
+def test_update_in_place_clears_irregular_dates():
+    columns = BookColumns()
+    columns[1] = make_book(1, start_date="某天")
+    columns[2] = make_book(2, title="另一本")
+    columns[1] = make_book(1, title="改名", start_date="2024-02-01", status="在读")
+    assert list(columns) == [1, 2]
+    book = columns[1]
+    assert (book.title, book.status, book.start_date) == ("改名", "在读", "2024-02-01")
+    assert columns._irregular_dates == {}
+    del columns[1]
+    assert list(columns) == [2]
+    assert columns[2].title == "另一本"
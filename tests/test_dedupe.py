@@ -0,0 +1,67 @@
+"""查重：完全重复用哈希索引查出，近似重复分块比较，卷册不同的书不算重复"""
+import pytest
+
+from book_record.core import Book, BookManager, find_duplicate_groups, merge_books, set_log_handler
+
+
+@pytest.fixture
+def manager(tmp_path):
+    set_log_handler(None)
+    manager = BookManager(str(tmp_path / "books_data.json"))
+    yield manager
+    manager.close()
+
+
+def add(manager, *books):
+    manager.add_books([Book(title=title, author=author) for title, author in books])
+
+
+def test_exact_duplicates_ignore_case_width_and_punctuation(manager):
+    add(manager, ("Harry Potter", "J.K. Rowling"), ("三体", "刘慈欣"))
+    assert [book.id for book in manager.find_duplicates("ｈａｒｒｙ  potter!", "JK Rowling")] == [1]
+    assert manager.find_duplicates("三体", "刘慈欣", exclude_id=2) == []
+    assert manager.find_duplicates("三体", "别人") == []
+
+
+def test_near_duplicates_are_grouped(manager):
+    add(manager,
+        ("三体", "刘慈欣"),
+        ("三体（典藏版）", "刘慈欣 著"),
+        ("三体", ""),
+        ("球状闪电", "刘慈欣"),
+        ("百年孤独", "[哥伦比亚] 加西亚·马尔克斯"),
+        ("百年孤独", "加西亚·马尔克斯"),
+        ("百年孤独", "另一位作者"))
+    assert find_duplicate_groups(manager) == [[1, 2, 3], [5, 6]]
+
+
+def test_different_volumes_are_not_duplicates(manager):
+    add(manager,
+        ("明朝那些事儿（一）", "当年明月"),
+        ("明朝那些事儿（二）", "当年明月"),
+        ("哈利·波特与魔法石 1", "J.K.罗琳"),
+        ("哈利·波特与魔法石 2", "J.K.罗琳"),
+        ("平凡的世界 第一部", "路遥"),
+        ("平凡的世界 第二部", "路遥"))
+    assert find_duplicate_groups(manager) == []
+
+
+def test_large_blocks_still_find_neighbours(manager):
+    add(manager, *((f"系列作品之{i:03d}号", "同一作者") for i in range(200)))
+    add(manager, ("系列作品之050号（修订版）", "同一作者"))
+    # 同一作者的书超过MAX_BLOCK_SIZE本，只与按书名排序后相邻的书比较
+    assert find_duplicate_groups(manager) == [[51, 201]]
+
+
+def test_merge_keeps_furthest_status_and_all_notes(manager):
+    manager.add_books([
+        Book(title="三体", author="", status="想读", notes="想看"),
+        Book(title="三体（典藏版）", author="刘慈欣", status="已读", notes="看完了",
+             finish_date="2024-01-01"),
+    ])
+    keeper = merge_books(manager, [1, 2])
+    assert keeper.id == 1
+    book = manager.get_book(1)
+    assert (book.author, book.status, book.finish_date) == ("刘慈欣", "已读", "2024-01-01")
+    assert book.notes == "想看\n\n看完了"
+    assert manager.get_book_ids() == [1]
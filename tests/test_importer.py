@@ -0,0 +1,111 @@
+"""批量导入：识别豆瓣、Goodreads等导出文件的列名和阅读状态，统一日期格式，报告无效行并跳过重复"""
+import json
+
+import pytest
+
+from book_record.core import (Book, BookManager, import_books, normalize_date, normalize_status,
+                              read_import_file, resolve_columns, set_log_handler)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    set_log_handler(None)
+    manager = BookManager(str(tmp_path / "books_data.json"))
+    yield manager
+    manager.close()
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_columns_are_resolved_ignoring_case_and_spaces():
+    assert resolve_columns([" 书名 ", "作者/译者", "我的短评", "标记日期", "无关列"]) == {
+        'title': " 书名 ", 'author': "作者/译者", 'notes': "我的短评", 'add_date': "标记日期"}
+    assert resolve_columns(["Title", "Author", "Exclusive Shelf", "Date Read"]) == {
+        'title': "Title", 'author': "Author", 'status': "Exclusive Shelf", 'finish_date': "Date Read"}
+
+
+@pytest.mark.parametrize('value, expected', [
+    ("2024-01-31", "2024-01-31"),
+    ("2024/1/5", "2024-01-05"),
+    ("2024.01.05 12:30:00", "2024-01-05"),
+    ("2024年1月5日", "2024-01-05"),
+    ("", None),
+    (None, None),
+])
+def test_dates_are_normalized(value, expected):
+    assert normalize_date(value) == expected
+
+
+@pytest.mark.parametrize('value', ["昨天", "2024-02-30"])
+def test_unrecognized_dates_are_rejected(value):
+    with pytest.raises(ValueError):
+        normalize_date(value)
+
+
+def test_statuses_are_mapped():
+    assert normalize_status("to-read", None) == "想读"
+    assert normalize_status("Currently-Reading", None) == "在读"
+    assert normalize_status("读过", None) == "已读"
+    assert normalize_status("", "2024-01-01") == "已读"
+    assert normalize_status("", None) == "想读"
+    with pytest.raises(ValueError):
+        normalize_status("弃读", None)
+
+
+def test_goodreads_csv(tmp_path):
+    path = write(tmp_path / "goodreads.csv",
+                 "Title,Author,Exclusive Shelf,Date Read,Date Added,My Review\n"
+                 "Dune,Frank Herbert,read,2023/05/01,2023/01/02,Great\n"
+                 "Foundation,Isaac Asimov,to-read,,2023/01/03,\n")
+    result = read_import_file(path)
+    assert [(book.title, book.status, book.finish_date, book.add_date, book.notes)
+            for book in result.books] == [
+        ("Dune", "已读", "2023-05-01", "2023-01-02", "Great"),
+        ("Foundation", "想读", None, "2023-01-03", ""),
+    ]
+
+
+def test_invalid_rows_are_reported_with_line_numbers(tmp_path):
+    path = write(tmp_path / "douban.csv",
+                 "书名,作者,状态,读完日期\n"
+                 "三体,刘慈欣,读过,2020-01-01\n"
+                 ",无名,读过,\n"
+                 "球状闪电,刘慈欣,弃读,\n"
+                 "流浪地球,刘慈欣,读过,某天\n")
+    result = read_import_file(path)
+    assert [book.title for book in result.books] == ["三体"]
+    assert result.invalid == 3
+    assert [line for line, _ in result.errors] == [3, 4, 5]
+
+
+def test_malformed_json_lines_are_invalid_rows(tmp_path):
+    lines = [json.dumps({'title': "三体", 'author': "刘慈欣"}, ensure_ascii=False),
+             '{"title": "半行',
+             '',
+             json.dumps(["不是", "记录"], ensure_ascii=False),
+             json.dumps({'title': "球状闪电"}, ensure_ascii=False)]
+    path = write(tmp_path / "books.jsonl", "\n".join(lines) + "\n")
+    result = read_import_file(path)
+    assert [book.title for book in result.books] == ["三体", "球状闪电"]
+    assert result.invalid == 2
+    assert [line for line, _ in result.errors] == [2, 4]
+
+
+def test_duplicates_in_file_and_library_are_skipped(tmp_path, manager):
+    manager.add_book(Book(title="三体", author="刘慈欣"))
+    path = write(tmp_path / "books.json", json.dumps([
+        {'title': "三体", 'author': "刘慈欣"},
+        {'title': "球状闪电", 'author': "刘慈欣"},
+        {'title': "球状 闪电", 'author': "刘慈欣"},
+    ], ensure_ascii=False))
+    result = import_books(manager, path, dry_run=True)
+    assert [book.title for book in result.books] == ["球状闪电"]
+    assert result.duplicates == 2
+    assert len(manager.get_book_ids()) == 1
+
+    result = import_books(manager, path)
+    assert result.committed
+    assert [book.title for book in manager.iter_books(with_notes=False)] == ["三体", "球状闪电"]
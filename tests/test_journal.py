@@ -0,0 +1,70 @@
+"""追加日志：未保存快照的修改在重启时从日志重放，检查点之前的记录不会重复重放"""
+import os
+
+import pytest
+
+from book_record.core import JOURNAL_SUFFIX, Book, BookManager, set_log_handler
+
+
+@pytest.fixture(params=['json', 'columnar'])
+def data_file(request, tmp_path):
+    set_log_handler(None)
+    return str(tmp_path / "books_data.json"), request.param
+
+
+def reopen(data_file):
+    path, storage = data_file
+    return BookManager(path, storage=storage)
+
+
+def titles(manager):
+    return [book.title for book in manager.iter_books(with_notes=False)]
+
+
+def test_changes_are_replayed_from_the_journal(data_file):
+    manager = reopen(data_file)
+    for title in ("A", "B", "C"):
+        manager.add_book(Book(title=title, notes=f"{title}的笔记"))
+    book = manager.get_book(2)
+    book.title = "B2"
+    book.notes = "改过的笔记"
+    manager.update_book(book)
+    manager.delete_book(3)
+    manager.close()
+    assert os.path.getsize(data_file[0] + JOURNAL_SUFFIX) > 0
+
+    manager = reopen(data_file)
+    assert titles(manager) == ["A", "B2"]
+    assert manager.get_notes(1) == "A的笔记"
+    assert manager.get_notes(2) == "改过的笔记"
+    manager.close()
+
+
+def test_records_before_checkpoint_are_not_replayed_twice(data_file):
+    manager = reopen(data_file)
+    manager.add_book(Book(title="A"))
+    manager.save_data()
+    manager.add_book(Book(title="B"))
+    manager.close()
+
+    manager = reopen(data_file)
+    assert titles(manager) == ["A", "B"]
+    manager.save_data()
+    manager.close()
+
+    manager = reopen(data_file)
+    assert titles(manager) == ["A", "B"]
+    manager.close()
+
+
+def test_torn_last_line_is_ignored(data_file):
+    manager = reopen(data_file)
+    manager.add_book(Book(title="A"))
+    manager.add_book(Book(title="B"))
+    manager.close()
+    with open(data_file[0] + JOURNAL_SUFFIX, 'a', encoding='utf-8') as f:
+        f.write('{"op":"add","book":{"title":"半')
+
+    manager = reopen(data_file)
+    assert titles(manager) == ["A", "B"]
+    manager.close()
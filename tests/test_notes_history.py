@@ -0,0 +1,78 @@
+"""笔记历史：差异的生成与应用，跨关键版本还原任一版本，以及通过BookManager记录和恢复"""
+import pytest
+
+from book_record.core import (KEYFRAME_INTERVAL, Book, BookManager, NotesHistory, apply_delta, make_delta,
+                              set_log_handler)
+
+
+@pytest.fixture
+def history(tmp_path):
+    set_log_handler(None)
+    return NotesHistory(str(tmp_path / "history"))
+
+
+@pytest.mark.parametrize('old, new', [
+    ("", "新写的笔记"),
+    ("第一行\n第二行\n第三行\n", "第一行\n改过的第二行\n第三行\n"),
+    ("开头" * 5000, "开头" * 5000 + "末尾追加"),
+    ("整段旧内容\n", ""),
+])
+def test_delta_round_trip(old, new):
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_every_revision_is_reconstructed_across_keyframes(history):
+    versions = [f"第{i}版\n" + "不变的段落\n" * 20 + "结尾" * i for i in range(KEYFRAME_INTERVAL * 2 + 3)]
+    previous = ""
+    for text in versions:
+        history.record(7, previous, text)
+        previous = text
+    revisions = history.revisions(7)
+    assert [revision['rev'] for revision in revisions] == list(range(len(versions)))
+    assert sum(revision['key'] for revision in revisions) < len(versions)
+    for revision, text in zip(revisions, versions):
+        assert history.reconstruct(7, revision['rev']) == text
+    assert history.reconstruct(7, len(versions)) is None
+
+
+def test_unchanged_notes_are_not_recorded(history):
+    history.record(1, "", "笔记")
+    history.record(1, "笔记", "笔记")
+    assert len(history.revisions(1)) == 1
+
+
+def test_notes_changed_outside_history_are_kept_as_a_revision(history):
+    history.record(1, "", "第一版")
+    history.record(1, "别处改过的版本", "第三版")
+    assert [history.reconstruct(1, revision['rev']) for revision in history.revisions(1)] == \
+        ["第一版", "别处改过的版本", "第三版"]
+    assert history.revisions(1)[1]['time'] is None
+
+
+@pytest.mark.parametrize('storage', ['json', 'sqlite'])
+def test_manager_records_and_restores_revisions(tmp_path, storage):
+    set_log_handler(None)
+    suffix = 'db' if storage == 'sqlite' else 'json'
+    manager = BookManager(str(tmp_path / f"books_data.{suffix}"), storage=storage)
+    book = Book(title="书", notes="初稿")
+    manager.add_book(book)
+    for notes in ("二稿", "二稿", "三稿"):
+        edited = manager.get_book(book.id)
+        edited.notes = notes
+        manager.update_book(edited)
+    edited = manager.get_book(book.id, with_notes=False)
+    edited.title = "只改书名"
+    manager.update_book(edited)
+
+    revisions = manager.get_notes_revisions(book.id)
+    assert [manager.get_notes_revision(book.id, r['rev']) for r in revisions] == ["初稿", "二稿", "三稿"]
+    manager.restore_notes_revision(book.id, revisions[0]['rev'])
+    assert manager.get_notes(book.id) == "初稿"
+    assert len(manager.get_notes_revisions(book.id)) == 4
+    manager.close()
+
+    manager = BookManager(str(tmp_path / f"books_data.{suffix}"), storage=storage)
+    assert len(manager.get_notes_revisions(book.id)) == 4
+    manager.delete_book(book.id)
+    assert manager.get_notes_revisions(book.id) == []
+    manager.close()
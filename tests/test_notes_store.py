@@ -0,0 +1,53 @@
+"""笔记库：内容相同的笔记只保存一次，清理时保留仍被引用、最近写入和被保留的笔记"""
+import os
+
+import pytest
+
+from book_record.core import Book, BookManager, NotesStore, notes_digest, set_log_handler
+
+
+@pytest.fixture
+def store(tmp_path):
+    set_log_handler(None)
+    return NotesStore(str(tmp_path / "notes"))
+
+
+def blob_exists(store, digest):
+    return os.path.exists(store._blob_path(digest))
+
+
+def test_same_text_is_stored_once(store):
+    assert store.put("笔记") == store.put("笔记") == notes_digest("笔记")
+    assert store.read(notes_digest("笔记")) == "笔记"
+    assert sum(len(files) for _, _, files in os.walk(store.path)) == 1
+
+
+def test_collect_keeps_live_recent_and_pinned_blobs(store):
+    live, dead, pinned = store.put("仍被引用"), store.put("不再引用"), store.put("稍后还要读取")
+    # 上次清理以来写入的笔记本次不删除
+    assert store.collect(lambda: {live}) == 0
+    store.pin(pinned)
+    assert store.collect(lambda: {live}) == 1
+    assert blob_exists(store, live) and blob_exists(store, pinned)
+    assert not blob_exists(store, dead)
+    store.unpin(pinned)
+    assert store.collect(lambda: {live}) == 1
+    assert not blob_exists(store, pinned)
+    assert store.read(dead) == ""
+
+
+def test_replaced_notes_are_collected_after_save(tmp_path):
+    set_log_handler(None)
+    manager = BookManager(str(tmp_path / "books_data.json"))
+    book = Book(title="书", notes="旧笔记")
+    manager.add_book(book)
+    book.notes = "新笔记"
+    manager.update_book(book)
+    # 记录笔记历史前旧笔记被保留，记录完成后才能清理
+    manager.notes_history.flush()
+    manager.save_data()
+    manager.save_data()
+    store = manager.storage.notes_store
+    manager.close()
+    assert blob_exists(store, notes_digest("新笔记"))
+    assert not blob_exists(store, notes_digest("旧笔记"))
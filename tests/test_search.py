@@ -0,0 +1,72 @@
+"""全文搜索：书名命中高于作者、作者高于笔记，修改删除后的失效文档不影响结果和排名，清理后结果不变"""
+import pytest
+
+from book_record.core import Book, BookManager, SearchIndex, set_log_handler
+
+
+@pytest.fixture
+def manager(tmp_path):
+    set_log_handler(None)
+    manager = BookManager(str(tmp_path / "books_data.json"))
+    manager.add_books([
+        Book(title="随便写写", notes="提到了银河"),
+        Book(title="另一本书", author="银河"),
+        Book(title="银河帝国", author="阿西莫夫"),
+        Book(title="不相关", notes="毫无关系"),
+    ])
+    yield manager
+    manager.close()
+
+
+def search_ids(manager, query):
+    return [book.id for book in manager.search(query)]
+
+
+def test_title_ranks_above_author_above_notes(manager):
+    assert search_ids(manager, "银河") == [3, 2, 1]
+    assert search_ids(manager, "银河 阿西莫夫") == [3]
+    assert search_ids(manager, "不存在的词") == []
+
+
+def test_search_before_build_without_waiting_returns_none(manager):
+    assert manager.search("银河", wait=False) is None
+    manager.search_index.build()
+    assert [book.id for book in manager.search("银河", wait=False)] == [3, 2, 1]
+
+
+def test_updated_and_deleted_books_are_not_found_by_old_text(manager):
+    manager.search_index.build()
+    book = manager.get_book(3)
+    book.title = "基地"
+    manager.update_book(book)
+    manager.delete_book(2)
+    assert search_ids(manager, "银河") == [1]
+    assert search_ids(manager, "基地") == [3]
+
+
+def test_stale_documents_do_not_affect_ranking(manager):
+    manager.search_index.build()
+    # 反复修改一本书的笔记，旧文档不应抬高"银河"的文档频率
+    for i in range(20):
+        book = manager.get_book(4)
+        book.notes = f"第{i}次修改 银河"
+        manager.update_book(book)
+    fresh = SearchIndex(manager)
+    fresh.build()
+    for query in ("银河", "修改", "银河 修改"):
+        assert manager.search_index.search(query) == fresh.search(query)
+
+
+def test_compaction_keeps_results(manager):
+    index = manager.search_index
+    index.build()
+    for i in range(5):
+        book = manager.get_book(1)
+        book.notes = f"银河 第{i}版"
+        manager.update_book(book)
+    manager.delete_book(4)
+    before = {query: search_ids(manager, query) for query in ("银河", "第4版", "毫无关系", "阿西莫夫")}
+    index._compact()
+    assert -1 not in index._doc_books
+    assert len(index._doc_books) == 3
+    assert {query: search_ids(manager, query) for query in before} == before
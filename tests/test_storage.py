@@ -0,0 +1,75 @@
+"""存储后端：删除的书籍ID在保存、重启后不会被新书复用"""
+import pytest
+
+from book_record.core import Book, BookManager, set_log_handler
+
+
+@pytest.fixture(params=['json', 'columnar', 'sqlite'])
+def data_file(request, tmp_path):
+    set_log_handler(None)
+    suffix = 'db' if request.param == 'sqlite' else 'json'
+    return str(tmp_path / f"books_data.{suffix}"), request.param
+
+
+def reopen(data_file):
+    path, storage = data_file
+    return BookManager(path, storage=storage)
+
+
+@pytest.mark.parametrize('save', [True, False], ids=['snapshot', 'journal'])
+def test_deleted_highest_id_is_not_reused_after_restart(data_file, save):
+    manager = reopen(data_file)
+    manager.add_book(Book(title="A"))
+    manager.add_book(Book(title="B"))
+    manager.delete_book(2)
+    if save:
+        manager.save_data()
+    manager.close()
+
+    manager = reopen(data_file)
+    book = Book(title="C")
+    manager.add_book(book)
+    assert book.id == 3
+    assert [b.title for b in manager.iter_books()] == ["A", "C"]
+    manager.close()
+
+
+def test_next_id_survives_repeated_restarts(data_file):
+    manager = reopen(data_file)
+    for title in "ABC":
+        manager.add_book(Book(title=title))
+    manager.delete_book(3)
+    manager.delete_book(2)
+    manager.save_data()
+    manager.close()
+
+    manager = reopen(data_file)
+    manager.save_data()
+    manager.close()
+
+    manager = reopen(data_file)
+    book = Book(title="D")
+    manager.add_book(book)
+    assert book.id == 4
+    manager.close()
+
+
+def test_explicit_duplicate_id_is_reassigned(data_file):
+    manager = reopen(data_file)
+    first = Book(title="A")
+    manager.add_book(first)
+    second = Book(title="B")
+    second.id = first.id
+    manager.add_book(second)
+    assert second.id != first.id
+    assert manager.get_book(first.id).title == "A"
+    assert manager.get_book(second.id).title == "B"
+    manager.close()
+
+
+def test_count_by_year_ignores_invalid_year(data_file):
+    manager = reopen(data_file)
+    manager.add_book(Book(title="A", status="已读", finish_date="2024-03-01"))
+    assert manager.count_by_year("2024") == manager.count_by_year(2024) == 1
+    assert manager.count_by_year("abc") == manager.count_by_year(None) == 0
+    manager.close()